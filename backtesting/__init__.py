@@ -1,7 +1,7 @@
 # backtesting/__init__.py
 
-from .data_handler import DataHandler
+from .data_handler import DataHandler, DataWindow
 from .strategy import Strategy, MovingAverageCrossover
 from .portfolio import Portfolio
 
-__all__ = ['DataHandler', 'Strategy', 'MovingAverageCrossover', 'Portfolio']
+__all__ = ['DataHandler', 'DataWindow', 'Strategy', 'MovingAverageCrossover', 'Portfolio']
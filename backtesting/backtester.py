@@ -1,62 +1,288 @@
 # Backtester orchestrator goes here
-import pandas as pd
+import logging
+from contextlib import nullcontext
+import numpy as np
 from .data_handler import DataHandler
+from .indicators import IndicatorCache
 from .strategy import Strategy
 from .portfolio import Portfolio
+from .results import ResultsRecorder
+
+logger = logging.getLogger(__name__)
 
 class Backtester:
-    def __init__(self, strategy, data, ticker: str, initial_cash: float = 100000):
+    def __init__(self, strategy, data, ticker: str, initial_cash: float = 100000,
+                 results_format: str = 'records', record_positions: bool = True, execution=None,
+                 valuation: str = 'incremental', instrumentation=None):
         """
             Initialize backtester.
-            
+
             Args:
                 strategy: Strategy instance
                 data: Full DataFrame (from MarketDataProcessor)
                 ticker: Symbol being traded
                 initial_cash: Starting cash
+                results_format: 'records' (list of per-bar dicts) or 'columnar'
+                    (preallocated arrays, returned as a DataFrame)
+                record_positions: Keep a per-bar position snapshot
+                execution: ExecutionModel for costs, slippage and partial fills
+                    (default: fill the full quantity at 'Adj Close' with no costs)
+                valuation: 'incremental' marks the book to each bar's close;
+                    'audit' recomputes the value from the full history every bar
+                instrumentation: Optional Instrumentation collecting per-stage
+                    timings (data_slicing, signal_generation, order_handling,
+                    valuation, recording) and order counters
         """
+        if results_format not in ('records', 'columnar'):
+            raise ValueError(f"Unknown results format: {results_format}")
+        if valuation not in ('incremental', 'audit'):
+            raise ValueError(f"Unknown valuation mode: {valuation}")
         self.strategy = strategy
         self.data = data
         self.ticker = ticker
         self.initial_cash = initial_cash
-        self.data_handler = DataHandler(self.data)
+        # Only declared indicator inputs need frozen copies to be cacheable.
+        self.data_handler = DataHandler(self.data, copy_columns=IndicatorCache.input_columns([strategy]))
         self.portfolio = Portfolio(self.initial_cash)
+        self.execution = execution
+        self.record_positions = record_positions
+        self.valuation = valuation
+        self.instrumentation = instrumentation
         self.results:list = []
+        self.rejected_orders: list = []
+        self.recorder = None
+        if results_format == 'columnar':
+            self.recorder = ResultsRecorder(self.data_handler.index, [ticker], record_positions)
+
+        arrays = self.data_handler.arrays
+        self._fill_prices = arrays[execution.price_column if execution else 'Adj Close']
+        self._volumes = arrays['Volume'] if 'Volume' in arrays else np.full(len(self.data_handler.index), np.inf)
+        self._closes = arrays['close']
+        self._fill_delay = execution.fill_delay if execution else 0
+        self._pending: list = []
+
+    def _timed(self, stage, fn):
+        return self.instrumentation.timed(stage, fn) if self.instrumentation is not None else fn
 
-    def run(self):
+    def _stage(self, stage):
+        return self.instrumentation.stage(stage) if self.instrumentation is not None else nullcontext()
+
+    def _count(self, counter, n=1):
+        if self.instrumentation is not None:
+            self.instrumentation.count(counter, n)
+
+    def run(self, mode: str = 'loop', signals=None):
         """
         Run the backtest.
-        
+
+        Args:
+            mode: 'loop' replays the strategy bar by bar (one bar at a time via
+                on_bar() when the strategy supports streaming, otherwise on the
+                growing history); 'vectorized' asks the strategy for the full
+                signal series in one pass and derives positions, cash and
+                equity with array operations.
+            signals: Precomputed signals for the vectorized mode (a DataFrame
+                with 'action' and 'quantity' per bar, as returned by
+                Strategy.generate_signals) instead of asking the strategy
+
         Returns:
-            List of daily results
+            List of daily results, or a DataFrame when results_format='columnar'
         """
-        dates = self.data_handler.data.index
-        for current_date in dates:
-            historical_data = self.data_handler.get_data_up_to(current_date)
-            temp_df = historical_data.copy()
-            temp_df['ticker'] = self.ticker
-            signal = self.strategy.generate_signal(historical_data)
-            current_price = historical_data.loc[current_date, 'Adj Close']
-            quantity = signal['quantity']
-            if signal['action'] == 'BUY':
-                try:
-                    self.portfolio.buy(self.ticker, quantity, current_price)
-                except ValueError as e:
-                    pass  # e.g. insufficient cash
-            elif signal['action'] == 'SELL':
-                try:
-                    self.portfolio.sell(self.ticker, quantity, current_price)
-                except ValueError as e:
-                    pass  # e.g. insufficient shares (SELL signal before any BUY)
-            else:
-                pass
-            portfolio_value = self.portfolio.get_value(temp_df)
-            self.results.append({
-                'date': current_date,
-                'portfolio_value': portfolio_value,
-                'current_cash': self.portfolio.cash,
-                'signal' : signal,
-                'portfolio': self.portfolio.positions.copy()
-            })
+        if mode == 'vectorized':
+            self._run_vectorized(signals)
+        elif mode != 'loop':
+            raise ValueError(f"Unknown backtest mode: {mode}")
+        elif signals is not None:
+            raise ValueError("Precomputed signals require mode='vectorized'")
+        elif getattr(self.strategy, 'supports_streaming', False):
+            self._run_streaming()
+        else:
+            self._run_history()
+        for i, signal in self._pending:
+            self._reject(i, signal, "No bar left to fill the order")
+        self._pending = []
+        self._count('bars', len(self.data_handler.index))
+        if self.recorder is not None:
+            return self.recorder.to_frame()
         return self.results
 
+    def _run_history(self):
+        dates = self.data_handler.index
+        history = self._timed('data_slicing', self.data_handler.data.iloc.__getitem__)
+        generate_signal = self._timed('signal_generation', self.strategy.generate_signal)
+        fill_pending = self._pending_fills()
+        submit = self._timed('order_handling', self._submit)
+        value = self._timed('valuation', self._value)
+        record = self._timed('recording', self._record)
+        for i, current_date in enumerate(dates):
+            fill_pending(i)
+            historical_data = history(slice(None, i + 1))
+            signal = generate_signal(historical_data)
+            submit(i, signal)
+            record(i, current_date, value(i, historical_data), signal)
+
+    def _run_streaming(self):
+        arrays = self.data_handler.arrays
+        columns = list(arrays)
+        self.strategy.reset()
+        make_bar = self._timed('data_slicing', lambda row: dict(zip(columns, row)))
+        on_bar = self._timed('signal_generation', self.strategy.on_bar)
+        fill_pending = self._pending_fills()
+        submit = self._timed('order_handling', self._submit)
+        value = self._timed('valuation', self._value)
+        record = self._timed('recording', self._record)
+        for i, (current_date, row) in enumerate(zip(self.data_handler.index, zip(*arrays.values()))):
+            fill_pending(i)
+            signal = on_bar(make_bar(row))
+            submit(i, signal)
+            record(i, current_date, value(i), signal)
+
+    def _pending_fills(self):
+        # Delayed fills are timed as their own stage so that 'order_handling'
+        # stays one call per bar; without a fill delay there is nothing to time.
+        if not self._fill_delay:
+            return self._fill_pending
+        return self._timed('pending_fills', self._fill_pending)
+
+    def _value(self, i, historical_data=None):
+        if self.valuation == 'audit':
+            if historical_data is None:
+                historical_data = self.data_handler.data.iloc[:i + 1]
+            return self.portfolio.get_value(historical_data.assign(ticker=self.ticker))
+        return self.portfolio.mark_to_market({self.ticker: self._closes[i]})
+
+    def _record(self, i, current_date, portfolio_value, signal):
+        if self.recorder is not None:
+            self.recorder.record(i, portfolio_value, self.portfolio.cash, self.portfolio.positions)
+            return
+        self.results.append({
+            'date': current_date,
+            'portfolio_value': portfolio_value,
+            'current_cash': self.portfolio.cash,
+            'signal' : signal,
+            'portfolio': self.portfolio.positions.copy() if self.record_positions else None
+        })
+
+    def _submit(self, i, signal):
+        if signal['action'] not in ('BUY', 'SELL'):
+            return
+        self._count('orders')
+        if self._fill_delay:
+            self._pending.append((i, signal))
+        else:
+            self._fill(i, signal)
+
+    def _fill_pending(self, i):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        for _, signal in pending:
+            self._fill(i, signal)
+
+    def _fill(self, i, signal, quote=None):
+        action = signal['action']
+        quantity = signal['quantity']
+        price = self._fill_prices[i]
+        fees = 0.0
+        try:
+            if self.execution is not None:
+                fill = self.execution.execute(action, quantity, price, self._volumes[i], self.portfolio.cash,
+                                              self.portfolio.positions.get(self.ticker, 0), quote)
+                quantity, price, fees = fill['quantity'], fill['price'], fill['fees']
+            timestamp = self.data_handler.index[i]
+            if action == 'BUY':
+                self.portfolio.buy(self.ticker, quantity, price, fees, timestamp)
+            else:
+                self.portfolio.sell(self.ticker, quantity, price, fees, timestamp)
+        except ValueError as e:
+            # e.g. insufficient cash, or a SELL signal before any BUY
+            self._reject(i, signal, str(e))
+            return
+        self._count('fills')
+        if self.recorder is not None:
+            self.recorder.record_fill(i, self.ticker, action, quantity, price)
+
+    def _reject(self, i, signal, reason):
+        date = self.data_handler.index[min(i, len(self.data_handler.index) - 1)]
+        logger.info("Order rejected on %s: %s %s %s (%s)", date, signal['action'], signal['quantity'],
+                    self.ticker, reason)
+        self._count('rejected_orders')
+        self.rejected_orders.append({
+            'date': date,
+            'ticker': self.ticker,
+            'action': signal['action'],
+            'quantity': signal['quantity'],
+            'reason': reason
+        })
+
+    def _run_vectorized(self, signals=None):
+        data = self.data_handler.data
+        dates = data.index
+        n_bars = len(dates)
+        if signals is None:
+            with self._stage('signal_generation'):
+                signals = self.strategy.generate_signals(data)
+        elif len(signals) != n_bars:
+            raise ValueError(f"Expected {n_bars} signals, got {len(signals)}")
+        actions = signals['action'].to_numpy()
+        quantities = signals['quantity'].tolist()
+
+        with self._stage('order_handling'):
+            # Orders are path dependent (cash and share checks), but sparse: only
+            # bars with a fill touch the portfolio. Everything else is a forward
+            # fill of the state left by the last order.
+            order_bars = np.flatnonzero(actions != 'HOLD')
+            self._count('orders', len(order_bars))
+            fill_bars = order_bars + self._fill_delay
+            # Rejected by run() after the fills, in the same order as loop mode.
+            self._pending = [(i, {'action': actions[i], 'quantity': quantities[i]})
+                             for i in order_bars[fill_bars >= n_bars]]
+            order_bars = order_bars[fill_bars < n_bars]
+            fill_bars = fill_bars[fill_bars < n_bars]
+
+            quotes = None
+            if self.execution is not None and len(order_bars):
+                # Price every order's costs in one vectorized call; the sequential
+                # pass below only re-quotes orders that end up partially filled.
+                sides = np.where(actions[order_bars] == 'BUY', 1.0, -1.0)
+                requested = np.asarray(quantities, dtype=float)[order_bars]
+                fill_prices, fees = self.execution.quote(sides, requested, self._fill_prices[fill_bars],
+                                                         self._volumes[fill_bars])
+                quotes = list(zip(fill_prices.tolist(), fees.tolist()))
+
+            event_cash = [self.portfolio.cash]
+            event_shares = [self.portfolio.positions.get(self.ticker, 0)]
+            event_positions = [self.portfolio.positions.copy()]
+            marker = np.zeros(n_bars, dtype=np.int64)
+            for k, (i, j) in enumerate(zip(order_bars, fill_bars), start=1):
+                signal = {'action': actions[i], 'quantity': quantities[i]}
+                self._fill(j, signal, quotes[k - 1] if quotes else None)
+                event_cash.append(self.portfolio.cash)
+                event_shares.append(self.portfolio.positions.get(self.ticker, 0))
+                event_positions.append(self.portfolio.positions.copy())
+                marker[j] = k
+            marker = np.maximum.accumulate(marker)
+
+        with self._stage('valuation'):
+            cash = np.asarray(event_cash, dtype=float)[marker]
+            shares = np.asarray(event_shares, dtype=float)[marker]
+            closes = data['close'].ffill().to_numpy()
+            values = cash + np.where(shares != 0, shares * closes, 0.0)
+
+        with self._stage('recording'):
+            if self.recorder is not None:
+                self.recorder.equity[:] = values
+                self.recorder.cash[:] = cash
+                if self.recorder.positions is not None:
+                    self.recorder.positions[:, 0] = shares
+                return
+
+            action_list = actions.tolist()
+            for i, current_date in enumerate(dates):
+                self.results.append({
+                    'date': current_date,
+                    'portfolio_value': float(values[i]),
+                    'current_cash': float(cash[i]),
+                    'signal': {'action': action_list[i], 'quantity': quantities[i]},
+                    'portfolio': event_positions[marker[i]].copy() if self.record_positions else None
+                })
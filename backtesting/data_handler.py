@@ -1,20 +1,105 @@
 # backtesting/data_handler.py
 
+import numpy as np
 import pandas as pd
 
+
+def owning_array(array: np.ndarray) -> np.ndarray:
+    """The ndarray at the end of array's .base chain (the one owning the memory)."""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+class DataWindow:
+    """
+    Lightweight read-only view of the first `stop` bars of a DataHandler.
+    Column access returns NumPy slice views; nothing is copied.
+    """
+
+    def __init__(self, handler, stop: int):
+        self._handler = handler
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop
+
+    def __getitem__(self, column):
+        return self._handler.arrays[column][:self.stop]
+
+    @property
+    def columns(self):
+        return list(self._handler.arrays)
+
+    @property
+    def index(self):
+        return self._handler.index[:self.stop]
+
+    def to_frame(self):
+        return self._handler.data.iloc[:self.stop]
+
+
 class DataHandler:
-    def __init__(self, data):
-        # Your implementation
+    def __init__(self, data, copy_columns=None):
+        """
+        Args:
+            data: DataFrame of bars indexed by ascending dates
+            copy_columns: Columns to take a private copy of if they are still
+                writable through data (default: every column, which doubles
+                the memory of a writable frame). Backtester passes only the
+                columns its strategy's declared indicators read, since only
+                those need frozen memory to be cached.
+        """
         if data is None:
             raise ValueError("No dataset detected.")
         if data.empty:
             raise ValueError("Empty dataset detected.")
-        self.data = data
-        
-    def get_data_up_to(self, date):
+        if not data.index.is_monotonic_increasing:
+            raise ValueError("Index must be sorted ascending.")
+        self.index = data.index
+        # Bounds are fixed for the life of the handler; resolve them once.
+        self.start = self.index[0]
+        self.end = self.index[-1]
+        self.arrays = {}
+        for column in data.columns:
+            values = np.ascontiguousarray(data[column].to_numpy())
+            # A column whose memory can still be written through the source
+            # frame is copied once, so the handler's data can never change
+            # underneath it (and is safe to key caches on). Read-only
+            # buffers such as memory-mapped or shared frames stay zero-copy.
+            wanted = copy_columns is None or column in copy_columns
+            if wanted and owning_array(values).flags.writeable:
+                values = values.copy()
+            values.flags.writeable = False
+            self.arrays[column] = values
+        self.data = pd.DataFrame(self.arrays, index=self.index, copy=False)
+
+    @classmethod
+    def from_store(cls, store, ticker: str, start=None, end=None, columns=None):
+        """
+        Open a ticker from a ColumnarStore (data_processing/columnar_store.py).
+
+        The frame is memory-mapped, so only the pages for the requested dates
+        and columns are read from disk as the backtest touches them.
+        """
+        return cls(store.read(ticker, start, end, columns))
+
+    def position_of(self, date) -> int:
+        """
+        Position of the last bar at or before date (binary search).
+        """
         date = pd.Timestamp(date)
-        if date < self.data.index.min():
-            raise ValueError(f"Date {date} is before data starts at {self.data.index.min()}")
-        if date > self.data.index.max():
-            raise ValueError(f"Date {date} is after data ends at {self.data.index.max()}")
-        return self.data[self.data.index <= date]
+        if date < self.start:
+            raise ValueError(f"Date {date} is before data starts at {self.start}")
+        if date > self.end:
+            raise ValueError(f"Date {date} is after data ends at {self.end}")
+        return int(self.index.searchsorted(date, side='right')) - 1
+
+    def get_data_up_to(self, date):
+        return self.data.iloc[:self.position_of(date) + 1]
+
+    def get_window(self, date) -> DataWindow:
+        """
+        Zero-copy view of all bars up to and including date.
+        """
+        return DataWindow(self, self.position_of(date) + 1)
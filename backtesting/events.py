@@ -0,0 +1,328 @@
+# Event-driven engine: typed events, a priority queue and subscribed handlers
+import copy
+import heapq
+import itertools
+import logging
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from .portfolio import Portfolio
+
+logger = logging.getLogger(__name__)
+
+MARKET, SIGNAL, ORDER, FILL, END = 'market', 'signal', 'order', 'fill', 'end'
+
+# Processing order for events with the same timestamp: everything derived
+# from a bar (signal -> order -> fill) drains before the next bar.
+PRIORITY = {FILL: 0, ORDER: 1, SIGNAL: 2, MARKET: 3}
+
+_CHUNK = 65_536
+
+
+class MarketEvent:
+    __slots__ = ('timestamp', 'ticker', 'bar')
+    kind = MARKET
+
+    def __init__(self, timestamp, ticker, bar):
+        self.timestamp = timestamp
+        self.ticker = ticker
+        self.bar = bar
+
+
+class SignalEvent:
+    __slots__ = ('timestamp', 'ticker', 'action', 'quantity')
+    kind = SIGNAL
+
+    def __init__(self, timestamp, ticker, action, quantity):
+        self.timestamp = timestamp
+        self.ticker = ticker
+        self.action = action
+        self.quantity = quantity
+
+
+class OrderEvent:
+    __slots__ = ('timestamp', 'ticker', 'action', 'quantity')
+    kind = ORDER
+
+    def __init__(self, timestamp, ticker, action, quantity):
+        self.timestamp = timestamp
+        self.ticker = ticker
+        self.action = action
+        self.quantity = quantity
+
+
+class FillEvent:
+    __slots__ = ('timestamp', 'ticker', 'action', 'quantity', 'price', 'fees')
+    kind = FILL
+
+    def __init__(self, timestamp, ticker, action, quantity, price, fees=0.0):
+        self.timestamp = timestamp
+        self.ticker = ticker
+        self.action = action
+        self.quantity = quantity
+        self.price = price
+        self.fees = fees
+
+
+def frame_feed(df: pd.DataFrame, ticker: str, columns=None):
+    """
+    Lazy (timestamp, ticker, bar) stream over a DataFrame's bars.
+
+    Timestamps are int64 nanoseconds and bars are dicts of column -> value.
+    Rows are converted from the column arrays in chunks, so memory-mapped
+    frames are read incrementally.
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    timestamps = df.index.values.astype('M8[ns]').view(np.int64)
+    arrays = [df[column].to_numpy() for column in columns]
+    for start in range(0, len(timestamps), _CHUNK):
+        stop = start + _CHUNK
+        rows = zip(*(a[start:stop].tolist() for a in arrays))
+        for timestamp, row in zip(timestamps[start:stop].tolist(), rows):
+            yield timestamp, ticker, dict(zip(columns, row))
+
+
+class EventEngine:
+    """
+    Priority-queue event loop.
+
+    Market data comes from any number of timestamped feeds, merged lazily
+    with a k-way heap merge, so feeds at different frequencies interleave in
+    time order without being materialized. Events raised by handlers go on a
+    heap keyed by (timestamp, PRIORITY, sequence) and are dispatched before
+    the next market event with a later timestamp.
+
+    Handlers are plain callables subscribed per event kind; 'end' handlers
+    are called once with the last timestamp after the feeds are exhausted.
+    """
+
+    def __init__(self):
+        self._handlers = {MARKET: [], SIGNAL: [], ORDER: [], FILL: [], END: []}
+        self._feeds = []
+        self._queue = []
+        self._sequence = itertools.count()
+        self.now = None
+        self.events_processed = 0
+
+    def subscribe(self, kind: str, handler):
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown event kind: {kind}")
+        self._handlers[kind].append(handler)
+        return handler
+
+    def add_feed(self, feed):
+        """Add an iterable of (timestamp, ticker, bar) sorted by timestamp."""
+        self._feeds.append(feed)
+
+    def emit(self, event):
+        heapq.heappush(self._queue, (event.timestamp, PRIORITY[event.kind], next(self._sequence), event))
+
+    def _drain(self, until=None):
+        queue = self._queue
+        handlers = self._handlers
+        pop = heapq.heappop
+        processed = 0
+        while queue and (until is None or queue[0][0] <= until):
+            event = pop(queue)[3]
+            for handler in handlers[event.kind]:
+                handler(event)
+            processed += 1
+        self.events_processed += processed
+
+    def run(self):
+        """Replay every feed to the end and dispatch all resulting events."""
+        market_handlers = self._handlers[MARKET]
+        queue = self._queue
+        processed = 0
+        for timestamp, ticker, bar in heapq.merge(*self._feeds, key=itemgetter(0)):
+            if queue and queue[0][0] <= timestamp:
+                self._drain(timestamp)
+            self.now = timestamp
+            event = MarketEvent(timestamp, ticker, bar)
+            for handler in market_handlers:
+                handler(event)
+            processed += 1
+        self._drain()
+        self.events_processed += processed
+        for handler in self._handlers[END]:
+            handler(self.now)
+
+
+class StrategyHandler:
+    """Feeds each ticker's bars to its streaming strategy and emits signals."""
+
+    def __init__(self, engine: EventEngine, strategies: dict):
+        self.engine = engine
+        self.strategies = strategies
+        for strategy in strategies.values():
+            strategy.reset()
+        engine.subscribe(MARKET, self.on_market)
+
+    def on_market(self, event):
+        strategy = self.strategies.get(event.ticker)
+        if strategy is None:
+            return
+        signal = strategy.on_bar(event.bar)
+        if signal['action'] != 'HOLD':
+            self.engine.emit(SignalEvent(event.timestamp, event.ticker, signal['action'], signal['quantity']))
+
+
+class ExecutionHandler:
+    """
+    Turns orders into fills against the latest bar of their ticker, through
+    an optional ExecutionModel. With fill_at='next_open' orders wait for the
+    ticker's next bar.
+    """
+
+    def __init__(self, engine: EventEngine, portfolio: Portfolio, execution=None, rejected: list = None):
+        self.engine = engine
+        self.portfolio = portfolio
+        self.execution = execution
+        self.price_column = execution.price_column if execution else 'Adj Close'
+        self.delayed = bool(execution and execution.fill_delay)
+        self.rejected = [] if rejected is None else rejected
+        self._bars: dict = {}
+        self._pending: dict = {}
+        engine.subscribe(MARKET, self.on_market)
+        engine.subscribe(ORDER, self.on_order)
+
+    def on_market(self, event):
+        self._bars[event.ticker] = event.bar
+        if self._pending:
+            for order in self._pending.pop(event.ticker, ()):
+                self._fill(order, event.timestamp, event.bar)
+
+    def on_order(self, event):
+        if self.delayed:
+            self._pending.setdefault(event.ticker, []).append(event)
+        else:
+            self._fill(event, event.timestamp, self._bars[event.ticker])
+
+    def _fill(self, order, timestamp, bar):
+        quantity, price, fees = order.quantity, bar[self.price_column], 0.0
+        if self.execution is not None:
+            try:
+                fill = self.execution.execute(order.action, quantity, price, bar.get('Volume', np.inf),
+                                              self.portfolio.cash, self.portfolio.positions.get(order.ticker, 0))
+            except ValueError as e:
+                reject(self.rejected, timestamp, order, str(e))
+                return
+            quantity, price, fees = fill['quantity'], fill['price'], fill['fees']
+        self.engine.emit(FillEvent(timestamp, order.ticker, order.action, quantity, price, fees))
+
+    def unfilled(self) -> list:
+        return [order for orders in self._pending.values() for order in orders]
+
+
+class PortfolioHandler:
+    """
+    Turns signals into orders, books fills, marks positions to each bar's
+    'close' and records equity once per timestamp.
+    """
+
+    def __init__(self, engine: EventEngine, portfolio: Portfolio, rejected: list = None):
+        self.engine = engine
+        self.portfolio = portfolio
+        self.rejected = [] if rejected is None else rejected
+        self.timestamps: list = []
+        self.equity: list = []
+        self.cash: list = []
+        self._last = None
+        engine.subscribe(MARKET, self.on_market)
+        engine.subscribe(SIGNAL, self.on_signal)
+        engine.subscribe(FILL, self.on_fill)
+        engine.subscribe(END, self.on_end)
+
+    def _snapshot(self):
+        self.timestamps.append(self._last)
+        self.equity.append(self.portfolio.equity)
+        self.cash.append(self.portfolio.cash)
+
+    def on_market(self, event):
+        if event.timestamp != self._last:
+            if self._last is not None:
+                self._snapshot()
+            self._last = event.timestamp
+        self.portfolio.mark_to_market((event.bar['close'],), (event.ticker,))
+
+    def on_signal(self, event):
+        self.engine.emit(OrderEvent(event.timestamp, event.ticker, event.action, event.quantity))
+
+    def on_fill(self, event):
+        timestamp = pd.Timestamp(event.timestamp)
+        try:
+            if event.action == 'BUY':
+                self.portfolio.buy(event.ticker, event.quantity, event.price, event.fees, timestamp)
+            else:
+                self.portfolio.sell(event.ticker, event.quantity, event.price, event.fees, timestamp)
+        except ValueError as e:
+            reject(self.rejected, event.timestamp, event, str(e))
+
+    def on_end(self, timestamp):
+        if self._last is not None:
+            self._snapshot()
+
+    def to_frame(self) -> pd.DataFrame:
+        index = pd.DatetimeIndex(np.asarray(self.timestamps, dtype='M8[ns]'), name='date')
+        return pd.DataFrame({'portfolio_value': self.equity, 'current_cash': self.cash}, index=index)
+
+
+def reject(rejected: list, timestamp, order, reason: str):
+    date = pd.Timestamp(timestamp)
+    logger.info("Order rejected on %s: %s %s %s (%s)", date, order.action, order.quantity, order.ticker, reason)
+    rejected.append({'date': date, 'ticker': order.ticker, 'action': order.action,
+                     'quantity': order.quantity, 'reason': reason})
+
+
+class EventBacktester:
+    """
+    Backtest on the event engine: one feed per ticker (any mix of bar
+    frequencies), streaming strategies, a shared Portfolio and an optional
+    ExecutionModel.
+    """
+
+    def __init__(self, strategies, data: dict, initial_cash: float = 100000, execution=None):
+        """
+        Args:
+            strategies: Streaming Strategy applied to every ticker (copied per
+                ticker), or dict of ticker -> Strategy
+            data: Dict of ticker -> DataFrame with 'close' and 'Adj Close'
+                (plus 'Open' for next-open fills)
+            initial_cash: Starting cash
+            execution: ExecutionModel for costs, slippage and fill timing
+        """
+        if not data:
+            raise ValueError("No dataset detected.")
+        if isinstance(strategies, dict):
+            missing = set(data) - set(strategies)
+            if missing:
+                raise ValueError(f"No strategy for tickers: {missing}")
+            strategies = {t: strategies[t] for t in data}
+        else:
+            strategies = {t: copy.deepcopy(strategies) for t in data}
+        for ticker, strategy in strategies.items():
+            if not getattr(strategy, 'supports_streaming', False):
+                raise ValueError(f"Strategy for {ticker} does not support streaming (on_bar)")
+        self.data = data
+        self.portfolio = Portfolio(initial_cash)
+        self.rejected_orders: list = []
+        self.engine = EventEngine()
+        # Subscription order matters for market events: pending next-open
+        # orders fill before the strategy sees the bar.
+        self.execution = ExecutionHandler(self.engine, self.portfolio, execution, self.rejected_orders)
+        self.strategies = StrategyHandler(self.engine, strategies)
+        self.book = PortfolioHandler(self.engine, self.portfolio, self.rejected_orders)
+        for ticker, df in data.items():
+            self.engine.add_feed(frame_feed(df, ticker))
+
+    def run(self) -> pd.DataFrame:
+        """
+        Returns:
+            DataFrame indexed by timestamp with portfolio_value and current_cash
+        """
+        self.engine.run()
+        for order in self.execution.unfilled():
+            reject(self.rejected_orders, order.timestamp, order, "No bar left to fill the order")
+        return self.book.to_frame()
@@ -0,0 +1,99 @@
+# Execution model: commissions, slippage and partial fills
+import math
+import numpy as np
+
+
+class ExecutionModel:
+    """
+    Turns an order into a fill with trading costs.
+
+    - Commissions: fixed per share plus basis points of traded notional
+    - Slippage: half the quoted spread plus a volume-based impact term
+      (impact_bps per 100% of the bar's volume traded)
+    - Partial fills: capped by max_participation of the bar's volume, by the
+      shares held (sells) and by the cash available (buys)
+    - Timing: fill on the signal bar's 'Adj Close', or on the next bar's 'Open'
+
+    quote() is vectorized so engines can price every order in one call.
+    """
+
+    def __init__(self, commission_per_share: float = 0.0, commission_bps: float = 0.0,
+                 spread_bps: float = 0.0, impact_bps: float = 0.0, max_participation: float = None,
+                 fill_at: str = 'close', allow_partial: bool = True):
+        if fill_at not in ('close', 'next_open'):
+            raise ValueError(f"Unknown fill timing: {fill_at}")
+        self.commission_per_share = commission_per_share
+        self.commission_bps = commission_bps
+        self.spread_bps = spread_bps
+        self.impact_bps = impact_bps
+        self.max_participation = max_participation
+        self.fill_at = fill_at
+        self.allow_partial = allow_partial
+
+    @property
+    def fill_delay(self) -> int:
+        """Bars between the signal and the fill."""
+        return 1 if self.fill_at == 'next_open' else 0
+
+    @property
+    def price_column(self) -> str:
+        return 'Open' if self.fill_at == 'next_open' else 'Adj Close'
+
+    def quote(self, sides, quantities, prices, volumes):
+        """
+        Fill price and commission for one or many orders.
+
+        Args:
+            sides: +1 for buys, -1 for sells
+            quantities: Shares per order
+            prices: Reference price per order
+            volumes: Bar volume per order (0 or inf disables impact)
+
+        Returns:
+            (fill_prices, fees) arrays
+        """
+        sides = np.asarray(sides, dtype=float)
+        quantities = np.asarray(quantities, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        volumes = np.asarray(volumes, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            participation = np.where(volumes > 0, quantities / volumes, 0.0)
+        slippage = (self.spread_bps / 2 + self.impact_bps * participation) / 1e4
+        fill_prices = prices * (1 + sides * slippage)
+        fees = quantities * (self.commission_per_share + fill_prices * self.commission_bps / 1e4)
+        return fill_prices, fees
+
+    def execute(self, action: str, quantity, price: float, volume: float, cash: float,
+                position: float, quote=None) -> dict:
+        """
+        Size and price a single order against the current book.
+
+        Args:
+            quote: Optional precomputed (fill_price, fees) for the full quantity
+
+        Returns:
+            Dict with the filled 'quantity', 'price' and 'fees'
+
+        Raises:
+            ValueError: If nothing can be filled (or a partial fill is not allowed)
+        """
+        side = 1 if action == 'BUY' else -1
+        requested = quantity
+        if self.max_participation is not None and np.isfinite(volume):
+            quantity = min(quantity, math.floor(self.max_participation * volume))
+        if side < 0:
+            quantity = min(quantity, position)
+        if quote is not None and quantity == requested:
+            fill_price, fees = quote
+        else:
+            fill_price, fees = self.quote(side, quantity, price, volume)
+        if side > 0 and quantity * fill_price + fees > cash:
+            per_share = fill_price * (1 + self.commission_bps / 1e4) + self.commission_per_share
+            quantity = min(quantity, math.floor(cash / per_share))
+            # A smaller order has less impact, so the re-quoted cost still fits.
+            fill_price, fees = self.quote(side, quantity, price, volume)
+        if quantity <= 0:
+            raise ValueError(f"{action} {requested} not fillable (cash {cash:.2f}, position {position}, volume {volume})")
+        if quantity < requested and not self.allow_partial:
+            raise ValueError(f"{action} {requested} only partially fillable ({quantity}); partial fills disabled")
+        return {'quantity': quantity, 'price': float(fill_price), 'fees': float(fees)}
@@ -0,0 +1,263 @@
+# NumPy indicator kernels and a shared LRU cache of their results
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .data_handler import owning_array
+
+# Elements per block for window reductions that need every window's values
+_BLOCK = 1 << 20
+
+
+def _float(values) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def sma(values, window: int) -> np.ndarray:
+    """
+    Simple moving average from one cumulative sum. NaN until the window is
+    full or while it contains a NaN, like pandas' rolling(window).mean().
+    """
+    x = _float(values)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if window > n:
+        return out
+    missing = np.isnan(x)
+    # Summing deviations from the first value keeps the running sum small,
+    # so differences of it lose little precision on long price series.
+    offset = x[~missing][0] if not missing.all() else 0.0
+    sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, x - offset))))
+    gaps = np.concatenate(([0], np.cumsum(missing)))
+    window_sums = sums[window:] - sums[:-window]
+    window_gaps = gaps[window:] - gaps[:-window]
+    out[window - 1:] = np.where(window_gaps == 0, window_sums / window + offset, np.nan)
+    return out
+
+
+def rolling_std(values, window: int, ddof: int = 1) -> np.ndarray:
+    """
+    Rolling standard deviation, two-pass per window (no running sum of
+    squares), computed over strided window views in bounded blocks.
+    """
+    x = _float(values)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window <= ddof:
+        raise ValueError(f"window must be greater than ddof ({ddof})")
+    if window > n:
+        return out
+    windows = sliding_window_view(x, window)
+    step = max(1, _BLOCK // window)
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        out[window - 1 + start:window - 1 + start + len(block)] = block.std(axis=1, ddof=ddof)
+    return out
+
+
+def ema(values, span: float = None, alpha: float = None, min_periods: int = 1) -> np.ndarray:
+    """
+    Exponential moving average, y[t] = alpha * x[t] + (1 - alpha) * y[t-1],
+    seeded with the first value (pandas' ewm(adjust=False)). NaN inputs carry
+    the previous average forward.
+
+    Args:
+        span: Decay as a span, alpha = 2 / (span + 1)
+        alpha: Smoothing factor in (0, 1] (instead of span)
+        min_periods: Values seen before the output is reported
+    """
+    if (span is None) == (alpha is None):
+        raise ValueError("Pass exactly one of span or alpha")
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1]")
+    x = _float(values)
+    # The recursion is sequential, so it cannot be a single NumPy call; a
+    # loop over Python floats avoids per-element NumPy scalar overhead.
+    decay = 1.0 - alpha
+    average = float('nan')
+    seen = 0
+    out = []
+    append = out.append
+    for value in x.tolist():
+        if value == value:
+            average = value if seen == 0 else alpha * value + decay * average
+            seen += 1
+        append(average if seen >= min_periods else float('nan'))
+    return np.array(out, dtype=float)
+
+
+def rsi(values, window: int = 14) -> np.ndarray:
+    """Wilder's relative strength index (0-100) with smoothing alpha = 1 / window."""
+    x = _float(values)
+    out = np.full(len(x), np.nan)
+    if len(x) < 2:
+        return out
+    delta = np.diff(x)
+    gain = ema(np.where(delta > 0, delta, 0.0), alpha=1.0 / window, min_periods=window)
+    loss = ema(np.where(delta < 0, -delta, 0.0), alpha=1.0 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[1:] = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    out[1:][np.isnan(gain) | np.isnan(loss)] = np.nan
+    return out
+
+
+def atr(high, low, close, window: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing; the first bar's range is high - low."""
+    h, l, c = _float(high), _float(low), _float(close)
+    previous = np.concatenate(([np.nan], c[:-1]))
+    with np.errstate(invalid='ignore'):
+        true_range = np.fmax(h - l, np.fmax(np.abs(h - previous), np.abs(l - previous)))
+    return ema(true_range, alpha=1.0 / window, min_periods=window)
+
+
+# name -> (kernel, default input columns)
+INDICATORS = {
+    'sma': (sma, ('close',)),
+    'ema': (ema, ('close',)),
+    'rolling_std': (rolling_std, ('close',)),
+    'rsi': (rsi, ('close',)),
+    'atr': (atr, ('High', 'Low', 'Close')),
+}
+
+
+class Indicator:
+    """
+    Declaration of one indicator a strategy reads, e.g.
+    Indicator('sma', window=20) or Indicator('atr', 'High', 'Low', 'close', window=14).
+    """
+
+    __slots__ = ('name', 'columns', 'params')
+
+    def __init__(self, name: str, *columns, **params):
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+        self.name = name
+        self.columns = columns or INDICATORS[name][1]
+        self.params = params
+
+    @property
+    def key(self) -> tuple:
+        return self.name, tuple(sorted(self.params.items()))
+
+    def __eq__(self, other):
+        return isinstance(other, Indicator) and (self.key, self.columns) == (other.key, other.columns)
+
+    def __hash__(self):
+        return hash((self.key, self.columns))
+
+    def __repr__(self):
+        args = [repr(self.name)] + [repr(c) for c in self.columns] + [f'{k}={v!r}' for k, v in self.params.items()]
+        return f"Indicator({', '.join(args)})"
+
+
+class IndicatorCache:
+    """
+    Size-bounded LRU cache of indicator results.
+
+    Entries are keyed by the identity of the input arrays (owning buffer,
+    offset, length, stride and dtype) plus the indicator name and parameters,
+    so every Series or view over the same column of the same frame hits the
+    same entry, while prefixes and other frames do not. A weak reference to
+    each owning buffer is checked on lookup, so a recycled id() never returns
+    another array's result.
+
+    Only inputs whose owning buffer is read-only are cached: a writable
+    buffer can be edited in place (pandas writes through to it on
+    df.loc[...] = ...), which would leave a stale entry. Such inputs are
+    computed every time and counted in `uncached`. DataHandler frames
+    (Backtester.data_handler.data), memory-mapped store frames and shared
+    sweep frames are read-only, so they are cached.
+
+    Results are read-only arrays shared by every caller.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    @staticmethod
+    def _identity(array: np.ndarray):
+        root = owning_array(array)
+        key = (id(root), array.__array_interface__['data'][0], array.shape, array.strides, array.dtype.str)
+        return key, root
+
+    def get(self, name: str, *arrays, **params) -> np.ndarray:
+        """
+        Indicator name over the given input arrays, computed at most once
+        while the entry stays cached.
+        """
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+        arrays = [np.asarray(a) for a in arrays]
+        identities = [self._identity(a) for a in arrays]
+        if any(root.flags.writeable for _, root in identities):
+            self.uncached += 1
+            result = INDICATORS[name][0](*arrays, **params)
+            result.flags.writeable = False
+            return result
+        key = (name, tuple(sorted(params.items())), tuple(k for k, _ in identities))
+        entry = self._entries.get(key)
+        if entry is not None:
+            refs, result = entry
+            if all(ref() is root for ref, (_, root) in zip(refs, identities)):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        self.misses += 1
+        result = INDICATORS[name][0](*arrays, **params)
+        result.flags.writeable = False
+        try:
+            refs = tuple(weakref.ref(root) for _, root in identities)
+        except TypeError:
+            return result
+        self._entries[key] = (refs, result)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+    def compute(self, indicator: Indicator, data) -> np.ndarray:
+        """Indicator over the columns of data (DataFrame, DataWindow or dict of arrays)."""
+        return self.get(indicator.name, *(data[column] for column in indicator.columns), **indicator.params)
+
+    @staticmethod
+    def input_columns(strategies) -> set:
+        """Columns read by the indicators declared by strategies."""
+        return {column for strategy in strategies for spec in strategy.indicators().values()
+                for column in spec.columns}
+
+    def precompute(self, strategies, data) -> int:
+        """
+        Compute the union of the indicators declared by strategies over data.
+
+        Returns:
+            Number of distinct indicators
+        """
+        wanted = {spec for strategy in strategies for spec in strategy.indicators().values()}
+        for spec in wanted:
+            self.compute(spec, data)
+        return len(wanted)
+
+
+# Process-wide cache shared by every strategy
+indicator_cache = IndicatorCache()
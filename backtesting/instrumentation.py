@@ -0,0 +1,129 @@
+# Opt-in per-stage timers, counters and hooks
+import math
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Histogram buckets are powers of two in microseconds: bucket b holds
+# durations in [2**(b-1), 2**b) us, bucket 0 anything under 1 us.
+N_BUCKETS = 40
+
+
+class StageStats:
+    """Call count, total/min/max time and a log2 histogram for one stage."""
+
+    __slots__ = ('calls', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = [0] * N_BUCKETS
+
+    def add(self, seconds: float):
+        self.calls += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = math.frexp(seconds * 1e6)[1] if seconds >= 1e-6 else 0
+        self.buckets[min(bucket, N_BUCKETS - 1)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper edge (seconds) of the histogram bucket holding the q-quantile."""
+        target = q * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min(2.0 ** bucket / 1e6, self.max)
+        return self.max
+
+
+class Instrumentation:
+    """
+    Timing histograms per stage, event counters and a hook registry.
+
+    Components take an optional instance and do nothing extra without one,
+    so the disabled cost is a single None check per run (or per order).
+
+    Hooks are called as hook(kind, name, value) with kind 'stage' (value in
+    seconds) or 'counter' (value is the increment).
+    """
+
+    def __init__(self):
+        self.stages: dict = {}
+        self.counters: dict = {}
+        self._hooks: list = []
+
+    def add_hook(self, hook):
+        self._hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def record(self, name: str, seconds: float):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        stats.add(seconds)
+        for hook in self._hooks:
+            hook('stage', name, seconds)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        for hook in self._hooks:
+            hook('counter', name, n)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name: str, fn):
+        """Wrap fn so every call is recorded under stage name."""
+        record = self.record
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, clock() - start)
+        return wrapper
+
+    def reset(self):
+        self.stages.clear()
+        self.counters.clear()
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per stage: calls, total and mean time, min/max and
+        histogram-based p50/p95 (seconds), sorted by total time.
+        """
+        rows = [{
+            'stage': name,
+            'calls': s.calls,
+            'total_s': s.total,
+            'mean_s': s.total / s.calls,
+            'min_s': s.min,
+            'p50_s': s.quantile(0.5),
+            'p95_s': s.quantile(0.95),
+            'max_s': s.max,
+        } for name, s in self.stages.items()]
+        columns = ['stage', 'calls', 'total_s', 'mean_s', 'min_s', 'p50_s', 'p95_s', 'max_s']
+        return pd.DataFrame(rows, columns=columns).sort_values('total_s', ascending=False, ignore_index=True)
+
+    def report(self) -> str:
+        """Human-readable stage table followed by the counters."""
+        lines = [self.summary().to_string(index=False, float_format=lambda x: f'{x:.6f}')]
+        lines += [f'{name}: {value}' for name, value in sorted(self.counters.items())]
+        return '\n'.join(lines)
@@ -0,0 +1,138 @@
+# Array-backed trade ledger with interned ticker ids
+import numpy as np
+import pandas as pd
+
+SIDES = {'BUY': 1, 'SELL': -1}
+ACTIONS = {1: 'BUY', -1: 'SELL'}
+
+TRADE_DTYPE = np.dtype([
+    ('timestamp', 'M8[ns]'),
+    ('ticker_id', 'i4'),
+    ('side', 'i1'),
+    ('quantity', 'f8'),
+    ('price', 'f8'),
+    ('fees', 'f8'),
+])
+
+
+class TickerRegistry:
+    """Interns ticker symbols as small integer ids."""
+
+    def __init__(self):
+        self._ids: dict = {}
+        self.symbols: list = []
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def id_for(self, ticker: str) -> int:
+        ticker_id = self._ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = self._ids[ticker] = len(self.symbols)
+            self.symbols.append(ticker)
+        return ticker_id
+
+    def symbol(self, ticker_id: int) -> str:
+        return self.symbols[ticker_id]
+
+
+class Trade:
+    """A single ledger row, materialized on access."""
+
+    __slots__ = ('timestamp', 'ticker', 'action', 'quantity', 'price', 'fees')
+
+    def __init__(self, timestamp, ticker, action, quantity, price, fees):
+        self.timestamp = timestamp
+        self.ticker = ticker
+        self.action = action
+        self.quantity = quantity
+        self.price = price
+        self.fees = fees
+
+    @property
+    def notional(self) -> float:
+        return self.quantity * self.price
+
+    def __eq__(self, other):
+        if not isinstance(other, Trade):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self):
+        return (f"Trade({self.timestamp}, {self.ticker}, {self.action}, quantity={self.quantity}, "
+                f"price={self.price:.4f}, fees={self.fees:.4f})")
+
+
+class TradeLedger:
+    """
+    Fixed-schema trade history stored in a growable NumPy structured array
+    (timestamp, ticker id, side, quantity, price, fees). Capacity doubles as
+    needed, so appends are amortized O(1) with no per-trade Python objects.
+    """
+
+    def __init__(self, registry: TickerRegistry = None, capacity: int = 256):
+        self.registry = registry or TickerRegistry()
+        self._rows = np.zeros(capacity, dtype=TRADE_DTYPE)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, ticker: str, action: str, quantity: float, price: float, fees: float = 0.0):
+        if self._size == len(self._rows):
+            grown = np.zeros(max(1, 2 * len(self._rows)), dtype=TRADE_DTYPE)
+            grown[:self._size] = self._rows
+            self._rows = grown
+        self._rows[self._size] = (
+            np.datetime64('NaT') if timestamp is None else pd.Timestamp(timestamp).to_datetime64(),
+            self.registry.id_for(ticker),
+            SIDES[action],
+            quantity,
+            price,
+            fees,
+        )
+        self._size += 1
+
+    def records(self) -> np.ndarray:
+        """Structured array view of the recorded trades."""
+        return self._rows[:self._size]
+
+    def _trade(self, row) -> Trade:
+        timestamp = pd.Timestamp(row['timestamp']) if not np.isnat(row['timestamp']) else None
+        quantity = float(row['quantity'])
+        return Trade(timestamp, self.registry.symbol(int(row['ticker_id'])), ACTIONS[int(row['side'])],
+                     int(quantity) if quantity.is_integer() else quantity, float(row['price']), float(row['fees']))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._trade(row) for row in self.records()[key]]
+        if key < 0:
+            key += self._size
+        if not 0 <= key < self._size:
+            raise IndexError("Trade index out of range")
+        return self._trade(self._rows[key])
+
+    def __iter__(self):
+        for row in self.records():
+            yield self._trade(row)
+
+    def __eq__(self, other):
+        if not isinstance(other, TradeLedger):
+            return NotImplemented
+        return self.to_frame().equals(other.to_frame())
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = self.records()
+        symbols = np.array(self.registry.symbols, dtype=object)
+        return pd.DataFrame({
+            'timestamp': rows['timestamp'],
+            'ticker': symbols[rows['ticker_id']] if len(rows) else np.array([], dtype=object),
+            'action': np.where(rows['side'] > 0, 'BUY', 'SELL'),
+            'quantity': rows['quantity'],
+            'price': rows['price'],
+            'fees': rows['fees'],
+        })
+
+    def to_parquet(self, path: str):
+        """Write the ledger to Parquet (requires pyarrow or fastparquet)."""
+        self.to_frame().to_parquet(path, index=False)
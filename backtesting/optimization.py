@@ -0,0 +1,188 @@
+# Parameter sweeps for strategy optimization
+import gc
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+
+import numpy as np
+import pandas as pd
+
+from .backtester import Backtester
+from .data_handler import DataHandler
+from .indicators import IndicatorCache, indicator_cache
+from .strategy import MovingAverageCrossover
+
+_RISK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'risk-analytics')
+if _RISK_DIR not in sys.path:
+    sys.path.insert(0, _RISK_DIR)
+from risk_analyzer import RiskAnalyzer
+
+
+def parameter_grid(grid: dict) -> list:
+    """
+    Expand a dict of parameter name -> candidate values into every combination.
+
+    Example:
+        parameter_grid({'short_window': [10, 20], 'long_window': [50]})
+        -> [{'short_window': 10, 'long_window': 50}, {'short_window': 20, 'long_window': 50}]
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+class SharedFrame:
+    """
+    Numeric DataFrame published once in shared memory so worker processes can
+    rebuild it as a zero-copy view instead of receiving a pickled copy.
+
+    The index must be a DatetimeIndex; it is stored as int64 ticks, with the
+    unit and time zone kept in the spec, so no Python objects are shared.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        if not isinstance(data.index, pd.DatetimeIndex):
+            raise ValueError("SharedFrame requires a DatetimeIndex")
+        numeric = data.select_dtypes(include='number')
+        values = numeric.to_numpy(dtype=float).T  # one contiguous row per column
+        index = data.index.asi8  # naive ticks, UTC for tz-aware indexes
+        self._shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes + index.nbytes, 1))
+        np.ndarray(values.shape, dtype=float, buffer=self._shm.buf)[:] = values
+        np.ndarray(index.shape, dtype=np.int64, buffer=self._shm.buf, offset=values.nbytes)[:] = index
+        self.spec = {
+            'name': self._shm.name,
+            'shape': values.shape,
+            'columns': list(numeric.columns),
+            'unit': data.index.unit,
+            'tz': str(data.index.tz) if data.index.tz is not None else None,
+        }
+
+    @staticmethod
+    def attach(spec: dict):
+        """
+        Map a published frame into this process.
+
+        Returns:
+            (SharedMemory handle, DataFrame view); keep the handle alive while
+            the frame is in use
+        """
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        n_cols, n_rows = spec['shape']
+        values = np.ndarray((n_cols, n_rows), dtype=float, buffer=shm.buf)
+        # Workers only read the frame; read-only also lets indicator results be cached.
+        values.flags.writeable = False
+        ticks = np.ndarray((n_rows,), dtype=np.int64, buffer=shm.buf, offset=values.nbytes)
+        index = pd.DatetimeIndex(ticks.view(f"datetime64[{spec['unit']}]"))
+        if spec['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(spec['tz'])
+        frame = pd.DataFrame(values.T, index=index, columns=spec['columns'], copy=False)
+        return shm, frame
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def backtest_metrics(equity, initial_cash: float, risk_free_rate: float = 0.02,
+                     confidence: float = 0.95) -> dict:
+    """
+    RiskAnalyzer metrics for the equity curve of a finished backtest.
+
+    Args:
+        equity: Portfolio value per bar (Series or array)
+    """
+    equity = pd.Series(equity, dtype=float)
+    returns = equity.pct_change().dropna()
+    if returns.empty:
+        raise ValueError("Backtest too short to compute returns.")
+    metrics = RiskAnalyzer(returns).get_metrics(risk_free_rate, confidence)
+    metrics['final_value'] = float(equity.iloc[-1])
+    metrics['total_return'] = float(equity.iloc[-1] / initial_cash - 1)
+    return metrics
+
+
+_worker_shm = None
+_worker_data = None
+
+
+def _init_worker(spec, strategies=()):
+    global _worker_shm, _worker_data
+    _worker_shm, _worker_data = SharedFrame.attach(spec)
+    # Pool workers exit through multiprocessing, which runs registered finalizers.
+    util.Finalize(None, _release_worker, exitpriority=10)
+    indicator_cache.precompute(strategies, _worker_data)
+
+
+def _release_worker():
+    global _worker_shm, _worker_data
+    shm, _worker_shm, _worker_data = _worker_shm, None, None
+    if shm is not None:
+        # Views of the buffer must be gone before the mapping can be closed.
+        gc.collect()
+        shm.close()
+
+
+def _evaluate(data, strategy_cls, params, ticker, initial_cash, execution):
+    bt = Backtester(strategy_cls(**params), data, ticker, initial_cash,
+                    results_format='columnar', record_positions=False, execution=execution)
+    results = bt.run(mode='vectorized')
+    metrics = backtest_metrics(results['portfolio_value'].to_numpy(), initial_cash)
+    metrics['num_trades'] = len(bt.portfolio.trades)
+    return metrics
+
+
+def _evaluate_shared(task):
+    return _evaluate(_worker_data, *task)
+
+
+def run_sweep(data: pd.DataFrame, param_grid, ticker: str, strategy_cls=MovingAverageCrossover,
+              initial_cash: float = 100000, processes: int = None, execution=None) -> pd.DataFrame:
+    """
+    Backtest every parameter combination and collect RiskAnalyzer metrics.
+
+    Runs use the vectorized engine and are fanned out across a process pool.
+    The price data is placed in shared memory once; workers map it instead of
+    receiving a pickled copy per task. The indicators declared by the
+    strategies are precomputed once per process on that read-only frame, so
+    every run sharing an indicator reads the cached result.
+
+    Args:
+        data: Full DataFrame (from MarketDataProcessor) with 'close' and 'Adj Close'
+        param_grid: Dict of name -> values (expanded with parameter_grid) or a
+            list of keyword dicts for strategy_cls
+        ticker: Symbol being traded
+        strategy_cls: Strategy class built with each parameter combination
+        initial_cash: Starting cash for every run
+        processes: Worker processes (default: all cores; 1 runs in-process)
+        execution: Optional ExecutionModel applied to every run
+
+    Returns:
+        DataFrame with one row per combination: parameters followed by metrics
+    """
+    combos = parameter_grid(param_grid) if isinstance(param_grid, dict) else list(param_grid)
+    if not combos:
+        raise ValueError("Empty parameter grid.")
+    processes = processes or os.cpu_count() or 1
+    tasks = [(strategy_cls, params, ticker, initial_cash, execution) for params in combos]
+    strategies = [strategy_cls(**params) for params in combos]
+
+    if processes == 1 or len(combos) == 1:
+        # Frozen once here, so no run copies the indicator inputs again.
+        data = DataHandler(data, copy_columns=IndicatorCache.input_columns(strategies)).data
+        indicator_cache.precompute(strategies, data)
+        rows = [_evaluate(data, *task) for task in tasks]
+    else:
+        with SharedFrame(data) as shared:
+            with ProcessPoolExecutor(max_workers=min(processes, len(combos)),
+                                     initializer=_init_worker, initargs=(shared.spec, strategies)) as pool:
+                chunksize = max(1, len(tasks) // (processes * 4))
+                rows = list(pool.map(_evaluate_shared, tasks, chunksize=chunksize))
+
+    return pd.concat([pd.DataFrame(combos), pd.DataFrame(rows)], axis=1)
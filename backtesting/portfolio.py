@@ -1,45 +1,120 @@
 # Portfolio class goes here
+from .ledger import TradeLedger
 
 
 class Portfolio:
     def __init__(self, initial_cash: float = 100000):
         self.initial_cash = initial_cash
         self.positions: dict = {}
-        self.trades: list = []
+        self.trades = TradeLedger()
         self.cash = initial_cash
+        # Running totals, updated on every fill so queries never rescan the ledger.
+        self.average_costs: dict = {}
+        self.cost_basis = 0.0
+        self.realized_pnl = 0.0
+        self.fees_paid = 0.0
+        self.turnover = 0.0
+        # Last known price per ticker and the open positions valued at those marks.
+        self.marks: dict = {}
+        self.market_value = 0.0
 
-    def buy(self,ticker:str,quantity:int, price:float):
-        cost = quantity * price
+    @staticmethod
+    def _check_quantity(quantity):
+        if not quantity > 0:
+            raise ValueError(f"Quantity must be positive, got {quantity}")
+
+    def buy(self,ticker:str,quantity:int, price:float, fees: float = 0.0, timestamp=None):
+        self._check_quantity(quantity)
+        cost = quantity * price + fees
         if self.cash < cost:
             raise ValueError('Not enough cash to make this purchase.')
         self.cash = self.cash - cost
-        self.positions[ticker] = self.positions.get(ticker, 0) + quantity
-        self.trades.append({
-            'ticker': ticker,
-            'action': 'BUY',
-            'quantity': quantity,
-            'price': price,
-            'cost': cost
-        })
-    
-    def sell(self, ticker:str, quantity:int, price:float):
+        current_position = self.positions.get(ticker, 0)
+        new_position = current_position + quantity
+        average_cost = self.average_costs.get(ticker, 0.0)
+        self.average_costs[ticker] = (average_cost * current_position + quantity * price) / new_position
+        self.positions[ticker] = new_position
+        self.market_value += quantity * self.marks.setdefault(ticker, price)
+        self.cost_basis += quantity * price
+        self.realized_pnl -= fees
+        self.fees_paid += fees
+        self.turnover += quantity * price
+        self.trades.append(timestamp, ticker, 'BUY', quantity, price, fees)
+
+    def sell(self, ticker:str, quantity:int, price:float, fees: float = 0.0, timestamp=None):
+        self._check_quantity(quantity)
         current_position = self.positions.get(ticker, 0)
         if current_position < quantity:
             raise ValueError(f"Insufficient shares: trying to sell {quantity}, only have {current_position}")
-        gain = quantity * price
+        gain = quantity * price - fees
         self.cash = self.cash + gain
-        self.positions[ticker] = current_position - quantity
-        self.trades.append({
-            'ticker': ticker,
-            'action': 'SELL',
-            'quantity': quantity,
-            'price': price,
-            'gain': gain
-        })
+        average_cost = self.average_costs[ticker]
+        self.cost_basis -= quantity * average_cost
+        self.realized_pnl += quantity * (price - average_cost) - fees
+        self.fees_paid += fees
+        self.turnover += quantity * price
+        self.market_value -= quantity * self.marks[ticker]
+        if current_position == quantity:
+            # Closed positions are dropped rather than kept as zero-share entries.
+            del self.positions[ticker]
+            del self.average_costs[ticker]
+            if not self.positions:
+                self.market_value = 0.0
+        else:
+            self.positions[ticker] = current_position - quantity
+        self.trades.append(timestamp, ticker, 'SELL', quantity, price, fees)
+
+    def unrealized_pnl(self, prices: dict = None) -> float:
+        """
+        Open P&L against average cost: O(1) at the latest marks, or at the
+        prices of a ticker -> price mapping (one lookup per open position).
+        """
+        if prices is None:
+            return self.market_value - self.cost_basis
+        return sum(shares * prices[ticker] for ticker, shares in self.positions.items()) - self.cost_basis
+
+    @property
+    def equity(self) -> float:
+        """Cash plus open positions at their latest marks."""
+        return self.cash + self.market_value
+
+    # Positions are long-only (sell() cannot exceed the holding), so gross and
+    # net exposure both equal the running market value.
+    @property
+    def gross_exposure(self) -> float:
+        """Absolute value of open positions at their latest marks."""
+        return self.market_value
+
+    @property
+    def net_exposure(self) -> float:
+        """Long minus short value of open positions at their latest marks."""
+        return self.market_value
+
+    def mark_to_market(self, prices, tickers=None) -> float:
+        """
+        Revalue the book at the current prices and return total equity.
+
+        Only the tickers passed in are touched, so the cost is proportional to
+        the size of the price update rather than the history. Tickers without
+        a new price (or with a NaN price) keep their last mark.
+
+        Args:
+            prices: Mapping of ticker -> price, or a price vector aligned with tickers
+            tickers: Symbols for a price vector
+        """
+        items = zip(tickers, prices) if tickers is not None else prices.items()
+        for ticker, price in items:
+            if price != price:
+                continue
+            shares = self.positions.get(ticker)
+            if shares:
+                self.market_value += shares * (price - self.marks[ticker])
+            self.marks[ticker] = price
+        return self.cash + self.market_value
 
     def get_value(self, df):
         """
-        Calculate portfolio value.
+        Calculate portfolio value from scratch (audit path; see mark_to_market).
         
         Args:
             df: DataFrame with 'ticker' and 'close' columns
@@ -52,6 +127,3 @@ class Portfolio:
             else:
                 raise ValueError(f"No price data for {ticker}")
         return total
-
-
-
@@ -0,0 +1,197 @@
+# Multi-asset, multi-strategy backtester over a shared calendar
+import copy
+import logging
+import numpy as np
+import pandas as pd
+from .portfolio import Portfolio
+from .results import ResultsRecorder
+
+_ACTION_CODES = {'BUY': 1, 'SELL': -1}
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioBacktester:
+    def __init__(self, strategies, data: dict, initial_cash: float = 100000,
+                 results_format: str = 'records', record_positions: bool = True, execution=None):
+        """
+        Initialize a universe backtest that shares one cash balance.
+
+        Args:
+            strategies: Strategy applied to every symbol (copied per symbol),
+                or dict of ticker -> Strategy
+            data: Dict of ticker -> DataFrame with 'close' and 'Adj Close' columns
+            initial_cash: Starting cash
+            results_format: 'records' (list of per-date dicts) or 'columnar'
+                (preallocated arrays, returned as a DataFrame)
+            record_positions: Keep a per-date position snapshot
+            execution: ExecutionModel for costs, slippage and partial fills
+                (default: fill the full quantity at 'Adj Close' with no costs)
+        """
+        if results_format not in ('records', 'columnar'):
+            raise ValueError(f"Unknown results format: {results_format}")
+        if not data:
+            raise ValueError("No dataset detected.")
+        self.tickers = list(data)
+        if isinstance(strategies, dict):
+            missing = set(self.tickers) - set(strategies)
+            if missing:
+                raise ValueError(f"No strategy for tickers: {missing}")
+            self.strategies = {t: strategies[t] for t in self.tickers}
+        else:
+            self.strategies = {t: copy.deepcopy(strategies) for t in self.tickers}
+        self.data = data
+        self.initial_cash = initial_cash
+        self.portfolio = Portfolio(self.initial_cash)
+        self.execution = execution
+        self._fill_delay = execution.fill_delay if execution else 0
+        self.results: list = []
+        self.rejected_orders: list = []
+
+        calendar = pd.DatetimeIndex([])
+        for frame in data.values():
+            calendar = calendar.union(frame.index)
+        self.calendar = calendar
+        self.record_positions = record_positions
+        self.recorder = None
+        if results_format == 'columnar':
+            self.recorder = ResultsRecorder(self.calendar, self.tickers, record_positions)
+
+    def _panel(self, column: str) -> np.ndarray:
+        """Dates x symbols matrix of a price column, forward-filled onto the calendar."""
+        panel = pd.DataFrame({t: self.data[t][column] for t in self.tickers}).reindex(self.calendar)
+        return panel.ffill().to_numpy(dtype=float)
+
+    def _volumes(self) -> np.ndarray:
+        """Dates x symbols bar volume; symbols without a 'Volume' column are unconstrained."""
+        panel = pd.DataFrame({
+            t: self.data[t]['Volume'] if 'Volume' in self.data[t] else pd.Series(np.inf, index=self.data[t].index)
+            for t in self.tickers
+        }).reindex(self.calendar)
+        # A missing volume does not cap the fill, as in Backtester.
+        return panel.fillna(np.inf).to_numpy(dtype=float)
+
+    def _reject(self, date, ticker, action, quantity, reason):
+        logger.info("Order rejected on %s: %s %s %s (%s)", date, action, quantity, ticker, reason)
+        self.rejected_orders.append({'date': date, 'ticker': ticker, 'action': action,
+                                     'quantity': quantity, 'reason': reason})
+
+    def _signal_panel(self):
+        """
+        Each symbol's strategy runs on its own bars; the result is aligned onto
+        the calendar. With a fill delay, orders are moved to the symbol's own
+        next bar (not the next calendar date), where they fill; orders with no
+        bar left are returned as (date, ticker, action, quantity) in date order.
+        """
+        codes = np.zeros((len(self.calendar), len(self.tickers)), dtype=np.int8)
+        quantities = np.zeros((len(self.calendar), len(self.tickers)))
+        delay = self._fill_delay
+        unfilled = []
+        for j, ticker in enumerate(self.tickers):
+            signals = self.strategies[ticker].generate_signals(self.data[ticker])
+            actions = signals['action'].map(_ACTION_CODES).fillna(0).to_numpy(dtype=np.int8)
+            sizes = signals['quantity'].to_numpy()
+            if delay:
+                for i in np.flatnonzero(actions[max(len(actions) - delay, 0):]) + max(len(actions) - delay, 0):
+                    unfilled.append((signals.index[i], ticker, signals['action'].iloc[i], sizes[i]))
+                actions = np.r_[np.zeros(delay, dtype=np.int8), actions][:len(actions)]
+                sizes = np.r_[np.zeros(delay), sizes][:len(sizes)]
+            rows = self.calendar.get_indexer(signals.index)
+            codes[rows, j] = actions
+            quantities[rows, j] = sizes
+        unfilled.sort(key=lambda order: order[0])
+        return codes, quantities, unfilled
+
+    def run(self):
+        """
+        Run every symbol's strategy over the shared calendar.
+
+        Orders on the same date are processed sells first (to free cash), then
+        buys, in ticker order. Fills use 'Adj Close' (or the ExecutionModel's
+        price and timing); the book is valued from the per-date 'close' vector.
+
+        Returns:
+            List of daily results, or a DataFrame when results_format='columnar'
+        """
+        codes, quantities, unfilled = self._signal_panel()
+        fill_prices = self._panel(self.execution.price_column if self.execution else 'Adj Close')
+        closes = np.nan_to_num(self._panel('close'))
+        n_dates, n_symbols = codes.shape
+
+        # Only dates with orders touch the portfolio; the rest forward-fill.
+        order_rows, order_cols = np.nonzero(codes)
+        if self.execution is not None:
+            # Price every order's costs in one vectorized call; the sequential
+            # pass below only re-quotes orders that end up partially filled.
+            volumes = self._volumes()
+            quoted_prices, quoted_fees = np.zeros(codes.shape), np.zeros(codes.shape)
+            quoted = self.execution.quote(codes[order_rows, order_cols], quantities[order_rows, order_cols],
+                                          fill_prices[order_rows, order_cols], volumes[order_rows, order_cols])
+            quoted_prices[order_rows, order_cols], quoted_fees[order_rows, order_cols] = quoted
+        event_cash = [self.portfolio.cash]
+        event_shares = [np.zeros(n_symbols)]
+        event_positions = [self.portfolio.positions.copy()]
+        event_signals = [{}]
+        marker = np.zeros(n_dates, dtype=np.int64)
+        shares = np.zeros(n_symbols)
+        dates_with_orders, starts = np.unique(order_rows, return_index=True)
+        bounds = np.append(starts, len(order_rows))
+        for k, t in enumerate(dates_with_orders, start=1):
+            cols = order_cols[bounds[k - 1]:bounds[k]]
+            cols = cols[np.argsort(codes[t, cols], kind='stable')]
+            signals = {}
+            for j in cols:
+                ticker = self.tickers[j]
+                quantity = float(quantities[t, j])
+                quantity = int(quantity) if quantity.is_integer() else quantity
+                action = 'BUY' if codes[t, j] > 0 else 'SELL'
+                signals[ticker] = {'action': action, 'quantity': quantity}
+                filled, price, fees = quantity, fill_prices[t, j], 0.0
+                try:
+                    if self.execution is not None:
+                        fill = self.execution.execute(action, quantity, price, volumes[t, j], self.portfolio.cash,
+                                                      self.portfolio.positions.get(ticker, 0),
+                                                      (quoted_prices[t, j], quoted_fees[t, j]))
+                        filled, price, fees = fill['quantity'], fill['price'], fill['fees']
+                    if action == 'BUY':
+                        self.portfolio.buy(ticker, filled, price, fees, self.calendar[t])
+                    else:
+                        self.portfolio.sell(ticker, filled, price, fees, self.calendar[t])
+                    if self.recorder is not None:
+                        self.recorder.record_fill(t, ticker, action, filled, price)
+                except ValueError as e:
+                    # insufficient cash or shares, or nothing fillable
+                    self._reject(self.calendar[t], ticker, action, quantity, str(e))
+                shares[j] = self.portfolio.positions.get(ticker, 0)
+            event_cash.append(self.portfolio.cash)
+            event_shares.append(shares.copy())
+            event_positions.append(self.portfolio.positions.copy())
+            event_signals.append(signals)
+            marker[t] = k
+        marker = np.maximum.accumulate(marker)
+        # Like Backtester, orders still pending at the end are rejected last.
+        for date, ticker, action, quantity in unfilled:
+            self._reject(date, ticker, action, quantity, "No bar left to fill the order")
+
+        cash = np.asarray(event_cash, dtype=float)[marker]
+        shares_by_date = np.stack(event_shares)[marker]
+        values = cash + np.einsum('ij,ij->i', shares_by_date, closes)
+
+        if self.recorder is not None:
+            self.recorder.equity[:] = values
+            self.recorder.cash[:] = cash
+            if self.recorder.positions is not None:
+                self.recorder.positions[:] = shares_by_date
+            return self.recorder.to_frame()
+
+        has_orders = np.zeros(n_dates, dtype=bool)
+        has_orders[dates_with_orders] = True
+        for t, current_date in enumerate(self.calendar):
+            self.results.append({
+                'date': current_date,
+                'portfolio_value': float(values[t]),
+                'current_cash': float(cash[t]),
+                'signals': event_signals[marker[t]] if has_orders[t] else {},
+                'portfolio': event_positions[marker[t]].copy() if self.record_positions else None
+            })
+        return self.results
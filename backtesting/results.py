@@ -0,0 +1,66 @@
+# Columnar results recording for backtests
+import numpy as np
+import pandas as pd
+
+
+class ResultsRecorder:
+    """
+    Preallocated, typed storage for per-bar backtest output.
+
+    Equity and cash are float arrays sized to the run; positions are a
+    dates x symbols matrix (optional); fills are recorded sparsely.
+    """
+
+    def __init__(self, dates, tickers, record_positions: bool = True):
+        n_bars = len(dates)
+        self.dates = pd.DatetimeIndex(dates, name='date')
+        self.tickers = list(tickers)
+        self._ticker_ids = {t: i for i, t in enumerate(self.tickers)}
+        self.equity = np.full(n_bars, np.nan)
+        self.cash = np.full(n_bars, np.nan)
+        self.positions = np.zeros((n_bars, len(self.tickers))) if record_positions else None
+        self._fill_bars = []
+        self._fill_tickers = []
+        self._fill_actions = []
+        self._fill_quantities = []
+        self._fill_prices = []
+
+    def record(self, i: int, value: float, cash: float, positions: dict = None):
+        self.equity[i] = value
+        self.cash[i] = cash
+        if self.positions is not None and positions:
+            for ticker, shares in positions.items():
+                self.positions[i, self._ticker_ids[ticker]] = shares
+
+    def record_fill(self, i: int, ticker: str, action: str, quantity: float, price: float):
+        self._fill_bars.append(i)
+        self._fill_tickers.append(ticker)
+        self._fill_actions.append(action)
+        self._fill_quantities.append(quantity)
+        self._fill_prices.append(price)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns:
+            DataFrame indexed by date with 'portfolio_value', 'current_cash' and,
+            when recorded, one 'position_<ticker>' column per symbol
+        """
+        frame = pd.DataFrame({'portfolio_value': self.equity, 'current_cash': self.cash}, index=self.dates)
+        if self.positions is not None:
+            for j, ticker in enumerate(self.tickers):
+                frame[f'position_{ticker}'] = self.positions[:, j]
+        return frame
+
+    def fills(self) -> pd.DataFrame:
+        """Executed orders, one row per fill."""
+        return pd.DataFrame({
+            'date': self.dates[np.asarray(self._fill_bars, dtype=np.int64)],
+            'ticker': self._fill_tickers,
+            'action': self._fill_actions,
+            'quantity': self._fill_quantities,
+            'price': self._fill_prices,
+        })
+
+    def returns(self) -> pd.Series:
+        """Bar-to-bar returns of the equity curve, ready for RiskAnalyzer."""
+        return pd.Series(self.equity, index=self.dates).pct_change().dropna()
@@ -1,21 +1,118 @@
 # Strategy base class + implementations
+import numpy as np
 import pandas as pd
+from .indicators import Indicator, indicator_cache
+from .streaming import RollingMean
 
 class Strategy:
-    def generate_signal(self):
+    # Strategies that implement on_bar() set this so the Backtester feeds them
+    # one bar at a time instead of the growing history.
+    supports_streaming = False
+
+    def reset(self):
+        """Clear any incremental state before a new run."""
+        pass
+
+    def on_bar(self, bar):
+        """
+        Consume a single bar and return a signal dict.
+
+        Args:
+            bar: Mapping of column name -> value for the current bar
+        """
+        raise NotImplementedError("Streaming strategies must implement on_bar()")
+
+    def indicators(self) -> dict:
+        """
+        Indicators this strategy reads, as a dict of label -> Indicator.
+        Declared indicators are computed through the shared IndicatorCache,
+        so strategies and parameter sets asking for the same indicator on the
+        same data compute it once.
+        """
+        return {}
+
+    def compute_indicators(self, data, cache=None) -> dict:
+        """
+        Args:
+            data: DataFrame (or DataWindow) holding the indicator inputs
+            cache: IndicatorCache to use (default: the process-wide cache)
+
+        Returns:
+            Dict of label -> read-only NumPy array aligned with data
+        """
+        cache = indicator_cache if cache is None else cache
+        return {label: cache.compute(spec, data) for label, spec in self.indicators().items()}
+
+    def generate_signal(self, data):
         raise NotImplementedError("Subclasses must implement generate_signal()")
 
-class MovingAverageCrossover:
+    def generate_signals(self, data):
+        """
+        Generate one signal per bar over the full history.
+
+        The default replays generate_signal() on every prefix of the data, so
+        any strategy works with the vectorized engine. Subclasses that can
+        compute all signals in one pass should override this.
+
+        Args:
+            data: Full DataFrame of bars
+
+        Returns:
+            DataFrame indexed like data with 'action' and 'quantity' columns
+        """
+        actions = []
+        quantities = []
+        for i in range(1, len(data) + 1):
+            signal = self.generate_signal(data.iloc[:i])
+            actions.append(signal['action'])
+            quantities.append(signal['quantity'])
+        return pd.DataFrame({'action': actions, 'quantity': quantities}, index=data.index)
+
+class MovingAverageCrossover(Strategy):
     """
     Simple moving average crossover strategy.
     BUY when short MA crosses above long MA.
     SELL when short MA crosses below long MA.
     """
 
+    supports_streaming = True
+
     def __init__(self,short_window = 20, long_window = 50, quantity = 100):
         self.short_window = short_window
         self.long_window = long_window
         self.quantity = quantity
+        self.reset()
+
+    def indicators(self) -> dict:
+        return {
+            'ma_short': Indicator('sma', 'close', window=self.short_window),
+            'ma_long': Indicator('sma', 'close', window=self.long_window),
+        }
+
+    def reset(self):
+        self._ma_short = RollingMean(self.short_window)
+        self._ma_long = RollingMean(self.long_window)
+        self._short_yesterday = float('nan')
+        self._long_yesterday = float('nan')
+        self._bars_seen = 0
+
+    def on_bar(self, bar):
+        """
+        Incremental crossover check: O(1) time and memory per bar.
+        Emits the same signals as generate_signal() on the growing history.
+        """
+        short_today = self._ma_short.update(bar['close'])
+        long_today = self._ma_long.update(bar['close'])
+        short_yesterday, long_yesterday = self._short_yesterday, self._long_yesterday
+        self._short_yesterday, self._long_yesterday = short_today, long_today
+        self._bars_seen += 1
+        if self._bars_seen < self.long_window:
+            return {'action': 'HOLD', 'quantity': 0}
+        if short_yesterday <= long_yesterday and short_today > long_today:
+            return {'action': 'BUY', 'quantity': self.quantity}
+        if short_yesterday >= long_yesterday and short_today < long_today:
+            return {'action': 'SELL', 'quantity': self.quantity}
+        return {'action': 'HOLD', 'quantity': 0}
 
     def generate_signal(self, data):
         if len(data) < self.long_window:
@@ -33,3 +130,19 @@ class MovingAverageCrossover:
             return {'action': 'SELL', 'quantity': self.quantity}
         return {'action': 'HOLD', 'quantity': 0}
 
+    def generate_signals(self, data):
+        """
+        Vectorized crossover signals for every bar from the cached moving
+        averages. Matches generate_signal() called on each prefix of data.
+        """
+        values = self.compute_indicators(data)
+        ma_short, ma_long = values['ma_short'], values['ma_long']
+        short_yesterday = np.roll(ma_short, 1)
+        long_yesterday = np.roll(ma_long, 1)
+        enough = np.arange(1, len(data) + 1) >= self.long_window
+        enough[0] = False
+        buy = enough & (short_yesterday <= long_yesterday) & (ma_short > ma_long)
+        sell = enough & ~buy & (short_yesterday >= long_yesterday) & (ma_short < ma_long)
+        action = np.where(buy, 'BUY', np.where(sell, 'SELL', 'HOLD'))
+        quantity = np.where(buy | sell, self.quantity, 0)
+        return pd.DataFrame({'action': action, 'quantity': quantity}, index=data.index)
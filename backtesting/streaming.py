@@ -0,0 +1,87 @@
+# Fixed-size rolling state for strategies that consume one bar at a time
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity circular buffer backed by a preallocated NumPy array.
+    Appending is O(1) and never reallocates.
+    """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("Ring buffer size must be at least 1")
+        self.size = size
+        self._values = np.zeros(size, dtype=float)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def is_full(self) -> bool:
+        return self._count == self.size
+
+    def append(self, value: float):
+        """
+        Add a value, overwriting the oldest one when full.
+
+        Returns:
+            The evicted value, or None while the buffer is still filling
+        """
+        evicted = self._values[self._head] if self.is_full else None
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.size
+        if not self.is_full:
+            self._count += 1
+        return evicted
+
+    def to_array(self) -> np.ndarray:
+        """Return the buffered values, oldest first."""
+        if not self.is_full:
+            return self._values[:self._count].copy()
+        return np.concatenate([self._values[self._head:], self._values[:self._head]])
+
+
+class RollingMean:
+    """
+    Simple moving average maintained with a running (Kahan-compensated) sum,
+    so each update costs O(1) regardless of the window length.
+
+    NaNs are counted instead of summed: the mean is NaN while the window
+    holds one and recovers once it is evicted, like pandas' rolling().mean().
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._buffer = RingBuffer(window)
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._nans = 0
+
+    def _add(self, value: float):
+        y = value - self._compensation
+        t = self._sum + y
+        self._compensation = (t - self._sum) - y
+        self._sum = t
+
+    def update(self, value: float) -> float:
+        """Push a new observation and return the current mean (NaN until the window is full)."""
+        evicted = self._buffer.append(value)
+        if value != value:
+            self._nans += 1
+        else:
+            self._add(value)
+        if evicted is not None:
+            if evicted != evicted:
+                self._nans -= 1
+            else:
+                self._add(-evicted)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if not self._buffer.is_full or self._nans:
+            return float('nan')
+        return self._sum / self.window
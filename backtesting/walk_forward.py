@@ -0,0 +1,195 @@
+# Walk-forward (rolling / anchored) out-of-sample evaluation
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .backtester import Backtester
+from .data_handler import DataHandler
+from .indicators import IndicatorCache, indicator_cache
+from . import optimization
+from .optimization import SharedFrame, backtest_metrics, parameter_grid
+from .strategy import MovingAverageCrossover
+
+
+def walk_forward_folds(handler: DataHandler, train_size: int, test_size: int, anchored: bool = False) -> list:
+    """
+    Split a DataHandler's bars into consecutive train/test folds.
+
+    Rolling folds slide a fixed train window forward by test_size bars;
+    anchored folds keep the train window starting at the first bar. Test
+    windows never overlap and the last one may be shorter.
+
+    Args:
+        handler: DataHandler over the full history
+        train_size: Bars per train window (initial window when anchored)
+        test_size: Bars per test window
+
+    Returns:
+        List of dicts with positional 'train' and 'test' slices plus their dates
+    """
+    if train_size < 2 or test_size < 1:
+        raise ValueError("train_size must be at least 2 and test_size at least 1")
+    n_bars = len(handler.index)
+    if n_bars <= train_size:
+        raise ValueError(f"Not enough data for one fold: {n_bars} bars, train_size {train_size}")
+    folds = []
+    for k, test_start in enumerate(range(train_size, n_bars, test_size)):
+        train = slice(0 if anchored else test_start - train_size, test_start)
+        test = slice(test_start, min(test_start + test_size, n_bars))
+        folds.append({
+            'fold': k,
+            'train': train,
+            'test': test,
+            'train_start': handler.index[train.start],
+            'train_end': handler.index[train.stop - 1],
+            'test_start': handler.index[test.start],
+            'test_end': handler.index[test.stop - 1],
+        })
+    return folds
+
+
+def _score(value) -> float:
+    return value if value == value else -math.inf
+
+
+def _run_fold(data, signals, strategy_cls, combos, fold, ticker, initial_cash, objective, execution):
+    actions, quantities = signals
+
+    def backtest(c, window):
+        bt = Backtester(strategy_cls(**combos[c]), data.iloc[window], ticker, initial_cash,
+                        results_format='columnar', record_positions=False, execution=execution)
+        frame = pd.DataFrame({'action': actions[c, window], 'quantity': quantities[c, window]}, copy=False)
+        return bt.run(mode='vectorized', signals=frame)['portfolio_value'].to_numpy()
+
+    scores = [backtest_metrics(backtest(c, fold['train']), initial_cash)[objective] for c in range(len(combos))]
+    best = max(range(len(combos)), key=lambda c: _score(scores[c]))
+    return {'best': best, 'train_score': scores[best], 'equity': backtest(best, fold['test'])}
+
+
+_worker_signals = None
+
+
+def _init_worker(spec, signals):
+    global _worker_signals
+    # The shared frame is attached (and released at exit) as in run_sweep.
+    optimization._init_worker(spec)
+    _worker_signals = signals
+
+
+def _run_fold_shared(task):
+    return _run_fold(optimization._worker_data, _worker_signals, *task)
+
+
+class WalkForward:
+    """
+    Walk-forward optimization: pick parameters on each train window, trade
+    them on the following test window, and stitch the test windows into one
+    out-of-sample equity curve.
+
+    Signals for every parameter combination are computed once over the full
+    history and sliced per fold. Indicators like moving averages only look
+    back, so a slice equals what the strategy would emit bar by bar, with the
+    indicators already warmed up from earlier data.
+    """
+
+    def __init__(self, data: pd.DataFrame, param_grid, ticker: str, strategy_cls=MovingAverageCrossover,
+                 train_size: int = 252, test_size: int = 63, anchored: bool = False,
+                 initial_cash: float = 100000, objective: str = 'sharpe_ratio', execution=None):
+        """
+        Args:
+            data: Full DataFrame (from MarketDataProcessor) with 'close' and 'Adj Close'
+            param_grid: Dict of name -> values (expanded with parameter_grid) or a
+                list of keyword dicts for strategy_cls
+            ticker: Symbol being traded
+            strategy_cls: Strategy class built with each parameter combination
+            train_size: Bars per train window (initial window when anchored)
+            test_size: Bars per test window
+            anchored: Grow the train window from the first bar instead of rolling it
+            initial_cash: Starting cash for every train and test run
+            objective: backtest_metrics key maximized on the train window
+            execution: Optional ExecutionModel applied to every run
+        """
+        self.combos = parameter_grid(param_grid) if isinstance(param_grid, dict) else list(param_grid)
+        if not self.combos:
+            raise ValueError("Empty parameter grid.")
+        strategies = [strategy_cls(**params) for params in self.combos]
+        self.data_handler = DataHandler(data, copy_columns=IndicatorCache.input_columns(strategies))
+        self.data = self.data_handler.data
+        self.ticker = ticker
+        self.strategy_cls = strategy_cls
+        self.initial_cash = initial_cash
+        self.objective = objective
+        self.execution = execution
+        self.folds = walk_forward_folds(self.data_handler, train_size, test_size, anchored)
+        self._signals = None
+
+    def precompute_signals(self):
+        """
+        Full-history signals per parameter combination, computed once and
+        shared by every fold.
+
+        Returns:
+            (actions, quantities) arrays shaped combinations x bars
+        """
+        if self._signals is None:
+            strategies = [self.strategy_cls(**params) for params in self.combos]
+            indicator_cache.precompute(strategies, self.data)
+            frames = [strategy.generate_signals(self.data) for strategy in strategies]
+            self._signals = (np.stack([f['action'].to_numpy(dtype=str) for f in frames]),
+                             np.stack([f['quantity'].to_numpy() for f in frames]))
+        return self._signals
+
+    def run(self, processes: int = None) -> dict:
+        """
+        Run every fold, in parallel across processes.
+
+        Args:
+            processes: Worker processes (default: all cores; 1 runs in-process)
+
+        Returns:
+            Dict with 'folds' (one row per fold: dates, chosen parameters,
+            train score and test return), 'equity' (stitched out-of-sample
+            equity) and 'metrics' (RiskAnalyzer metrics of that curve)
+        """
+        signals = self.precompute_signals()
+        processes = processes or os.cpu_count() or 1
+        tasks = [(self.strategy_cls, self.combos, fold, self.ticker, self.initial_cash, self.objective,
+                  self.execution) for fold in self.folds]
+        if processes == 1 or len(tasks) == 1:
+            results = [_run_fold(self.data, signals, *task) for task in tasks]
+        else:
+            with SharedFrame(self.data) as shared:
+                with ProcessPoolExecutor(max_workers=min(processes, len(tasks)), initializer=_init_worker,
+                                         initargs=(shared.spec, signals)) as pool:
+                    results = list(pool.map(_run_fold_shared, tasks))
+
+        # Chain the test windows: each one starts from the previous one's
+        # ending value, i.e. fold returns are compounded.
+        level = self.initial_cash
+        curves = []
+        rows = []
+        for fold, result in zip(self.folds, results):
+            growth = result['equity'] / self.initial_cash
+            curves.append(level * growth)
+            level = curves[-1][-1]
+            rows.append({
+                'fold': fold['fold'],
+                'train_start': fold['train_start'],
+                'train_end': fold['train_end'],
+                'test_start': fold['test_start'],
+                'test_end': fold['test_end'],
+                **self.combos[result['best']],
+                f'train_{self.objective}': result['train_score'],
+                'test_return': float(growth[-1] - 1),
+            })
+
+        equity = pd.Series(np.concatenate(curves), index=self.data.index[self.folds[0]['test'].start:],
+                           name='portfolio_value')
+        return {
+            'folds': pd.DataFrame(rows),
+            'equity': equity,
+            'metrics': backtest_metrics(equity.to_numpy(), self.initial_cash),
+        }
@@ -0,0 +1,49 @@
+# Command line entry point: python -m benchmarks
+import argparse
+import sys
+
+import pandas as pd
+
+from .suite import CASES, PROFILES, compare, load_baseline, run_suite, save_baseline, scaling
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Offline benchmarks for the backtesting and risk hot paths.')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), help='Cases to run (default: all)')
+    parser.add_argument('--bars', nargs='+', type=int, help='Bar counts (overrides the profile)')
+    parser.add_argument('--symbols', nargs='+', type=int, help='Symbol counts (overrides the profile)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', metavar='PATH', help='Write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='Compare against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Relative slowdown or memory growth flagged by --compare')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.profile, args.cases, args.bars, args.symbols, args.repeat, args.seed)
+    table = pd.DataFrame(results)
+    with pd.option_context('display.max_rows', None, 'display.width', 120):
+        print(table.to_string(index=False, float_format=lambda x: f'{x:,.4g}'))
+        print()
+        print(scaling(results).to_string(index=False, float_format=lambda x: f'{x:.2f}'))
+
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        report = compare(results, load_baseline(args.compare), args.tolerance)
+        flagged = report[report['slower'] | report['more_memory']]
+        print(f"\nCompared {len(report)} results against {args.compare}")
+        if flagged.empty:
+            print("No regressions.")
+        else:
+            print(flagged.to_string(index=False, float_format=lambda x: f'{x:,.4g}'))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# Benchmark cases, runner and baseline comparison
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from backtesting.backtester import Backtester
+from backtesting.data_handler import DataHandler
+from backtesting.portfolio import Portfolio
+from backtesting.portfolio_backtester import PortfolioBacktester
+from backtesting.strategy import MovingAverageCrossover
+
+from .synthetic import synthetic_ohlcv, synthetic_universe
+
+_RISK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'risk-analytics')
+if _RISK_DIR not in sys.path:
+    sys.path.insert(0, _RISK_DIR)
+from covariance import PortfolioRisk, sample_covariance
+from risk_analyzer import RiskAnalyzer
+
+PROFILES = {
+    'quick': {'bars': [1_000, 10_000, 100_000], 'symbols': [1, 10, 100]},
+    'full': {'bars': [1_000, 10_000, 100_000, 1_000_000], 'symbols': [1, 10, 100, 1_000]},
+}
+
+# Bar-by-bar engines that rescan the history are quadratic; keep them small.
+_HISTORY_MAX_BARS = 2_000
+# Cap on bars x symbols for universe runs.
+_UNIVERSE_MAX_CELLS = 10_000_000
+_LOOKUPS = 1_000
+
+
+def _strategy():
+    return MovingAverageCrossover(short_window=20, long_window=50, quantity=10)
+
+
+def _backtester_vectorized(n_bars, n_symbols, seed):
+    data = synthetic_ohlcv(n_bars, seed)
+    return lambda: Backtester(_strategy(), data, 'SYN', results_format='columnar').run(mode='vectorized'), n_bars
+
+
+def _backtester_streaming(n_bars, n_symbols, seed):
+    data = synthetic_ohlcv(n_bars, seed)
+    return lambda: Backtester(_strategy(), data, 'SYN', results_format='columnar').run(), n_bars
+
+
+def _backtester_history(n_bars, n_symbols, seed):
+    if n_bars > _HISTORY_MAX_BARS:
+        return None
+    data = synthetic_ohlcv(n_bars, seed)
+
+    class HistoryOnly(MovingAverageCrossover):
+        supports_streaming = False
+
+    return lambda: Backtester(HistoryOnly(20, 50, 10), data, 'SYN', results_format='columnar').run(), n_bars
+
+
+def _generate_signal(n_bars, n_symbols, seed):
+    data = synthetic_ohlcv(n_bars, seed)
+    strategy = _strategy()
+    return lambda: strategy.generate_signal(data), n_bars
+
+
+def _generate_signals(n_bars, n_symbols, seed):
+    data = synthetic_ohlcv(n_bars, seed)
+    strategy = _strategy()
+    return lambda: strategy.generate_signals(data), n_bars
+
+
+def _get_data_up_to(n_bars, n_symbols, seed):
+    handler = DataHandler(synthetic_ohlcv(n_bars, seed))
+    dates = handler.index[np.random.default_rng(seed).integers(0, n_bars, _LOOKUPS)]
+
+    def run():
+        for date in dates:
+            handler.get_data_up_to(date)
+    return run, _LOOKUPS
+
+
+def _portfolio_get_value(n_bars, n_symbols, seed):
+    frames = synthetic_universe(max(1, n_bars // n_symbols), n_symbols, seed)
+    history = pd.concat([f[['close']].assign(ticker=t) for t, f in frames.items()])
+    portfolio = Portfolio(1e12)
+    for ticker, frame in frames.items():
+        portfolio.buy(ticker, 10, frame['close'].iloc[0])
+    return lambda: portfolio.get_value(history), len(history)
+
+
+def _portfolio_mark_to_market(n_bars, n_symbols, seed):
+    frames = synthetic_universe(max(1, n_bars // n_symbols), n_symbols, seed)
+    tickers = list(frames)
+    prices = np.column_stack([f['close'].to_numpy() for f in frames.values()])
+    portfolio = Portfolio(1e12)
+    for j, ticker in enumerate(tickers):
+        portfolio.buy(ticker, 10, prices[0, j])
+
+    def run():
+        for row in prices.tolist():
+            portfolio.mark_to_market(row, tickers)
+    return run, prices.size
+
+
+def _risk_get_metrics(n_bars, n_symbols, seed):
+    returns = synthetic_ohlcv(n_bars, seed)['close'].pct_change().dropna()
+    return lambda: RiskAnalyzer(returns).get_metrics(), n_bars
+
+
+def _portfolio_backtester(n_bars, n_symbols, seed):
+    if n_bars * n_symbols > _UNIVERSE_MAX_CELLS:
+        return None
+    data = synthetic_universe(n_bars, n_symbols, seed)
+    return (lambda: PortfolioBacktester(_strategy(), data, initial_cash=1e9, results_format='columnar').run(),
+            n_bars * n_symbols)
+
+
+def _portfolio_risk_fills(n_bars, n_symbols, seed):
+    rng = np.random.default_rng(seed)
+    covariance = sample_covariance(rng.normal(0, 0.01, (n_symbols + 50, n_symbols)))
+    risk = PortfolioRisk(covariance, {0: 1_000.0})
+    tickers = rng.integers(0, n_symbols, n_bars).tolist()
+
+    def run():
+        for i in tickers:
+            risk.apply_fill(i, 10, 50.0)
+        risk.value_at_risk()
+    return run, n_bars
+
+
+# name -> (setup, scales with symbols). A setup returns (callable, items
+# processed per call), or None when the size is out of range for the case.
+CASES = {
+    'backtester_vectorized': (_backtester_vectorized, False),
+    'backtester_streaming': (_backtester_streaming, False),
+    'backtester_history': (_backtester_history, False),
+    'generate_signal': (_generate_signal, False),
+    'generate_signals': (_generate_signals, False),
+    'get_data_up_to': (_get_data_up_to, False),
+    'portfolio_get_value': (_portfolio_get_value, True),
+    'portfolio_mark_to_market': (_portfolio_mark_to_market, True),
+    'risk_get_metrics': (_risk_get_metrics, False),
+    'portfolio_backtester': (_portfolio_backtester, True),
+    'portfolio_risk_fills': (_portfolio_risk_fills, True),
+}
+
+
+def measure(fn, repeat: int = 3) -> dict:
+    """
+    Best-of-repeat wall time, then one extra call under tracemalloc for the
+    peak traced allocation (NumPy and pandas buffers are traced).
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': min(times), 'peak_mb': peak / 2 ** 20}
+
+
+def run_suite(profile: str = 'quick', cases=None, bars=None, symbols=None, repeat: int = 3,
+              seed: int = 0) -> list:
+    """
+    Run benchmark cases over a grid of sizes.
+
+    Args:
+        profile: Size preset from PROFILES ('quick' or 'full')
+        cases: Case names to run (default: all of CASES)
+        bars: Bar counts, overriding the profile
+        symbols: Symbol counts for universe cases, overriding the profile
+        repeat: Timed calls per size (the fastest is kept)
+        seed: Seed for the synthetic data
+
+    Returns:
+        List of result dicts: case, n_bars, n_symbols, items, seconds,
+        throughput (items per second; bars, or bar x symbol cells) and peak_mb
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown benchmark profile: {profile}")
+    bars = bars or PROFILES[profile]['bars']
+    symbols = symbols or PROFILES[profile]['symbols']
+    names = cases or list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {sorted(unknown)}")
+
+    results = []
+    for name in names:
+        setup, per_symbol = CASES[name]
+        for n_symbols in (symbols if per_symbol else [1]):
+            for n_bars in bars:
+                case = setup(n_bars, n_symbols, seed)
+                if case is None:
+                    continue
+                fn, items = case
+                timing = measure(fn, repeat)
+                results.append({
+                    'case': name,
+                    'n_bars': n_bars,
+                    'n_symbols': n_symbols,
+                    'items': items,
+                    'seconds': timing['seconds'],
+                    'throughput': items / timing['seconds'] if timing['seconds'] > 0 else math.inf,
+                    'peak_mb': timing['peak_mb'],
+                })
+    return results
+
+
+def scaling(results: list) -> pd.DataFrame:
+    """
+    Empirical scaling exponent per case and symbol count: the slope of
+    log(seconds) against log(n_bars). ~1 is linear, ~2 quadratic.
+    """
+    frame = pd.DataFrame(results)
+    rows = []
+    for (case, n_symbols), group in frame.groupby(['case', 'n_symbols'], sort=False):
+        exponent = math.nan
+        if group['n_bars'].nunique() > 1:
+            exponent = float(np.polyfit(np.log(group['n_bars']), np.log(group['seconds']), 1)[0])
+        rows.append({'case': case, 'n_symbols': n_symbols, 'exponent': exponent})
+    return pd.DataFrame(rows)
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def save_baseline(results: list, path: str):
+    """Write results and the environment they were measured in as JSON."""
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+
+def load_baseline(path: str) -> list:
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(results: list, baseline: list, tolerance: float = 0.25) -> pd.DataFrame:
+    """
+    Match results to a baseline by (case, n_bars, n_symbols).
+
+    Args:
+        tolerance: Allowed relative drop in throughput (or growth in peak
+            memory) before a row is flagged
+
+    Returns:
+        DataFrame with baseline and current throughput and memory, their
+        ratios, and 'slower' / 'more_memory' flags
+    """
+    keys = ['case', 'n_bars', 'n_symbols']
+    current = pd.DataFrame(results)[keys + ['throughput', 'peak_mb']]
+    previous = pd.DataFrame(baseline)[keys + ['throughput', 'peak_mb']]
+    merged = current.merge(previous, on=keys, suffixes=('', '_baseline'))
+    merged['speed_ratio'] = merged['throughput'] / merged['throughput_baseline']
+    merged['memory_ratio'] = merged['peak_mb'] / merged['peak_mb_baseline']
+    merged['slower'] = merged['speed_ratio'] < 1 - tolerance
+    merged['more_memory'] = merged['memory_ratio'] > 1 + tolerance
+    return merged
@@ -0,0 +1,57 @@
+# Seeded synthetic OHLCV data for offline benchmarks
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(n_bars: int, seed: int = 0, start: str = '2000-01-03', freq: str = 'min',
+                    drift: float = 0.0, volatility: float = 0.01) -> pd.DataFrame:
+    """
+    Geometric random walk with consistent OHLCV bars.
+
+    Minute bars by default so a million bars still fits in the Timestamp range.
+
+    Args:
+        n_bars: Number of bars
+        seed: RNG seed (same seed -> identical frame)
+        start: First timestamp
+        freq: Bar frequency
+        drift: Mean log return per bar
+        volatility: Standard deviation of log returns per bar
+
+    Returns:
+        DataFrame with Open, High, Low, Close, Adj Close, Volume and the
+        lowercase 'close' column the backtester values positions with
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, volatility, n_bars)))
+    open_ = np.empty(n_bars)
+    open_[0] = 100.0
+    open_[1:] = close[:-1] * np.exp(rng.normal(0, volatility / 4, n_bars - 1))
+    wick = np.abs(rng.normal(0, volatility / 2, (2, n_bars)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.integers(10_000, 1_000_000, n_bars)
+    index = pd.date_range(start, periods=n_bars, freq=freq)
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': volume,
+        'close': close,
+    }, index=index, copy=False)
+
+
+def synthetic_universe(n_bars: int, n_symbols: int, seed: int = 0, **kwargs) -> dict:
+    """
+    Independent synthetic frames for n_symbols tickers on a shared calendar.
+
+    Each symbol draws from its own child of a SeedSequence, so adding symbols
+    leaves the existing ones unchanged.
+
+    Returns:
+        Dict of ticker ('SYM0000', ...) -> DataFrame
+    """
+    seeds = np.random.SeedSequence(seed).spawn(n_symbols)
+    return {f'SYM{k:04d}': synthetic_ohlcv(n_bars, seed=s, **kwargs) for k, s in enumerate(seeds)}
@@ -0,0 +1,195 @@
+import json
+import os
+import shutil
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnarStore:
+    """
+    On-disk columnar price store opened through numpy.memmap.
+
+    Layout: <root>/<ticker>/index.npy (datetime64[ns]), one col_<i>.npy per
+    column and meta.json (column names, dtypes, time zone). Reads map the
+    files instead of loading them, and a date range resolves to a slice by
+    binary search on the index, so only the pages for the symbols, columns
+    and dates in use are ever read from disk.
+
+    Ticker directories are percent-encoded ('BRK/B' -> 'BRK%2FB'), so a
+    ticker can never name a path outside the root.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def _name(ticker: str) -> str:
+        if ticker in ('', '.', '..'):
+            raise ValueError(f"Invalid ticker: {ticker!r}")
+        return quote(ticker, safe='^=')
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.root, self._name(ticker))
+
+    def _staging(self, ticker: str, kind: str) -> str:
+        # '%tmp-' / '%old-' are not valid percent escapes, so no ticker maps here.
+        return os.path.join(self.root, f'%{kind}-{self._name(ticker)}')
+
+    def tickers(self) -> list:
+        return sorted(unquote(name) for name in os.listdir(self.root)
+                      if quote(unquote(name), safe='^=') == name
+                      and os.path.exists(os.path.join(self.root, name, 'meta.json')))
+
+    def meta(self, ticker: str) -> dict:
+        path = os.path.join(self._dir(ticker), 'meta.json')
+        if not os.path.exists(path):
+            raise KeyError(f"No stored data for ticker: {ticker}")
+        with open(path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _columns(df: pd.DataFrame) -> list:
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("Index must be a pandas DatetimeIndex")
+        if not df.index.is_monotonic_increasing:
+            raise ValueError("Index must be sorted ascending.")
+        for column in df.columns:
+            if df[column].dtype.kind not in 'biuf':
+                raise ValueError(f"Column {column!r} is not numeric")
+        return list(df.columns)
+
+    def write(self, ticker: str, df: pd.DataFrame) -> int:
+        """
+        Replace a ticker's data with df (numeric columns, sorted DatetimeIndex).
+
+        Files are written to a temporary directory and swapped in, so readers
+        never see a half-written ticker.
+
+        Returns:
+            Number of rows written
+        """
+        columns = self._columns(df)
+        tmp_dir = self._new_staging(ticker)
+        np.save(os.path.join(tmp_dir, 'index.npy'), df.index.values.astype('M8[ns]'))
+        for i, column in enumerate(columns):
+            np.save(os.path.join(tmp_dir, f'col_{i}.npy'), np.ascontiguousarray(df[column].to_numpy()))
+        meta = {
+            'columns': columns,
+            'dtypes': [df[column].dtype.str for column in columns],
+            'tz': str(df.index.tz) if df.index.tz is not None else None,
+            'rows': len(df),
+        }
+        self._commit(ticker, tmp_dir, meta)
+        return len(df)
+
+    def _new_staging(self, ticker: str) -> str:
+        tmp_dir = self._staging(ticker, 'tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        return tmp_dir
+
+    def _commit(self, ticker: str, tmp_dir: str, meta: dict):
+        """Write meta.json last, then swap the staged directory in for the ticker's."""
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        old_dir = self._staging(ticker, 'old')
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(self._dir(ticker)):
+            os.replace(self._dir(ticker), old_dir)
+        os.replace(tmp_dir, self._dir(ticker))
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def append(self, ticker: str, df: pd.DataFrame) -> int:
+        """
+        Add bars after the last stored one. Each column file is extended by
+        copying the mapped old data and the new chunk into a new file, so a
+        history larger than memory can be built chunk by chunk. The extended
+        files are staged in a temporary directory and swapped in like
+        write(), so a failure part-way leaves the stored ticker unchanged.
+
+        Returns:
+            Number of rows appended
+        """
+        if not os.path.exists(os.path.join(self._dir(ticker), 'meta.json')):
+            return self.write(ticker, df)
+        meta = self.meta(ticker)
+        if self._columns(df) != meta['columns']:
+            raise ValueError(f"Columns {list(df.columns)} do not match stored columns {meta['columns']}")
+        if df.empty:
+            return 0
+        directory = self._dir(ticker)
+        old_index = np.load(os.path.join(directory, 'index.npy'), mmap_mode='r')
+        new_index = df.index.values.astype('M8[ns]')
+        if len(old_index) and new_index[0] <= old_index[-1]:
+            raise ValueError(f"Appended bars must start after {pd.Timestamp(old_index[-1])}")
+
+        files = {'index.npy': new_index}
+        files.update({f'col_{i}.npy': df[column].to_numpy(dtype=meta['dtypes'][i])
+                      for i, column in enumerate(meta['columns'])})
+        tmp_dir = self._new_staging(ticker)
+        try:
+            for name, chunk in files.items():
+                old = np.load(os.path.join(directory, name), mmap_mode='r')
+                out = np.lib.format.open_memmap(os.path.join(tmp_dir, name), mode='w+', dtype=old.dtype,
+                                                shape=(len(old) + len(chunk),))
+                out[:len(old)] = old
+                out[len(old):] = chunk
+                out.flush()
+                del out, old
+            meta['rows'] += len(df)
+            self._commit(ticker, tmp_dir, meta)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return len(df)
+
+    def read(self, ticker: str, start=None, end=None, columns=None) -> pd.DataFrame:
+        """
+        Memory-mapped, read-only DataFrame for one ticker.
+
+        Args:
+            start: First date (inclusive)
+            end: Last date (inclusive)
+            columns: Subset of columns to map (default: all)
+
+        Returns:
+            DataFrame whose columns are views of the on-disk arrays (no copy)
+        """
+        meta = self.meta(ticker)
+        directory = self._dir(ticker)
+        index = np.load(os.path.join(directory, 'index.npy'), mmap_mode='r')
+        lo = 0 if start is None else int(np.searchsorted(index, self._to_naive(start, meta), side='left'))
+        hi = len(index) if end is None else int(np.searchsorted(index, self._to_naive(end, meta), side='right'))
+        columns = meta['columns'] if columns is None else list(columns)
+        missing = set(columns) - set(meta['columns'])
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        positions = {column: i for i, column in enumerate(meta['columns'])}
+        arrays = {column: np.load(os.path.join(directory, f'col_{positions[column]}.npy'), mmap_mode='r')[lo:hi]
+                  .view(np.ndarray) for column in columns}
+        dates = pd.DatetimeIndex(index[lo:hi].view(np.ndarray), copy=False)
+        if meta['tz']:
+            dates = dates.tz_localize('UTC').tz_convert(meta['tz'])
+        return pd.DataFrame(arrays, index=dates, copy=False)
+
+    def iter_read(self, ticker: str, chunk_size: int = 100_000, start=None, end=None, columns=None):
+        """
+        Yield a ticker's bars as consecutive memory-mapped DataFrames of at
+        most chunk_size rows, e.g. as a Pipeline source for histories larger
+        than memory.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        df = self.read(ticker, start, end, columns)
+        for begin in range(0, len(df), chunk_size):
+            yield df.iloc[begin:begin + chunk_size]
+
+    @staticmethod
+    def _to_naive(date, meta: dict) -> np.datetime64:
+        date = pd.Timestamp(date)
+        if meta['tz']:
+            date = (date.tz_localize(meta['tz']) if date.tz is None else date).tz_convert('UTC').tz_localize(None)
+        return date.to_datetime64().astype('M8[ns]')
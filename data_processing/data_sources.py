@@ -0,0 +1,179 @@
+import os
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+
+class DataSource:
+    """
+    Interface for anything that can return raw OHLCV bars for a ticker.
+    `end` is exclusive, matching yfinance. A failed request raises; an empty
+    frame means the range has no bars (weekends, holidays, before listing).
+    """
+
+    # Local sources never touch the network and may be used in offline mode.
+    is_local = False
+
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        raise NotImplementedError("Subclasses must implement fetch()")
+
+
+class YFinanceSource(DataSource):
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        import yfinance as yf
+
+        df = yf.download(ticker, start=start, end=end, progress=False, auto_adjust=False)
+        # yfinance logs failed downloads and returns an empty frame instead of raising.
+        errors = getattr(getattr(yf, 'shared', None), '_ERRORS', None) or {}
+        if df.empty and ticker in errors:
+            raise RuntimeError(f"Download failed for {ticker}: {errors[ticker]}")
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0).tolist()
+        return df
+
+
+class CSVSource(DataSource):
+    """
+    Reads `<directory>/<ticker>.csv` with the date in the first column.
+    """
+
+    is_local = True
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        path = os.path.join(self.directory, f"{ticker}.csv")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No local data for {ticker}: {path}")
+        df = pd.read_csv(path, index_col=0, parse_dates=True).sort_index()
+        return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+
+
+class CachedSource(DataSource):
+    """
+    Incremental on-disk cache in front of another source.
+
+    Each ticker is stored as `<cache_dir>/<ticker>.npz` (the ticker
+    percent-encoded, so 'BRK/B' stays one file): one NumPy array per column,
+    the index as int64 UTC ticks plus its unit and time zone, and the list of
+    [start, end) ranges already fetched. A request only fetches the parts of
+    its range not yet covered and merges them into the file. A range counts
+    as fetched once the source returns for it without raising, even with no
+    rows, but never past the start of today, so new bars keep arriving.
+    Ranges fetched before a failure are kept.
+
+    In offline mode the wrapped source is only used if it is local (e.g.
+    CSVSource); otherwise uncovered ranges raise instead of hitting the network.
+    """
+
+    is_local = True
+
+    def __init__(self, source: DataSource = None, cache_dir: str = "data/cache", offline: bool = False):
+        self.source = source or YFinanceSource()
+        self.cache_dir = cache_dir
+        self.offline = offline
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{quote(ticker, safe='^=')}.npz")
+
+    def _load(self, ticker: str):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None, []
+        with np.load(path, allow_pickle=False) as npz:
+            columns = npz['columns'].tolist()
+            index = npz['index']
+            if index.dtype.kind == 'i':
+                index = pd.DatetimeIndex(index.astype(f"datetime64[{npz['unit']}]"))
+                tz = str(npz['tz'])
+                if tz:
+                    index = index.tz_localize('UTC').tz_convert(tz)
+            else:
+                # Files written before the index was stored as int64
+                index = pd.DatetimeIndex(index)
+            df = pd.DataFrame({c: npz[f'col_{i}'] for i, c in enumerate(columns)}, index=index)
+            spans = [tuple(span) for span in npz['spans'].tolist()]
+        return df, spans
+
+    def _save(self, ticker: str, df: pd.DataFrame, spans: list):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        arrays = {f'col_{i}': df[c].to_numpy() for i, c in enumerate(df.columns)}
+        arrays['columns'] = np.array(list(df.columns), dtype=str)
+        index = pd.DatetimeIndex(df.index)
+        # Naive int64 ticks (UTC for tz-aware indexes) load without pickle.
+        arrays['index'] = index.asi8
+        arrays['unit'] = np.array(index.unit)
+        arrays['tz'] = np.array(str(index.tz) if index.tz is not None else '')
+        arrays['spans'] = np.array(spans, dtype=np.int64).reshape(-1, 2)
+        tmp_path = self._path(ticker) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self._path(ticker))
+
+    @staticmethod
+    def _missing(spans: list, start: int, end: int) -> list:
+        """Sub-ranges of [start, end) not covered by the (sorted, merged) spans."""
+        missing = []
+        cursor = start
+        for span_start, span_end in spans:
+            if span_end <= cursor:
+                continue
+            if span_start >= end:
+                break
+            if span_start > cursor:
+                missing.append((cursor, span_start))
+            cursor = max(cursor, span_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    @staticmethod
+    def _merge_spans(spans: list) -> list:
+        merged = []
+        for span_start, span_end in sorted(spans):
+            if merged and span_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], span_end))
+            else:
+                merged.append((span_start, span_end))
+        return merged
+
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        start_ns = pd.Timestamp(start).value
+        end_ns = pd.Timestamp(end).value
+        cached, spans = self._load(ticker)
+        missing = self._missing(spans, start_ns, end_ns)
+
+        if missing:
+            if self.offline and not self.source.is_local:
+                gaps = ", ".join(f"{pd.Timestamp(s).date()}..{pd.Timestamp(e).date()}" for s, e in missing)
+                raise RuntimeError(f"Offline mode: {ticker} not cached for {gaps}")
+            frames = [] if cached is None else [cached]
+            covered = []
+            # Bars from today on may still change or arrive later.
+            today = pd.Timestamp.now().normalize().value
+            try:
+                for gap_start, gap_end in missing:
+                    # A failed fetch raises; an empty result is a range without bars.
+                    fetched = self.source.fetch(ticker, pd.Timestamp(gap_start), pd.Timestamp(gap_end))
+                    if not fetched.empty:
+                        frames.append(fetched)
+                    if gap_start < min(gap_end, today):
+                        covered.append((gap_start, min(gap_end, today)))
+            finally:
+                added = len(frames) > (cached is not None)
+                if added:
+                    cached = pd.concat(frames)
+                    cached = cached[~cached.index.duplicated(keep='last')].sort_index()
+                if added or covered:
+                    spans = self._merge_spans(spans + covered)
+                    self._save(ticker, cached if cached is not None else pd.DataFrame(index=pd.DatetimeIndex([])),
+                               spans)
+
+        if cached is None:
+            return pd.DataFrame()
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        if cached.index.tz is not None and start.tz is None:
+            start, end = start.tz_localize(cached.index.tz), end.tz_localize(cached.index.tz)
+        return cached[(cached.index >= start) & (cached.index < end)]
@@ -0,0 +1,259 @@
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+# DataFrame column (as produced by MarketDataProcessor) -> SQL column
+COLUMN_MAP = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Adj Close": "adj_close",
+    "Volume": "volume",
+    "ret_1d": "ret_1d",
+}
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+KEY_COLUMNS = ("ticker", "date")
+
+
+def _check_identifier(name: str) -> str:
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+        raise ValueError(f"Invalid table name: {name}")
+    return name
+
+
+def sql_column(name) -> str:
+    """
+    SQL column for a DataFrame column: the COLUMN_MAP name, otherwise the
+    name lowercased with non-word characters replaced by '_' (ret_5d -> ret_5d).
+    """
+    if name in COLUMN_MAP:
+        return COLUMN_MAP[name]
+    column = re.sub(r"\W+", "_", str(name)).strip("_").lower()
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", column) or column in KEY_COLUMNS:
+        raise ValueError(f"Cannot store column {name!r} in SQLite")
+    return column
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """New SQLite connection with the storage pragmas applied."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections with the storage pragmas applied.
+    Connections are created lazily and reused across calls and threads.
+    """
+
+    def __init__(self, db_path: str, size: int = 4):
+        self.db_path = db_path
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._all = []
+        self._lock = threading.Lock()
+        self.size = size
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = connect(self.db_path)
+        self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                conn = self._connect() if len(self._all) < self.size else None
+            if conn is None:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+        self._all = []
+        self._idle = queue.LifoQueue(maxsize=self.size)
+
+
+class PriceStore:
+    """
+    SQLite storage for daily price history keyed by (ticker, date).
+
+    Writes are bulk upserts in a single transaction, so saving one ticker
+    never touches another ticker's rows and re-saving a day overwrites it
+    in place.
+    """
+
+    def __init__(self, db_path: str, table_name: str = "prices", pool_size: int = 4):
+        self.db_path = db_path
+        self.table_name = _check_identifier(table_name)
+        self.pool = ConnectionPool(db_path, pool_size)
+        self.create_schema()
+
+    def _table_columns(self, conn) -> list:
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({self.table_name})")]
+
+    def create_schema(self):
+        """
+        Create the table if needed. A table in the legacy layout written by
+        DataFrame.to_sql (index column plus 'Adj Close', 'ticker', ...) is
+        migrated in place; any other unrecognized table raises ValueError.
+        """
+        with self.pool.connection() as conn:
+            existing = self._table_columns(conn)
+            lowered = {c.lower() for c in existing}
+            if existing and not {"ticker", "date", "adj_close"} <= lowered:
+                if "ticker" not in lowered or "Adj Close" not in existing:
+                    raise ValueError(f"Table {self.table_name} has an unrecognized layout: {existing}")
+                self._migrate_legacy(conn, existing)
+            else:
+                self._create_table(conn)
+
+    def _create_table(self, conn):
+        columns = ", ".join(f"{c} {'INTEGER' if c == 'volume' else 'REAL'}" for c in COLUMN_MAP.values())
+        # execute(), not executescript(), which would commit an open transaction.
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                ticker TEXT NOT NULL,
+                date TEXT NOT NULL,
+                {columns},
+                PRIMARY KEY (ticker, date)
+            ) WITHOUT ROWID""")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table_name}_date ON {self.table_name} (date)")
+
+    def _migrate_legacy(self, conn, columns: list):
+        # One transaction for the whole migration: on any error the legacy
+        # table is left exactly as it was.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # to_sql(index=True) writes the date index as the first column.
+            legacy = pd.read_sql_query(f"SELECT * FROM {self.table_name}", conn)
+            legacy = legacy.set_index(pd.to_datetime(legacy.pop(columns[0]))).rename_axis(None)
+            backup = f"{self.table_name}_legacy"
+            conn.execute(f"DROP TABLE IF EXISTS {backup}")
+            conn.execute(f"ALTER TABLE {self.table_name} RENAME TO {backup}")
+            # Indexes follow the renamed table; drop them so names can be reused.
+            for (index,) in conn.execute(f"SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+                                         "AND sql IS NOT NULL", (backup,)).fetchall():
+                conn.execute(f'DROP INDEX "{index}"')
+            self._create_table(conn)
+            self._write(conn, legacy, None)
+            conn.execute(f"DROP TABLE {backup}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def _write(self, conn, df: pd.DataFrame, ticker) -> int:
+        if ticker is None and 'ticker' not in df.columns:
+            raise ValueError("Ticker required for a frame without a 'ticker' column.")
+        present = [c for c in df.columns if c != 'ticker']
+        if not present:
+            raise ValueError(f"No price columns to save; expected any of {list(COLUMN_MAP)}")
+        sql_columns = [sql_column(c) for c in present]
+        if len(set(sql_columns)) != len(sql_columns):
+            raise ValueError(f"Columns {present} map to duplicate SQL columns {sql_columns}")
+        for column in present:
+            if df[column].dtype.kind not in 'biuf':
+                raise ValueError(f"Column {column!r} is not numeric")
+        existing = {c.lower() for c in self._table_columns(conn)}
+        for column in sql_columns:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {self.table_name} ADD COLUMN {column} REAL")
+
+        tickers = df['ticker'].astype(str).tolist() if ticker is None else [ticker] * len(df)
+        dates = pd.DatetimeIndex(df.index).strftime(DATE_FORMAT).tolist()
+        values = [df[c].astype(float).tolist() for c in present]
+        rows = list(zip(tickers, dates, *values))
+        placeholders = ", ".join("?" * (len(sql_columns) + 2))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in sql_columns)
+        sql = (
+            f"INSERT INTO {self.table_name} (ticker, date, {', '.join(sql_columns)}) "
+            f"VALUES ({placeholders}) "
+            f"ON CONFLICT (ticker, date) DO UPDATE SET {updates}"
+        )
+        conn.executemany(sql, rows)
+        return len(rows)
+
+    def upsert(self, df: pd.DataFrame, ticker: str = None) -> int:
+        """
+        Insert or update rows for one ticker (or a long-format frame with a
+        'ticker' column).
+
+        Every column is saved: COLUMN_MAP columns under their SQL names,
+        other numeric columns (ret_5d, ...) under sql_column() names, added
+        to the table on first use. Non-numeric columns raise ValueError.
+
+        Args:
+            df: Date-indexed frame with MarketDataProcessor column names
+            ticker: Symbol for every row; required if df has no 'ticker' column
+
+        Returns:
+            Number of rows written
+        """
+        if df.empty:
+            return 0
+        with self.pool.connection() as conn:
+            with conn:
+                return self._write(conn, df, ticker)
+
+    def read(self, tickers=None, start=None, end=None) -> pd.DataFrame:
+        """
+        Range read back into a long-format DataFrame.
+
+        Args:
+            tickers: Symbol or list of symbols (default: all)
+            start: First date (inclusive)
+            end: Last date (inclusive)
+
+        Returns:
+            DataFrame indexed by date with a 'ticker' column and
+            MarketDataProcessor column names
+        """
+        clauses, params = [], []
+        if tickers is not None:
+            tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+            clauses.append(f"ticker IN ({', '.join('?' * len(tickers))})")
+            params.extend(tickers)
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(pd.Timestamp(start).strftime(DATE_FORMAT))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(pd.Timestamp(end).strftime(DATE_FORMAT))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT * FROM {self.table_name} {where} ORDER BY ticker, date"
+        with self.pool.connection() as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.set_index('date').rename(columns={v: k for k, v in COLUMN_MAP.items()})
+        return df
+
+    def tickers(self) -> list:
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"SELECT DISTINCT ticker FROM {self.table_name} ORDER BY ticker").fetchall()
+        return [r[0] for r in rows]
+
+    def close(self):
+        self.pool.close()
@@ -1,14 +1,50 @@
-import yfinance as yf
+from contextlib import nullcontext
+
 import pandas as pd
-import sqlite3
+from .data_sources import YFinanceSource
+from .columnar_store import ColumnarStore
+from .db_handler import PriceStore
+from .pipeline import Pipeline
+from .quality import PRICE_COLUMNS, quality_report
+
+
+def clean_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply the data cleaning policy to raw OHLCV bars: sort by date,
+    forward-fill prices, fill missing volume with 0.
+    """
+    # Flatten MultiIndex columns if present
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0).tolist()
+
+    df = df.sort_index()
+    df[PRICE_COLUMNS] = df[PRICE_COLUMNS].ffill()
+    df["Volume"] = df["Volume"].fillna(0)
+    return df
+
 
 class MarketDataProcessor:
-    def __init__(self, ticker: str, start: str, end: str):
+    def __init__(self, ticker: str, start: str, end: str, source=None, instrumentation=None):
+        """
+        Args:
+            ticker: Symbol to load
+            start: First date (inclusive)
+            end: Last date (exclusive)
+            source: DataSource to fetch from (default: yfinance). Wrap it in a
+                CachedSource to reuse previous downloads.
+            instrumentation: Optional Instrumentation (backtesting.instrumentation)
+                timing the fetch, validate and returns stages of build()
+        """
         self.ticker = ticker
         self.start = start
         self.end = end
+        self.source = source or YFinanceSource()
+        self.instrumentation = instrumentation
         self.data = None
 
+    def _stage(self, stage):
+        return self.instrumentation.stage(stage) if self.instrumentation is not None else nullcontext()
+
     def fetch_prices(self):
         """
         Fetch and clean historical price data.
@@ -16,31 +52,33 @@ class MarketDataProcessor:
         Returns:
             pd.DataFrame: Cleaned OHLCV price data with forward-filled prices.
         """
-        df = yf.download(self.ticker, start=self.start, end=self.end, progress=False, auto_adjust=False)
-
-        # Flatten MultiIndex columns if present
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0).tolist()
-        
-        self.data = df.sort_index()
-
-        price_cols = ["Open", "High", "Low", "Close", "Adj Close"]
-        self.data[price_cols] = self.data[price_cols].ffill()
-        self.data["Volume"] = self.data["Volume"].fillna(0)
-
+        df = self.source.fetch(self.ticker, self.start, self.end)
+        self.data = clean_prices(df)
         return self.data
 
+    def pipeline(self, chunk_size: int = None) -> Pipeline:
+        """
+        Lazy transform pipeline over the loaded data (returns at several
+        horizons, log returns, resampling, corporate-action adjustment).
+        Nothing is computed until collect() or iter_chunks().
+        """
+        if self.data is None:
+            raise RuntimeError("Call fetch_prices() first")
+        return Pipeline(self.data, chunk_size)
+
     def add_returns(self, period: int = 1):
         """
         Compute daily returns from adjusted prices.
         Assumes data is time-ordered and adjusted for splits/dividends.
+
+        Args:
+            period: Horizon in rows, or a list of horizons added in one pass
+                (rows without every return are dropped once)
         """
         if self.data is None:
             raise RuntimeError("Call fetch_prices() first")
 
-        col_name = f"ret_{period}d"
-        self.data[col_name] = self.data["Adj Close"].pct_change(periods=period)
-        self.data = self.data.dropna(subset=[col_name])
+        self.data = self.pipeline().returns(period).collect()
         return self.data
 
     
@@ -69,20 +107,34 @@ class MarketDataProcessor:
 
     def summary(self, period: int = 1):
         """
-        Return basic statistics for adjusted returns.
+        Return basic statistics for adjusted returns. Does not modify data:
+        returns are computed on the fly if add_returns() has not been called.
         """
         if self.data is None:
             raise RuntimeError("No data loaded")
         col = f"ret_{period}d"
-        if col not in self.data.columns:
-            self.add_returns(period)
+        if col in self.data.columns:
+            returns = self.data[col]
+        else:
+            returns = self.data["Adj Close"].pct_change(periods=period)
         return {
-            "mean_daily_return": self.data[f"ret_{period}d"].mean(),
-            "volatility": self.data[f"ret_{period}d"].std(),
-            "min_return": self.data[f"ret_{period}d"].min(),
-            "max_return": self.data[f"ret_{period}d"].max(),
-            "num_days": len(self.data)
+            "mean_daily_return": returns.mean(),
+            "volatility": returns.std(),
+            "min_return": returns.min(),
+            "max_return": returns.max(),
+            "num_days": int(returns.count())
         }
+
+    def check_quality(self, period: int = 1, min_rows: int = 60):
+        """
+        Every validation check and return statistic in one pass, without raising.
+
+        Returns:
+            QualityReport listing the offending row positions per failed check
+        """
+        if self.data is None:
+            raise RuntimeError("Call fetch_prices() first")
+        return quality_report(self.data, period=period, min_rows=min_rows)
     def diagnostics(self, period: int = 1):
         if self.data is None:
             raise RuntimeError("No data has been loaded")
@@ -145,24 +197,45 @@ class MarketDataProcessor:
             raise ValueError('No data exists.')
         if self.data.empty:
             raise ValueError('No data returned.')
-        copy = self.data.copy()
-        copy['ticker'] = self.ticker
-        with sqlite3.connect(db_path) as conn:
-            copy.to_sql(table_name, conn, if_exists='replace', index=True)
+        store = PriceStore(db_path, table_name)
+        try:
+            rows_saved = store.upsert(self.data, self.ticker)
+        finally:
+            store.close()
         return {
             'ticker': self.ticker,
-            'rows_saved': len(copy),
+            'rows_saved': rows_saved,
             'table': table_name,
             'db_path': db_path
         }
 
+    def save_to_columnar(self, root: str, append: bool = False) -> dict:
+        """
+        Write the data to a memory-mapped ColumnarStore under root.
+
+        Args:
+            append: Add bars after the stored ones instead of replacing them
+        """
+        if self.data is None:
+            raise ValueError('No data exists.')
+        store = ColumnarStore(root)
+        rows_saved = store.append(self.ticker, self.data) if append else store.write(self.ticker, self.data)
+        return {
+            'ticker': self.ticker,
+            'rows_saved': rows_saved,
+            'root': root
+        }
+
 
 
     
     def build(self, min_rows: int = 60):
-        self.fetch_prices()
-        self.validate_OHLC()              
-        self.add_returns()
-        self.validate_returns_sanity()    
-        self.validate_min_history(min_rows)  
+        with self._stage('fetch'):
+            self.fetch_prices()
+        with self._stage('validate'):
+            self.check_quality(min_rows=min_rows).raise_for_errors()
+        with self._stage('returns'):
+            self.add_returns()
+        if self.instrumentation is not None:
+            self.instrumentation.count('rows_processed', len(self.data))
         return self.data
@@ -0,0 +1,297 @@
+# Lazy, chunked transform pipeline over OHLCV bars
+import numpy as np
+import pandas as pd
+
+# Resampling aggregation per column; other columns keep their last value.
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Adj Close': 'last', 'Volume': 'sum'}
+
+# Raw prices rescaled by corporate actions ('Adj Close' is already adjusted).
+ADJUSTED_PRICES = ['Open', 'High', 'Low', 'Close']
+
+
+def iter_frames(df: pd.DataFrame, chunk_size: int):
+    """Yield consecutive row slices (views, not copies) of at most chunk_size rows."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def return_column(period: int, column: str = 'Adj Close', log: bool = False) -> str:
+    """Name of a return column: ret_5d for 'Adj Close', close_ret_5d for 'Close', logret_5d for logs."""
+    name = f"{'log' if log else ''}ret_{period}d"
+    return name if column == 'Adj Close' else f"{column.lower().replace(' ', '_')}_{name}"
+
+
+class _Adjust:
+    """Back-adjust prices and volume for splits and dividends after each bar."""
+
+    def __init__(self, price_factors: pd.Series, volume_factors: pd.Series):
+        self.dates = pd.DatetimeIndex(price_factors.index)
+        # suffix[k] = product of the factors of events k, k+1, ...
+        self.price_suffix = np.r_[np.cumprod(price_factors.to_numpy()[::-1])[::-1], 1.0]
+        self.volume_suffix = np.r_[np.cumprod(volume_factors.to_numpy()[::-1])[::-1], 1.0]
+
+    def process(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        dates = self.dates
+        if chunk.index.tz is not None and dates.tz is None:
+            dates = dates.tz_localize(chunk.index.tz)
+        # Events on a bar's own date are already reflected in that bar.
+        first_after = dates.searchsorted(chunk.index, side='right')
+        prices = self.price_suffix[first_after]
+        columns = {c: chunk[c].to_numpy(dtype=float) * prices for c in ADJUSTED_PRICES if c in chunk.columns}
+        if 'Volume' in chunk.columns:
+            columns['Volume'] = chunk['Volume'].to_numpy(dtype=float) * self.volume_suffix[first_after]
+        return chunk.assign(**columns)
+
+    def flush(self):
+        return None
+
+
+class _Resample:
+    """
+    Aggregate bars to a coarser frequency. The last (possibly incomplete)
+    bucket of every chunk is held back and completed by the next one.
+    """
+
+    def __init__(self, rule: str, agg: dict):
+        self.rule = rule
+        self.agg = agg
+        self._carry = None
+
+    def _aggregate(self, frame: pd.DataFrame) -> pd.DataFrame:
+        resampled = frame.resample(self.rule)
+        out = resampled.agg({c: self.agg.get(c, 'last') for c in frame.columns})
+        return out[resampled.size().to_numpy() > 0]
+
+    def process(self, chunk: pd.DataFrame):
+        if self._carry is not None:
+            chunk = pd.concat([self._carry, chunk])
+        groups = chunk.groupby(pd.Grouper(freq=self.rule)).ngroup().to_numpy()
+        last = groups == groups[-1]
+        self._carry = chunk[last]
+        return self._aggregate(chunk[~last]) if not last.all() else None
+
+    def flush(self):
+        carry, self._carry = self._carry, None
+        return self._aggregate(carry) if carry is not None and len(carry) else None
+
+
+class _Returns:
+    """
+    Every requested return horizon, simple and log, from one pass over each
+    price column. The last max(period) prices are carried across chunks.
+    """
+
+    def __init__(self, specs: dict, dropna: bool):
+        self.specs = specs
+        self.dropna = dropna
+        self._tails = {column: np.empty(0) for column in specs}
+
+    def process(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        new = {}
+        for column, horizons in self.specs.items():
+            values = chunk[column].to_numpy(dtype=float)
+            prices = np.concatenate([self._tails[column], values])
+            offset = len(prices) - len(values)
+            positions = np.arange(offset, len(prices))
+            for period, log in horizons:
+                previous = np.full(len(values), np.nan)
+                valid = positions >= period
+                previous[valid] = prices[positions[valid] - period]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ratio = values / previous
+                    new[return_column(period, column, log)] = np.log(ratio) if log else ratio - 1
+            self._tails[column] = prices[-max(p for p, _ in horizons):]
+        out = chunk.assign(**new)
+        if self.dropna:
+            keep = ~np.isnan(np.column_stack(list(new.values()))).any(axis=1)
+            if not keep.all():
+                out = out[keep]
+        return out
+
+    def flush(self):
+        return None
+
+
+class Pipeline:
+    """
+    Lazy plan of transforms over OHLCV bars.
+
+    Methods only record a step and return a new Pipeline; nothing runs until
+    collect() or iter_chunks(). The plan is then normalized and fused:
+    corporate actions are combined into one factor table and applied first,
+    at most one resample follows, and every return horizon (simple and log,
+    any price column) is computed in a single pass on the final bars, adding
+    all columns with one assign per chunk.
+
+    The source is a DataFrame (optionally split into chunk_size-row slices)
+    or any iterable of time-ordered DataFrame chunks, such as
+    ColumnarStore.iter_read(); only the current chunk and a small carry
+    (return lookback, open resample bucket) are held in memory.
+    """
+
+    def __init__(self, source, chunk_size: int = None, steps: tuple = ()):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.steps = tuple(steps)
+
+    def _then(self, *step) -> 'Pipeline':
+        return Pipeline(self.source, self.chunk_size, self.steps + (step,))
+
+    def returns(self, periods=1, column: str = 'Adj Close', log: bool = False, dropna: bool = True) -> 'Pipeline':
+        """
+        Add return columns (ret_{p}d, or logret_{p}d with log=True).
+
+        Args:
+            periods: Horizon in bars, or list of horizons
+            column: Price column
+            log: Log returns instead of simple returns
+            dropna: Drop the leading bars without a return, like add_returns()
+        """
+        periods = [periods] if isinstance(periods, (int, np.integer)) else list(periods)
+        if not periods or any(int(p) < 1 for p in periods):
+            raise ValueError("Return periods must be positive integers")
+        return self._then('returns', column, tuple(int(p) for p in periods), log, dropna)
+
+    def log_returns(self, periods=1, column: str = 'Adj Close', dropna: bool = True) -> 'Pipeline':
+        return self.returns(periods, column, log=True, dropna=dropna)
+
+    def resample(self, rule: str, agg: dict = None) -> 'Pipeline':
+        """
+        Aggregate to coarser bars ('W', 'ME', '1h', ...): OHLC first/max/min/last,
+        Volume summed, other columns last. Returns are computed on the
+        resampled bars wherever returns() appears in the chain.
+        """
+        return self._then('resample', rule, {**OHLCV_AGG, **(agg or {})})
+
+    def adjust(self, splits: pd.Series = None, dividends: pd.Series = None) -> 'Pipeline':
+        """
+        Back-adjust raw Open/High/Low/Close and Volume for corporate actions.
+        Bars before each ex-date are rescaled; 'Adj Close' is left as is.
+
+        Args:
+            splits: Ex-date -> split ratio (2.0 for a 2-for-1 split)
+            dividends: Ex-date -> dividend as a fraction of the previous close
+        """
+        return self._then('adjust', splits, dividends)
+
+    def plan(self) -> list:
+        """
+        The fused execution plan.
+
+        Returns:
+            List of (operation, arguments) in execution order
+        """
+        price_factors, volume_factors = [], []
+        resample = None
+        specs: dict = {}
+        dropna = False
+        for op, *args in self.steps:
+            if op == 'adjust':
+                splits, dividends = args
+                if splits is not None and len(splits):
+                    ratios = splits.astype(float)
+                    if (ratios <= 0).any():
+                        raise ValueError("Split ratios must be positive")
+                    price_factors.append(1.0 / ratios)
+                    volume_factors.append(ratios)
+                if dividends is not None and len(dividends):
+                    yields = dividends.astype(float)
+                    if ((yields < 0) | (yields >= 1)).any():
+                        raise ValueError("Dividends must be fractions of the previous close in [0, 1)")
+                    price_factors.append(1.0 - yields)
+            elif op == 'resample':
+                if resample is not None:
+                    raise ValueError("Only one resample step is supported")
+                resample = tuple(args)
+            else:
+                column, periods, log, drop = args
+                horizons = specs.setdefault(column, [])
+                horizons.extend((p, log) for p in periods if (p, log) not in horizons)
+                dropna = dropna or drop
+
+        plan = []
+        if price_factors or volume_factors:
+            def combine(factors):
+                if not factors:
+                    return pd.Series(dtype=float)
+                combined = pd.concat(factors)
+                combined.index = pd.DatetimeIndex(combined.index)
+                return combined.groupby(level=0).prod()
+            prices, volumes = combine(price_factors), combine(volume_factors)
+            dates = prices.index.union(volumes.index)
+            plan.append(('adjust', (prices.reindex(dates, fill_value=1.0), volumes.reindex(dates, fill_value=1.0))))
+        if resample is not None:
+            plan.append(('resample', resample))
+        if specs:
+            plan.append(('returns', ({c: sorted(h) for c, h in specs.items()}, dropna)))
+        return plan
+
+    def _stages(self) -> list:
+        kinds = {'adjust': _Adjust, 'resample': _Resample, 'returns': _Returns}
+        return [kinds[op](*args) for op, args in self.plan()]
+
+    def _chunks(self):
+        if isinstance(self.source, pd.DataFrame):
+            if self.chunk_size is None:
+                return iter([self.source]) if len(self.source) else iter(())
+            return iter_frames(self.source, self.chunk_size)
+        return iter(self.source)
+
+    @staticmethod
+    def _push(stages: list, chunk):
+        for stage in stages:
+            if chunk is None or chunk.empty:
+                return None
+            chunk = stage.process(chunk)
+        return chunk if chunk is not None and not chunk.empty else None
+
+    def iter_chunks(self):
+        """
+        Run the plan chunk by chunk.
+
+        Yields:
+            Transformed DataFrames in time order; an iterator source can only
+            be consumed once
+        """
+        return self._run(self._chunks())
+
+    def _run(self, chunks):
+        stages = self._stages()
+        for chunk in chunks:
+            out = self._push(stages, chunk)
+            if out is not None:
+                yield out
+        for i, stage in enumerate(stages):
+            out = self._push(stages[i + 1:], stage.flush())
+            if out is not None:
+                yield out
+
+    def _empty(self, template: pd.DataFrame) -> pd.DataFrame:
+        """Zero-row result with the columns and dtypes the plan would produce from template."""
+        out = template.iloc[:0]
+        for stage in self._stages():
+            out = stage._aggregate(out) if isinstance(stage, _Resample) else stage.process(out)
+        return out
+
+    def collect(self) -> pd.DataFrame:
+        """
+        Run the plan and concatenate the result into one DataFrame. With no
+        rows left, the result is empty but keeps the planned columns (unless
+        an iterator source yielded no chunk at all).
+        """
+        templates = []
+
+        def first_seen(chunks):
+            for chunk in chunks:
+                if not templates:
+                    templates.append(chunk.iloc[:0])
+                yield chunk
+
+        source = self.source if isinstance(self.source, pd.DataFrame) else None
+        chunks = list(self._run(first_seen(self._chunks())))
+        if not chunks:
+            template = source if source is not None else (templates[0] if templates else None)
+            return self._empty(template) if template is not None else pd.DataFrame()
+        return chunks[0] if len(chunks) == 1 else pd.concat(chunks)
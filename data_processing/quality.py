@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+REQUIRED_COLUMNS = {"Open", "High", "Low", "Close", "Adj Close", "Volume"}
+
+# Row-level checks in reporting priority: check -> (message, stage). The
+# messages and stages match the raising validate_* methods.
+CHECKS = {
+    'high_price': ('High price constraint violated', 'validate_OHLC'),
+    'low_price': ('Low price constraint violated', 'validate_OHLC'),
+    'non_positive_price': ('Non-positive prices detected', 'validate_OHLC'),
+    'negative_volume': ('Negative volume detected', 'validate_OHLC'),
+    'unsorted_index': ('Index is not sorted ascending', 'validate'),
+    'duplicate_timestamp': ('Duplicate timestamps in index', 'validate'),
+    'null_return': ('Null value in the returns column.', 'validate_returns_sanity'),
+    'return_out_of_bounds': ('Unexpected return values', 'validate_returns_sanity'),
+}
+
+
+class QualityReport:
+    """
+    Result of quality_report(): every failed check with the offending row
+    positions, frame-level errors and per-ticker statistics.
+    """
+
+    def __init__(self, errors: list, violations: dict, tickers: pd.DataFrame, row_tickers, min_rows: int):
+        self.errors = errors
+        self.violations = violations
+        self.tickers = tickers
+        self.min_rows = min_rows
+        self._row_tickers = row_tickers
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.violations and bool(self.tickers['min_history_ok'].all())
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per offending row: check, row position, ticker, message and stage."""
+        frames = [pd.DataFrame({
+            'check': check,
+            'position': positions,
+            'ticker': self._row_tickers[positions],
+            'message': CHECKS[check][0],
+            'stage': CHECKS[check][1],
+        }) for check, positions in self.violations.items()]
+        columns = ['check', 'position', 'ticker', 'message', 'stage']
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    def failures(self, stages=None) -> dict:
+        """
+        First failed check per ticker, in CHECKS order, then minimum history.
+
+        Args:
+            stages: Only consider checks of these stages ('validate_OHLC',
+                'validate', 'validate_returns_sanity', 'validate_min_history')
+
+        Returns:
+            Dict of ticker -> {'check', 'stage', 'error'}
+        """
+        failed = {}
+        for check, positions in self.violations.items():
+            message, stage = CHECKS[check]
+            if stages is not None and stage not in stages:
+                continue
+            for ticker in pd.unique(self._row_tickers[positions]):
+                failed.setdefault(ticker, {'check': check, 'stage': stage, 'error': message})
+        if stages is not None and 'validate_min_history' not in stages:
+            return failed
+        short = self.tickers[~self.tickers['min_history_ok']]
+        for ticker, rows in short['return_rows'].items():
+            failed.setdefault(ticker, {
+                'check': 'min_history',
+                'stage': 'validate_min_history',
+                'error': f'Minimum history constraint violated: {rows} rows (minimum {self.min_rows} required)',
+            })
+        return failed
+
+    def raise_for_errors(self):
+        """Raise ValueError with the first problem found, like the validate_* methods."""
+        if self.errors:
+            raise ValueError(self.errors[0])
+        failed = self.failures()
+        if failed:
+            raise ValueError(next(iter(failed.values()))['error'])
+
+
+def _group_reduce(ufunc, values, starts):
+    return ufunc.reduceat(values, starts) if len(values) else values[:0]
+
+
+def quality_report(df: pd.DataFrame, ticker_column: str = None, period: int = 1, min_rows: int = 60,
+                   return_bounds: tuple = (-0.95, 5.0), returns_column: str = None) -> QualityReport:
+    """
+    Run every data-quality check and per-ticker statistic in one vectorized
+    pass over the NumPy arrays of an OHLCV frame or long-format panel.
+
+    Nothing is raised for bad rows: each failed check lists the offending
+    row positions (iloc) instead. Returns are computed internally from
+    'Adj Close', so the frame is never modified, unless returns_column
+    names an existing returns column to check instead.
+
+    Args:
+        df: Bars for one ticker, or a long panel with a ticker column
+        ticker_column: Column holding the symbol (None: a single ticker)
+        period: Return horizon in bars
+        min_rows: Minimum bars with a computable return per ticker
+        return_bounds: (low, high) range a return must fall in
+        returns_column: Check this column (e.g. 'ret_1d' after add_returns)
+            instead of recomputing returns; every row then counts towards
+            min_rows
+
+    Returns:
+        QualityReport
+    """
+    errors = []
+    if df is None or df.empty:
+        errors.append("Empty dataset detected.")
+    else:
+        missing = REQUIRED_COLUMNS - set(df.columns)
+        if missing:
+            errors.append(f"Missing columns: {missing}")
+        if returns_column is not None and returns_column not in df.columns:
+            errors.append('Data is missing returns.')
+        if not isinstance(df.index, pd.DatetimeIndex):
+            errors.append("Index must be a pandas DatetimeIndex")
+    if errors:
+        empty = pd.DataFrame(columns=['rows', 'return_rows', 'min_history_ok'])
+        return QualityReport(errors, {}, empty, np.array([], dtype=object), min_rows)
+
+    n = len(df)
+    if ticker_column is None:
+        codes = np.zeros(n, dtype=np.intp)
+        symbols = np.array([None], dtype=object)
+    else:
+        codes, symbols = pd.factorize(df[ticker_column], sort=False)
+        symbols = np.asarray(symbols, dtype=object)
+
+    # Sort rows by ticker once (stable, so time order within a ticker is
+    # kept); every check below works on contiguous per-ticker segments.
+    order = np.argsort(codes, kind='stable')
+    codes_sorted = codes[order]
+    prices = df[PRICE_COLUMNS].to_numpy(dtype=float)[order]
+    o, h, l, c, adj = prices.T
+    volume = df['Volume'].to_numpy(dtype=float)[order]
+    # .values is naive datetime64 (UTC for tz-aware indexes)
+    times = df.index.values[order]
+
+    starts = np.flatnonzero(np.r_[True, codes_sorted[1:] != codes_sorted[:-1]])
+    rows = np.diff(np.r_[starts, n])
+    position_in_group = np.arange(n) - np.repeat(starts, rows)
+
+    same_group = position_in_group[1:] > 0
+    step = np.diff(times)
+    zero = np.timedelta64(0)
+    unsorted = np.r_[False, same_group & (step < zero)]
+    duplicate = np.r_[False, same_group & (step == zero)]
+
+    if returns_column is None:
+        has_return = position_in_group >= period
+        previous = np.roll(adj, period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.where(has_return, adj / previous - 1, np.nan)
+    else:
+        has_return = np.ones(n, dtype=bool)
+        returns = df[returns_column].to_numpy(dtype=float)[order]
+    finite = has_return & np.isfinite(returns)
+    low_bound, high_bound = return_bounds
+
+    masks = {
+        'high_price': h < np.maximum(np.maximum(o, c), l),
+        'low_price': l > np.minimum(np.minimum(o, c), h),
+        'non_positive_price': (prices <= 0).any(axis=1),
+        'negative_volume': volume < 0,
+        'unsorted_index': unsorted,
+        'duplicate_timestamp': duplicate,
+        'null_return': has_return & np.isnan(returns),
+        'return_out_of_bounds': finite & ((returns < low_bound) | (returns > high_bound)),
+    }
+    violations = {}
+    for check, mask in masks.items():
+        if mask.any():
+            violations[check] = np.sort(order[mask])
+
+    return_rows = _group_reduce(np.add, has_return.astype(np.int64), starts)
+    valid = _group_reduce(np.add, finite.astype(np.int64), starts)
+    clean = np.where(finite, returns, 0.0)
+    total = _group_reduce(np.add, clean, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / valid
+        squares = _group_reduce(np.add, np.where(finite, (clean - np.repeat(mean, rows)) ** 2, 0.0), starts)
+        volatility = np.sqrt(squares / (valid - 1))
+    min_return = _group_reduce(np.minimum, np.where(finite, returns, np.inf), starts)
+    max_return = _group_reduce(np.maximum, np.where(finite, returns, -np.inf), starts)
+    zero_volume = _group_reduce(np.add, (volume == 0).astype(np.int64), starts)
+    unordered = _group_reduce(np.add, unsorted.astype(np.int64), starts)
+    duplicates = _group_reduce(np.add, duplicate.astype(np.int64), starts)
+    start_date = pd.DatetimeIndex(_group_reduce(np.minimum, times, starts))
+    end_date = pd.DatetimeIndex(_group_reduce(np.maximum, times, starts))
+    if df.index.tz is not None:
+        start_date = start_date.tz_localize('UTC').tz_convert(df.index.tz)
+        end_date = end_date.tz_localize('UTC').tz_convert(df.index.tz)
+
+    tickers = pd.DataFrame({
+        'rows': rows,
+        'return_rows': return_rows,
+        'start_date': start_date,
+        'end_date': end_date,
+        'mean': mean,
+        'standard_deviation': volatility,
+        'min_return': np.where(valid > 0, min_return, np.nan),
+        'max_return': np.where(valid > 0, max_return, np.nan),
+        'zero_vol_count': zero_volume,
+        'percent_zero': zero_volume / rows * 100,
+        'is_increasing': unordered == 0,
+        'is_index_unique': duplicates == 0,
+        'min_history_ok': return_rows >= min_rows,
+    }, index=pd.Index(symbols[codes_sorted[starts]], name='ticker'))
+
+    return QualityReport([], violations, tickers, symbols[codes], min_rows)
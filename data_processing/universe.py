@@ -0,0 +1,182 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .data_sources import YFinanceSource
+from .market_data_processor import clean_prices
+from .quality import REQUIRED_COLUMNS, quality_report
+
+
+class RateLimiter:
+    """
+    Spaces calls out to at most `rate` per second across all threads.
+    """
+
+    def __init__(self, rate: float = None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class UniverseProcessor:
+    """
+    Multi-ticker counterpart of MarketDataProcessor.
+
+    Fetches run concurrently on a bounded thread pool (with rate limiting and
+    retries); validation and returns then run once, vectorized, on the
+    combined long-format panel. Tickers that fail any stage are dropped and
+    reported in `errors` instead of aborting the whole universe.
+    """
+
+    def __init__(self, tickers: list, start: str, end: str, source=None, max_workers: int = 8,
+                 max_retries: int = 3, backoff: float = 0.5, rate_limit: float = None):
+        """
+        Args:
+            tickers: Symbols to load
+            start: First date (inclusive)
+            end: Last date (exclusive)
+            source: DataSource to fetch from (default: yfinance)
+            max_workers: Concurrent fetches
+            max_retries: Attempts per ticker before giving up
+            backoff: Initial retry delay in seconds (doubles per attempt)
+            rate_limit: Maximum fetches started per second (None = unlimited)
+        """
+        self.tickers = list(dict.fromkeys(tickers))
+        self.start = start
+        self.end = end
+        self.source = source or YFinanceSource()
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.data = None
+        self.quality = None
+        self.errors: dict = {}
+
+    def _fetch_one(self, ticker: str) -> pd.DataFrame:
+        delay = self.backoff
+        for attempt in range(1, self.max_retries + 1):
+            self.rate_limiter.wait()
+            try:
+                return self.source.fetch(ticker, self.start, self.end)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+
+    def _reject(self, rejected: dict, stage: str):
+        """Record ticker -> message failures and drop those tickers from the panel."""
+        for ticker, message in rejected.items():
+            self.errors[ticker] = {'stage': stage, 'error': message}
+        if self.data is not None and rejected:
+            self.data = self.data[~self.data['ticker'].isin(list(rejected))]
+
+    def fetch_prices(self):
+        """
+        Fetch and clean every ticker concurrently.
+
+        Returns:
+            pd.DataFrame: Long-format panel indexed by date with a 'ticker' column
+        """
+        self.errors = {}
+        frames = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {ticker: pool.submit(self._fetch_one, ticker) for ticker in self.tickers}
+            for ticker, future in futures.items():
+                try:
+                    df = future.result()
+                except Exception as e:
+                    self._reject({ticker: str(e)}, 'fetch')
+                    continue
+                if df.empty:
+                    self._reject({ticker: f"No data returned for ticker: {ticker}"}, 'fetch')
+                    continue
+                missing = REQUIRED_COLUMNS - set(df.columns)
+                if missing:
+                    self._reject({ticker: f"Missing columns: {missing}"}, 'fetch')
+                    continue
+                df = clean_prices(df)
+                df.insert(0, 'ticker', ticker)
+                frames.append(df)
+        if not frames:
+            raise ValueError("No data returned for any ticker")
+        self.data = pd.concat(frames)
+        self.data.index.name = 'date'
+        return self.data
+
+    def validate(self, period: int = 1, min_rows: int = 60, stages=None, returns_column: str = None):
+        """
+        Run every check on the whole panel in one pass (see quality_report)
+        and drop each failing ticker under the stage of its first failure.
+        The full report is kept in `quality`.
+
+        Args:
+            stages: Only act on checks of these stages (default: all)
+            returns_column: Check this existing returns column instead of
+                recomputing returns from 'Adj Close' (see quality_report)
+        """
+        if self.data is None:
+            raise RuntimeError("Call fetch_prices() first")
+        self.quality = quality_report(self.data, ticker_column='ticker', period=period, min_rows=min_rows,
+                                      returns_column=returns_column)
+        by_stage = {}
+        for ticker, failure in self.quality.failures(stages).items():
+            by_stage.setdefault(failure['stage'], {})[ticker] = failure['error']
+        for stage, rejected in by_stage.items():
+            self._reject(rejected, stage)
+
+    def validate_OHLC(self):
+        self.validate(stages=('validate_OHLC',))
+
+    def add_returns(self, period: int = 1):
+        """
+        Per-ticker returns from adjusted prices, computed in one grouped pass.
+        """
+        if self.data is None:
+            raise RuntimeError("Call fetch_prices() first")
+        col_name = f"ret_{period}d"
+        self.data[col_name] = self.data.groupby('ticker', sort=False)['Adj Close'].pct_change(periods=period)
+        self.data = self.data.dropna(subset=[col_name])
+        return self.data
+
+    def validate_returns_sanity(self, period: int = 1):
+        """Check the ret_{period}d column added by add_returns()."""
+        if f"ret_{period}d" not in self.data.columns:
+            raise ValueError('Data is missing returns.')
+        self.validate(period, stages=('validate_returns_sanity',), returns_column=f"ret_{period}d")
+
+    def validate_min_history(self, min_rows: int = 60, period: int = 1):
+        """
+        Reject tickers with fewer than min_rows rows once returns are added:
+        the rows themselves after add_returns(), otherwise the bars with a
+        computable return.
+        """
+        column = f"ret_{period}d"
+        self.validate(period, min_rows, stages=('validate_min_history',),
+                      returns_column=column if column in self.data.columns else None)
+
+    def error_report(self) -> pd.DataFrame:
+        """One row per rejected ticker with the stage and reason."""
+        return pd.DataFrame(
+            [{'ticker': t, **info} for t, info in self.errors.items()],
+            columns=['ticker', 'stage', 'error'],
+        )
+
+    def build(self, min_rows: int = 60):
+        self.fetch_prices()
+        self.validate(min_rows=min_rows)
+        self.add_returns()
+        return self.data
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+
+class BatchRiskAnalyzer:
+    """
+    RiskAnalyzer metrics for many return series at once.
+
+    Takes a dates x series matrix and computes every metric column-wise with
+    NumPy. Series may start late or end early (leading/trailing NaN) and may
+    have gaps: each metric uses only a column's observed returns, and gaps are
+    treated as flat days when compounding the drawdown path.
+    """
+
+    def __init__(self, returns):
+        if isinstance(returns, pd.DataFrame):
+            self.columns = returns.columns
+            values = returns.to_numpy(dtype=float)
+        else:
+            values = np.asarray(returns, dtype=float)
+            if values.ndim == 1:
+                values = values[:, None]
+            self.columns = pd.RangeIndex(values.shape[1])
+        if values.ndim != 2:
+            raise ValueError("Returns must be a 2-D dates x series matrix.")
+        if values.size == 0:
+            raise ValueError("Dataset is empty.")
+
+        self.returns = values
+        self._valid = ~np.isnan(values)
+        self.n_obs = self._valid.sum(axis=0)
+
+    def _mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self._valid, self.returns, 0.0).sum(axis=0) / self.n_obs
+
+    def annualized_return(self) -> np.ndarray:
+        return self._mean() * 252
+
+    def annualized_volatility(self) -> np.ndarray:
+        deviations = np.where(self._valid, self.returns - self._mean(), 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (deviations ** 2).sum(axis=0) / (self.n_obs - 1)
+        variance[self.n_obs < 2] = np.nan
+        return np.sqrt(variance) * np.sqrt(252)
+
+    def sharpe_ratio(self, risk_free_rate: float = 0.02) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.annualized_return() - risk_free_rate) / self.annualized_volatility()
+
+    def max_drawdown(self) -> np.ndarray:
+        wealth = np.cumprod(1 + np.where(self._valid, self.returns, 0.0), axis=0)
+        # No wealth path before a series starts, so its first peak is its first observation.
+        started = np.maximum.accumulate(self._valid, axis=0)
+        wealth[~started] = np.nan
+        peaks = np.fmax.accumulate(wealth, axis=0)
+        with np.errstate(invalid='ignore'):
+            drawdowns = wealth / peaks - 1
+        drawdowns[~started] = np.inf
+        result = drawdowns.min(axis=0)
+        result[self.n_obs == 0] = np.nan
+        return result
+
+    def value_at_risk(self, confidence: float = 0.95) -> np.ndarray:
+        """
+        Column-wise (1 - confidence) quantile with linear interpolation,
+        matching pandas Series.quantile. NaNs sort to the end of each column,
+        so the quantile is read directly from each column's observed prefix.
+        """
+        ordered = np.sort(self.returns, axis=0)
+        position = (self.n_obs - 1) * (1 - confidence)
+        lower = np.clip(np.floor(position).astype(np.int64), 0, None)
+        upper = np.clip(np.ceil(position).astype(np.int64), 0, None)
+        lo = np.take_along_axis(ordered, lower[None, :], axis=0)[0]
+        hi = np.take_along_axis(ordered, upper[None, :], axis=0)[0]
+        result = lo + (hi - lo) * (position - lower)
+        result[self.n_obs == 0] = np.nan
+        return result
+
+    def get_metrics(self, risk_free_rate: float = 0.02, confidence: float = 0.95) -> pd.DataFrame:
+        """
+        Calculate all risk metrics for every series.
+
+        Returns:
+            DataFrame with one row per series and one column per metric, plus
+            'n_obs' (number of observed returns)
+        """
+        return pd.DataFrame({
+            'annualized_return': self.annualized_return(),
+            'annualized_volatility': self.annualized_volatility(),
+            'sharpe_ratio': self.sharpe_ratio(risk_free_rate),
+            'max_drawdown': self.max_drawdown(),
+            'value_at_risk': self.value_at_risk(confidence),
+            'n_obs': self.n_obs
+        }, index=self.columns)
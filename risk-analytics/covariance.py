@@ -0,0 +1,306 @@
+# Cross-asset risk: covariance estimators and portfolio risk decomposition.
+# VaR follows the var_engine sign convention: a return (or P&L) threshold,
+# negative for a loss.
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+def _matrix(returns):
+    if isinstance(returns, pd.DataFrame):
+        columns = returns.columns
+        values = returns.to_numpy(dtype=float)
+    else:
+        values = np.asarray(returns, dtype=float)
+        if values.ndim != 2:
+            raise ValueError("Returns must be a 2-D dates x assets matrix.")
+        columns = pd.RangeIndex(values.shape[1])
+    if values.size == 0:
+        raise ValueError("Dataset is empty.")
+    return values, columns
+
+
+def _frame(matrix: np.ndarray, columns) -> pd.DataFrame:
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+def sample_covariance(returns, ddof: int = 1) -> pd.DataFrame:
+    """Sample covariance of a NaN-free dates x assets matrix from one BLAS product."""
+    values, columns = _matrix(returns)
+    if np.isnan(values).any():
+        raise ValueError("Null returns detected.")
+    centered = values - values.mean(axis=0)
+    return _frame(centered.T @ centered / (len(values) - ddof), columns)
+
+
+def correlation(covariance) -> pd.DataFrame:
+    """Correlation matrix from a covariance matrix."""
+    cov, columns = _matrix(covariance)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+    return _frame(corr, columns)
+
+
+def shrink(covariance, intensity: float, target: str = 'identity') -> pd.DataFrame:
+    """
+    Blend a covariance matrix with a structured target:
+    (1 - intensity) * covariance + intensity * target.
+
+    Args:
+        target: 'identity' (average variance on the diagonal), 'diagonal'
+            (each asset's own variance, zero covariances) or
+            'constant_correlation' (own variances, average correlation)
+    """
+    if not 0 <= intensity <= 1:
+        raise ValueError("Shrinkage intensity must be in [0, 1]")
+    cov, columns = _matrix(covariance)
+    variances = np.diag(cov)
+    if target == 'identity':
+        prior = np.eye(len(cov)) * variances.mean()
+    elif target == 'diagonal':
+        prior = np.diag(variances)
+    elif target == 'constant_correlation':
+        std = np.sqrt(variances)
+        corr = cov / np.outer(std, std)
+        n = len(cov)
+        average = (corr.sum() - n) / (n * (n - 1)) if n > 1 else 0.0
+        prior = average * np.outer(std, std)
+        np.fill_diagonal(prior, variances)
+    else:
+        raise ValueError(f"Unknown shrinkage target: {target}")
+    return _frame((1 - intensity) * cov + intensity * prior, columns)
+
+
+def ledoit_wolf(returns) -> tuple:
+    """
+    Ledoit-Wolf (2004) covariance: the sample covariance shrunk towards the
+    scaled identity with the analytically optimal intensity. Well conditioned
+    even with more assets than observations.
+
+    Returns:
+        (covariance DataFrame, shrinkage intensity)
+    """
+    values, columns = _matrix(returns)
+    if np.isnan(values).any():
+        raise ValueError("Null returns detected.")
+    n_obs, n_assets = values.shape
+    x = values - values.mean(axis=0)
+    cov = x.T @ x / n_obs
+    squared = x ** 2
+    mu = np.trace(cov) / n_assets
+    # Variance of the sample covariance entries (beta) against the distance
+    # of the sample covariance from the target (delta).
+    beta = (squared.T @ squared).sum() / n_obs - (cov ** 2).sum()
+    beta /= n_assets * n_obs
+    delta = ((cov - mu * np.eye(n_assets)) ** 2).sum() / n_assets
+    intensity = 0.0 if delta == 0 else float(min(beta, delta) / delta)
+    shrunk = (1 - intensity) * cov
+    shrunk[np.diag_indices(n_assets)] += intensity * mu
+    return _frame(shrunk, columns), intensity
+
+
+def betas(covariance, benchmark) -> pd.Series:
+    """Beta of every asset to the benchmark column of the covariance matrix."""
+    cov = covariance if isinstance(covariance, pd.DataFrame) else _frame(*_matrix(covariance))
+    if benchmark not in cov.columns:
+        raise ValueError(f"Benchmark {benchmark} not in covariance matrix")
+    return cov[benchmark] / cov.loc[benchmark, benchmark]
+
+
+class EWMACovariance:
+    """
+    Exponentially weighted covariance (zero mean, RiskMetrics style) with
+    O(N^2) incremental updates.
+
+    Every entry is normalized by its running weight sum, so after fit() or
+    any sequence of update() calls the estimate is the weighted average of
+    r_i * r_j with weight decay**age over the days both assets were
+    observed. fit() computes a whole history with one matrix product;
+    update() folds in one day as an in-place rank-one update.
+    """
+
+    def __init__(self, columns, decay: float = 0.94):
+        if not 0 < decay < 1:
+            raise ValueError("decay must be in (0, 1)")
+        self.columns = pd.Index(columns)
+        self.decay = decay
+        n = len(self.columns)
+        self._cov = np.zeros((n, n))
+        # Scalar weight sum while every day had every asset; a pairwise
+        # matrix once gaps appear.
+        self._weight = 0.0
+        self._pair_weight = None
+        self.n_updates = 0
+
+    @classmethod
+    def from_returns(cls, returns, decay: float = 0.94) -> 'EWMACovariance':
+        values, columns = _matrix(returns)
+        model = cls(columns, decay)
+        model.fit(values)
+        return model
+
+    def fit(self, returns):
+        """Replace the estimate with the one implied by a dates x assets history."""
+        values, _ = _matrix(returns)
+        if values.shape[1] != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} assets, got {values.shape[1]}")
+        weights = self.decay ** np.arange(len(values) - 1, -1, -1)
+        observed = ~np.isnan(values)
+        root = np.sqrt(weights)[:, None]
+        x = np.where(observed, values, 0.0) * root
+        if observed.all():
+            self._weight = float(weights.sum())
+            self._pair_weight = None
+            self._cov = x.T @ x / self._weight
+        else:
+            mask = observed * root
+            self._pair_weight = mask.T @ mask
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self._cov = np.where(self._pair_weight > 0, (x.T @ x) / self._pair_weight, 0.0)
+        self.n_updates = len(values)
+        return self
+
+    def update(self, returns):
+        """
+        Fold in one day of returns (one value per asset; NaN leaves that
+        asset's row and column unchanged).
+        """
+        r = np.asarray(returns, dtype=float)
+        if r.shape != (len(self.columns),):
+            raise ValueError(f"Expected {len(self.columns)} returns, got {r.shape}")
+        observed = ~np.isnan(r)
+        if self._pair_weight is None and observed.all():
+            previous = self.decay * self._weight
+            self._weight = previous + 1.0
+            keep = previous / self._weight
+            self._cov *= keep
+            self._cov += np.outer(r * (1 - keep), r)
+        else:
+            if self._pair_weight is None:
+                self._pair_weight = np.full(self._cov.shape, self._weight)
+            # Weights age every day; an unobserved pair keeps its estimate
+            # because its weighted sum and weight decay together.
+            self._pair_weight *= self.decay
+            index = np.flatnonzero(observed)
+            block = np.ix_(index, index)
+            previous = self._pair_weight[block]
+            total = previous + 1.0
+            keep = previous / total
+            self._cov[block] = self._cov[block] * keep + np.outer(r[index], r[index]) * (1 - keep)
+            self._pair_weight[block] = total
+        self.n_updates += 1
+        return self
+
+    @property
+    def covariance(self) -> pd.DataFrame:
+        return _frame(self._cov.copy(), self.columns)
+
+    @property
+    def volatility(self) -> pd.Series:
+        return pd.Series(np.sqrt(np.diag(self._cov)), index=self.columns)
+
+    def correlation(self) -> pd.DataFrame:
+        return correlation(_frame(self._cov, self.columns))
+
+
+class PortfolioRisk:
+    """
+    Volatility, parametric VaR and marginal/component risk of a book of
+    currency exposures under a covariance matrix.
+
+    The product covariance @ exposures is cached, so apply_fill() re-risks
+    the book after a trade in O(N) instead of a fresh O(N^2) product.
+    """
+
+    def __init__(self, covariance: pd.DataFrame, exposures=None):
+        """
+        Args:
+            covariance: Assets x assets covariance of returns (DataFrame)
+            exposures: Mapping ticker -> position value (quantity * price);
+                assets not listed have zero exposure
+        """
+        self.cov = covariance.to_numpy(dtype=float)
+        self.tickers = pd.Index(covariance.columns)
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.set_exposures(exposures or {})
+
+    @classmethod
+    def from_positions(cls, covariance: pd.DataFrame, positions: dict, prices) -> 'PortfolioRisk':
+        """Exposures from quantities and prices (e.g. Portfolio.positions and Portfolio.marks)."""
+        return cls(covariance, {ticker: qty * prices[ticker] for ticker, qty in positions.items()})
+
+    @classmethod
+    def from_portfolio(cls, covariance: pd.DataFrame, portfolio, prices=None) -> 'PortfolioRisk':
+        """Exposures of a backtesting Portfolio at its last marks (or the given prices)."""
+        return cls.from_positions(covariance, portfolio.positions, portfolio.marks if prices is None else prices)
+
+    def _index(self, ticker) -> int:
+        try:
+            return self._positions[ticker]
+        except KeyError:
+            raise ValueError(f"No covariance for ticker: {ticker}") from None
+
+    def set_exposures(self, exposures: dict):
+        missing = set(exposures) - set(self._positions)
+        if missing:
+            raise ValueError(f"No covariance for tickers: {missing}")
+        self.exposures = np.zeros(len(self.tickers))
+        for ticker, value in exposures.items():
+            self.exposures[self._positions[ticker]] = value
+        self._cov_x = self.cov @ self.exposures
+        self._variance = float(self.exposures @ self._cov_x)
+
+    def apply_fill(self, ticker, quantity: float, price: float):
+        """
+        Update the book for a fill: quantity is signed (positive for a buy,
+        negative for a sell). O(N).
+        """
+        i = self._index(ticker)
+        change = quantity * price
+        column = self.cov[:, i]
+        self._variance += 2 * change * self._cov_x[i] + change * change * column[i]
+        self._cov_x += change * column
+        self.exposures[i] += change
+
+    @property
+    def volatility(self) -> float:
+        """Standard deviation of the book's one-period P&L."""
+        return float(np.sqrt(max(self._variance, 0.0)))
+
+    def value_at_risk(self, confidence: float = 0.95, horizon: int = 1) -> float:
+        """Gaussian zero-mean P&L VaR over horizon periods (negative for a loss)."""
+        return NormalDist().inv_cdf(1 - confidence) * self.volatility * np.sqrt(horizon)
+
+    def marginal_risk(self) -> pd.Series:
+        """d(volatility) / d(exposure) per asset."""
+        volatility = self.volatility
+        values = self._cov_x / volatility if volatility > 0 else np.zeros_like(self._cov_x)
+        return pd.Series(values, index=self.tickers)
+
+    def component_risk(self) -> pd.Series:
+        """Each asset's share of volatility (exposure * marginal risk); sums to volatility."""
+        return self.marginal_risk() * self.exposures
+
+    def report(self, confidence: float = 0.95) -> pd.DataFrame:
+        """
+        Per-asset exposure, weight, marginal and component risk, component VaR
+        and percent contribution, for assets with a non-zero exposure.
+        """
+        held = self.exposures != 0
+        gross = np.abs(self.exposures).sum()
+        marginal = self.marginal_risk().to_numpy()
+        component = marginal * self.exposures
+        volatility = self.volatility
+        z = NormalDist().inv_cdf(1 - confidence)
+        table = pd.DataFrame({
+            'exposure': self.exposures,
+            'weight': self.exposures / gross if gross else 0.0,
+            'marginal_risk': marginal,
+            'component_risk': component,
+            'component_var': z * component,
+            'pct_contribution': component / volatility if volatility > 0 else 0.0,
+        }, index=self.tickers)
+        return table[held]
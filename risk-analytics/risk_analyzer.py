@@ -1,4 +1,6 @@
 import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 class RiskAnalyzer:
     def __init__(self, returns):
@@ -30,6 +32,11 @@ class RiskAnalyzer:
         """Daily VaR: (1 - confidence) quantile of returns (e.g. 0.95 -> 5th percentile)."""
         return self.returns.quantile(1 - confidence)
 
+    def expected_shortfall(self, confidence: float = 0.95):
+        """Daily CVaR: mean of the returns at or below value_at_risk(confidence)."""
+        var = self.value_at_risk(confidence)
+        return self.returns[self.returns <= var].mean()
+
     def get_metrics(self, risk_free_rate: float = 0.02, confidence: float = 0.95) -> dict:
         """
         Calculate all risk metrics and return as dict.
@@ -40,4 +47,45 @@ class RiskAnalyzer:
             'sharpe_ratio': self.sharpe_ratio(risk_free_rate),
             'max_drawdown': self.max_drawdown(),
             'value_at_risk': self.value_at_risk(confidence)
-        }
\ No newline at end of file
+        }
+
+    def rolling_metrics(self, window: int = 252, risk_free_rate: float = 0.02,
+                        confidence: float = 0.95) -> pd.DataFrame:
+        """
+        Every get_metrics() value over a trailing window, as a time series.
+
+        Each metric is one vectorized pass over the full history rather than a
+        get_metrics() call per slice. Rolling VaR uses pandas' skiplist-based
+        rolling quantile, so windows are never re-sorted.
+
+        Returns:
+            DataFrame indexed like the returns with one column per metric
+            (NaN until the first full window)
+        """
+        if window < 2:
+            raise ValueError("Window must be at least 2.")
+        rolling = self.returns.rolling(window)
+        annualized_return = rolling.mean() * 252
+        annualized_volatility = rolling.std() * np.sqrt(252)
+        return pd.DataFrame({
+            'annualized_return': annualized_return,
+            'annualized_volatility': annualized_volatility,
+            'sharpe_ratio': (annualized_return - risk_free_rate) / annualized_volatility,
+            'max_drawdown': self._rolling_max_drawdown(window),
+            'value_at_risk': rolling.quantile(1 - confidence)
+        }, index=self.returns.index)
+
+    def _rolling_max_drawdown(self, window: int, chunk_size: int = 4096) -> np.ndarray:
+        # Drawdown is scale-invariant, so every window can share one wealth
+        # path; windows are strided views, processed in chunks to bound memory.
+        wealth = np.cumprod(1 + self.returns.to_numpy(dtype=float))
+        out = np.full(len(wealth), np.nan)
+        if len(wealth) < window:
+            return out
+        windows = sliding_window_view(wealth, window)
+        for start in range(0, len(windows), chunk_size):
+            block = windows[start:start + chunk_size]
+            peaks = np.maximum.accumulate(block, axis=1)
+            end = start + len(block)
+            out[start + window - 1:end + window - 1] = (block / peaks - 1).min(axis=1)
+        return out
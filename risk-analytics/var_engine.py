@@ -0,0 +1,211 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Signs follow RiskAnalyzer.value_at_risk: VaR and CVaR are return thresholds,
+# so a 95% daily VaR of -0.02 means a 2% loss is exceeded on 5% of days.
+
+
+def historical_var(returns, confidence: float = 0.95) -> float:
+    """Empirical (1 - confidence) quantile of returns."""
+    return float(pd.Series(returns).quantile(1 - confidence))
+
+
+def historical_cvar(returns, confidence: float = 0.95) -> float:
+    """Expected shortfall: mean of the returns at or below the historical VaR."""
+    returns = pd.Series(returns)
+    return float(returns[returns <= returns.quantile(1 - confidence)].mean())
+
+
+def _cornish_fisher_z(z, skew: float, excess_kurtosis: float):
+    return (z
+            + (z ** 2 - 1) * skew / 6
+            + (z ** 3 - 3 * z) * excess_kurtosis / 24
+            - (2 * z ** 3 - 5 * z) * skew ** 2 / 36)
+
+
+def parametric_var(returns, confidence: float = 0.95, method: str = 'gaussian') -> float:
+    """
+    Parametric VaR from the first moments of returns.
+
+    Args:
+        method: 'gaussian' (mean and volatility only) or 'cornish-fisher'
+            (quantile adjusted for sample skew and excess kurtosis)
+    """
+    returns = pd.Series(returns)
+    z = NormalDist().inv_cdf(1 - confidence)
+    if method == 'cornish-fisher':
+        z = _cornish_fisher_z(z, returns.skew(), returns.kurt())
+    elif method != 'gaussian':
+        raise ValueError(f"Unknown parametric method: {method}")
+    return float(returns.mean() + z * returns.std())
+
+
+def parametric_cvar(returns, confidence: float = 0.95, method: str = 'gaussian', grid_size: int = 1000) -> float:
+    """
+    Parametric expected shortfall.
+
+    Gaussian uses the closed form; Cornish-Fisher averages the adjusted
+    quantile function over the tail (midpoint rule on grid_size points).
+    """
+    returns = pd.Series(returns)
+    mu, sigma = returns.mean(), returns.std()
+    tail = 1 - confidence
+    if method == 'gaussian':
+        z = NormalDist().inv_cdf(tail)
+        return float(mu - sigma * NormalDist().pdf(z) / tail)
+    if method != 'cornish-fisher':
+        raise ValueError(f"Unknown parametric method: {method}")
+    probabilities = (np.arange(grid_size) + 0.5) / grid_size * tail
+    z = np.array([NormalDist().inv_cdf(p) for p in probabilities])
+    z = _cornish_fisher_z(z, returns.skew(), returns.kurt())
+    return float(mu + sigma * z.mean())
+
+
+_worker_state = None
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+
+def _simulate_chunk(task):
+    return MonteCarloVaR._simulate(_worker_state, *task)
+
+
+class MonteCarloVaR:
+    """
+    Monte Carlo VaR/CVaR for a (possibly multi-asset) book.
+
+    Scenarios are generated in chunks, each from its own child of a seeded
+    SeedSequence, so results are identical whether the chunks run in one
+    process or many. A chunk holds paths x horizon x assets floats, so its
+    path count is derived from a byte budget; run() folds each chunk into
+    the running left tail instead of keeping every path.
+    """
+
+    def __init__(self, returns, weights=None, method: str = 'bootstrap', horizon: int = 1,
+                 seed: int = None, chunk_size: int = None, chunk_bytes: int = 64 * 2 ** 20):
+        """
+        Args:
+            returns: Historical returns, Series or dates x assets DataFrame
+            weights: Portfolio weights per asset (default: equal weight)
+            method: 'bootstrap' (resample historical days, keeping the
+                cross-section intact) or 'normal' (correlated multivariate
+                normal fitted to mean and covariance)
+            horizon: Days compounded per path
+            seed: Seed for reproducible scenarios
+            chunk_size: Paths generated per chunk (default: from chunk_bytes)
+            chunk_bytes: Memory budget per chunk for the scenario arrays
+        """
+        if method not in ('bootstrap', 'normal'):
+            raise ValueError(f"Unknown Monte Carlo method: {method}")
+        values = np.asarray(returns, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        if np.isnan(values).any():
+            raise ValueError("Null returns detected.")
+        if values.size == 0:
+            raise ValueError("Dataset is empty.")
+        n_assets = values.shape[1]
+        weights = np.full(n_assets, 1 / n_assets) if weights is None else np.asarray(weights, dtype=float)
+        if weights.shape != (n_assets,):
+            raise ValueError(f"Expected {n_assets} weights, got {weights.shape}")
+        if chunk_size is None:
+            # At most two arrays of paths x horizon x assets are alive at once
+            # (shocks and their correlated product, or day indices and
+            # scenarios); _simulate updates the scenarios in place.
+            chunk_size = max(1, chunk_bytes // (2 * 8 * horizon * n_assets))
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        self.method = method
+        self.horizon = horizon
+        self.seed = seed
+        self.chunk_size = int(chunk_size)
+        self._state = {'method': method, 'horizon': horizon, 'weights': weights}
+        if method == 'bootstrap':
+            self._state['returns'] = values
+        else:
+            self._state['mean'] = values.mean(axis=0)
+            cov = np.atleast_2d(np.cov(values, rowvar=False))
+            # Tiny jitter keeps the Cholesky factor defined for singular covariances.
+            self._state['cholesky'] = np.linalg.cholesky(cov + np.eye(n_assets) * 1e-12)
+
+    @staticmethod
+    def _simulate(state, n_paths, seed_seq):
+        rng = np.random.default_rng(seed_seq)
+        horizon = state['horizon']
+        if state['method'] == 'bootstrap':
+            history = state['returns']
+            days = rng.integers(0, len(history), size=(n_paths, horizon))
+            scenarios = history[days]
+            del days
+        else:
+            n_assets = len(state['mean'])
+            shocks = rng.standard_normal((n_paths, horizon, n_assets))
+            scenarios = np.matmul(shocks, state['cholesky'].T)
+            del shocks
+            scenarios += state['mean']
+        # In place, so no more than two full-size arrays are ever alive.
+        scenarios += 1
+        asset_returns = np.prod(scenarios, axis=1) - 1
+        return asset_returns @ state['weights']
+
+    def _chunks(self, n_paths: int, processes: int):
+        n_chunks = math.ceil(n_paths / self.chunk_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(n_chunks)
+        sizes = [min(self.chunk_size, n_paths - i * self.chunk_size) for i in range(n_chunks)]
+        tasks = list(zip(sizes, seeds))
+        if processes == 1 or n_chunks == 1:
+            for task in tasks:
+                yield self._simulate(self._state, *task)
+            return
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(self._state,)) as pool:
+            yield from pool.map(_simulate_chunk, tasks)
+
+    def simulate(self, n_paths: int, processes: int = 1) -> np.ndarray:
+        """
+        Simulated portfolio returns over the horizon, one per path.
+
+        Args:
+            n_paths: Number of scenarios
+            processes: Worker processes for the chunks (1 runs in-process)
+        """
+        return np.concatenate(list(self._chunks(n_paths, processes)))
+
+    def run(self, n_paths: int = 100_000, confidence: float = 0.95, processes: int = 1) -> dict:
+        """
+        VaR (the linearly interpolated 1 - confidence quantile, as
+        np.quantile) and CVaR of the simulated returns. Only the left tail
+        (about (1 - confidence) * n_paths values) is kept across chunks.
+
+        Returns:
+            Dict with 'value_at_risk' and 'conditional_value_at_risk'
+        """
+        if n_paths < 1:
+            raise ValueError("n_paths must be at least 1")
+        position = (1 - confidence) * (n_paths - 1)
+        lower = int(math.floor(position))
+        keep = min(lower + 2, n_paths)
+        # Every path at or below the k-th smallest so far. Each chunk's k-th
+        # smallest is no lower than the overall one, so this always contains
+        # the overall k smallest and every path at or below the VaR.
+        tail = np.empty(0)
+        for paths in self._chunks(n_paths, processes):
+            tail = np.concatenate([tail, paths])
+            if len(tail) > keep:
+                tail = tail[tail <= np.partition(tail, keep - 1)[keep - 1]]
+        ordered = np.sort(tail)
+        var = float(ordered[lower])
+        if lower + 1 < n_paths:
+            var += (position - lower) * float(ordered[lower + 1] - ordered[lower])
+        return {
+            'value_at_risk': var,
+            'conditional_value_at_risk': float(tail[tail <= var].mean())
+        }
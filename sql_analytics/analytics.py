@@ -0,0 +1,331 @@
+# Returns, rolling aggregates, ranks and summaries computed inside SQLite
+import math
+from contextlib import contextmanager
+
+import pandas as pd
+
+from data_processing.db_handler import COLUMN_MAP, DATE_FORMAT, ConnectionPool, _check_identifier, connect
+
+PRICE_FIELDS = set(COLUMN_MAP.values()) - {'ret_1d'}
+
+
+def _sqrt(value):
+    return math.sqrt(value) if value is not None and value >= 0 else None
+
+
+def _prepare(conn):
+    # SQLite builds without the math extension have no SQRT().
+    conn.create_function("SQRT", 1, _sqrt, deterministic=True)
+
+
+def _frame(rows, columns) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for column in ('date', 'start_date', 'end_date'):
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+
+class QueryChunks:
+    """
+    Iterator of DataFrames of at most chunk_size rows read from one cursor.
+
+    Each iterator runs on its own connection, outside the pool, so any number
+    can be open at once without starving other queries. The connection is
+    closed when the iterator is exhausted, on close(), or when leaving a
+    with-block.
+    """
+
+    def __init__(self, db_path: str, sql: str, params, chunk_size: int, transform=None):
+        # Set first so close() and __del__ work however far __init__ gets.
+        self._conn = self._cursor = None
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.chunk_size = chunk_size
+        self._transform = transform
+        self._conn = connect(db_path)
+        try:
+            _prepare(self._conn)
+            self._cursor = self._conn.execute(sql, params)
+        except Exception:
+            self.close()
+            raise
+        self.columns = [d[0] for d in self._cursor.description]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> pd.DataFrame:
+        if self._conn is None:
+            raise StopIteration
+        rows = self._cursor.fetchmany(self.chunk_size)
+        if not rows:
+            self.close()
+            raise StopIteration
+        df = _frame(rows, self.columns)
+        return df if self._transform is None else self._transform(df)
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class SQLAnalytics:
+    """
+    Window-function analytics over a PriceStore table.
+
+    Every figure is computed by SQLite next to the data: the (ticker, date)
+    primary key already orders each ticker's rows, so the per-ticker windows
+    are evaluated in index order, and only result rows cross into Python.
+    Methods return a DataFrame, or with chunk_size set, a closable
+    QueryChunks iterator of DataFrames read chunk_size rows at a time.
+    """
+
+    def __init__(self, db_path: str, table_name: str = "prices", pool_size: int = 4):
+        self.db_path = db_path
+        self.table_name = _check_identifier(table_name)
+        self.pool = ConnectionPool(db_path, pool_size)
+        self._prepared = set()
+
+    @contextmanager
+    def _connection(self):
+        with self.pool.connection() as conn:
+            if id(conn) not in self._prepared:
+                _prepare(conn)
+                self._prepared.add(id(conn))
+            yield conn
+
+    def close(self):
+        self.pool.close()
+        self._prepared = set()
+
+    # -- execution -------------------------------------------------------
+
+    def iter_query(self, sql: str, params=(), chunk_size: int = 10_000, transform=None) -> QueryChunks:
+        """
+        Run a query and iterate over the result as DataFrames of at most
+        chunk_size rows, on a dedicated connection (see QueryChunks).
+        """
+        return QueryChunks(self.db_path, sql, params, chunk_size, transform)
+
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        with self._connection() as conn:
+            cursor = conn.execute(sql, params)
+            try:
+                return _frame(cursor.fetchall(), [d[0] for d in cursor.description])
+            finally:
+                cursor.close()
+
+    def _run(self, sql: str, params: list, chunk_size: int = None, transform=None):
+        if chunk_size is None:
+            result = self.query(sql, params)
+            return result if transform is None else transform(result)
+        return self.iter_query(sql, params, chunk_size, transform)
+
+    # -- query builders --------------------------------------------------
+
+    @staticmethod
+    def _field(name: str) -> str:
+        if name not in PRICE_FIELDS:
+            raise ValueError(f"Unknown price column: {name}")
+        return name
+
+    @staticmethod
+    def _ticker_filter(tickers):
+        if tickers is None:
+            return "", []
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        return f"WHERE ticker IN ({', '.join('?' * len(tickers))})", tickers
+
+    @staticmethod
+    def _date_filter(start, end, column: str = "date"):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(pd.Timestamp(start).strftime(DATE_FORMAT))
+        if end is not None:
+            clauses.append(f"{column} <= ?")
+            params.append(pd.Timestamp(end).strftime(DATE_FORMAT))
+        return clauses, params
+
+    def _returns_cte(self, tickers, period: int, price: str):
+        """
+        CTE 'r' with one row per bar that has a return. The ticker filter is
+        applied before the window so it can use the primary key; date filters
+        must be applied after it so the first bar in range still sees its
+        predecessor.
+        """
+        where, params = self._ticker_filter(tickers)
+        price = self._field(price)
+        sql = f"""
+            r AS (
+                SELECT ticker, date, volume, {price} AS price,
+                       {price} / LAG({price}, {int(period)}) OVER w - 1 AS ret
+                FROM {self.table_name} {where}
+                WINDOW w AS (PARTITION BY ticker ORDER BY date)
+            )"""
+        return sql, params
+
+    # -- analytics -------------------------------------------------------
+
+    def returns(self, tickers=None, start=None, end=None, period: int = 1, price: str = 'adj_close',
+                chunk_size: int = None):
+        """
+        Period returns per ticker and date.
+
+        Args:
+            tickers: Symbol or list of symbols (default: all)
+            start: First date (inclusive)
+            end: Last date (inclusive)
+            period: Return horizon in rows
+            price: Price column ('adj_close', 'close', ...)
+            chunk_size: Stream the result in chunks of this many rows
+
+        Returns:
+            ticker, date, price, ret
+        """
+        cte, params = self._returns_cte(tickers, period, price)
+        clauses, date_params = self._date_filter(start, end)
+        where = " AND ".join(["ret IS NOT NULL"] + clauses)
+        sql = f"WITH {cte} SELECT ticker, date, price, ret FROM r WHERE {where} ORDER BY ticker, date"
+        return self._run(sql, params + date_params, chunk_size)
+
+    def rolling(self, window: int = 20, tickers=None, start=None, end=None, price: str = 'adj_close',
+                chunk_size: int = None):
+        """
+        Trailing window aggregates per ticker. Values are NULL until the
+        window is full, like pandas' rolling().
+
+        Returns:
+            ticker, date, price, rolling_mean, rolling_std, rolling_min,
+            rolling_max, rolling_volume (average volume)
+        """
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        where, params = self._ticker_filter(tickers)
+        price = self._field(price)
+        full = f"COUNT(dev) OVER w = {int(window)}"
+        clauses, date_params = self._date_filter(start, end)
+        outer = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # The variance is taken over deviations from each ticker's mean price:
+        # E[x^2] - E[x]^2 on raw prices loses most of its digits to
+        # cancellation at high price levels.
+        sql = f"""
+            WITH b AS (
+                SELECT ticker, date, volume, {price} AS price,
+                       {price} - AVG({price}) OVER (PARTITION BY ticker) AS dev
+                FROM {self.table_name} {where}
+            ),
+            a AS (
+                SELECT ticker, date, price,
+                       CASE WHEN {full} THEN AVG(price) OVER w END AS rolling_mean,
+                       CASE WHEN {full} THEN
+                           SQRT(MAX(AVG(dev * dev) OVER w - AVG(dev) OVER w * AVG(dev) OVER w, 0)
+                                * {int(window)} / {int(window) - 1})
+                       END AS rolling_std,
+                       CASE WHEN {full} THEN MIN(price) OVER w END AS rolling_min,
+                       CASE WHEN {full} THEN MAX(price) OVER w END AS rolling_max,
+                       CASE WHEN {full} THEN AVG(volume) OVER w END AS rolling_volume
+                FROM b
+                WINDOW w AS (PARTITION BY ticker ORDER BY date ROWS BETWEEN {int(window) - 1} PRECEDING AND CURRENT ROW)
+            )
+            SELECT * FROM a {outer} ORDER BY ticker, date"""
+        return self._run(sql, params + date_params, chunk_size)
+
+    def cross_sectional_ranks(self, tickers=None, start=None, end=None, period: int = 1,
+                              price: str = 'adj_close', chunk_size: int = None):
+        """
+        Rank every ticker's return against the others on the same date
+        (1 = best).
+
+        Returns:
+            date, ticker, ret, rank, pct_rank (0 = worst, 1 = best), n_tickers
+        """
+        cte, params = self._returns_cte(tickers, period, price)
+        clauses, date_params = self._date_filter(start, end)
+        where = " AND ".join(["ret IS NOT NULL"] + clauses)
+        sql = f"""
+            WITH {cte}
+            SELECT date, ticker, ret,
+                   RANK() OVER d AS rank,
+                   1 - PERCENT_RANK() OVER d AS pct_rank,
+                   COUNT(*) OVER (PARTITION BY date) AS n_tickers
+            FROM r WHERE {where}
+            WINDOW d AS (PARTITION BY date ORDER BY ret DESC)
+            ORDER BY date, rank"""
+        return self._run(sql, params + date_params, chunk_size)
+
+    def _stats_sql(self, tickers, start, end, period: int):
+        cte, params = self._returns_cte(tickers, period, 'adj_close')
+        clauses, date_params = self._date_filter(start, end)
+        where = " AND ".join(["ret IS NOT NULL"] + clauses)
+        # Two passes (mean first, then squared deviations) keep the variance
+        # accurate for small daily returns.
+        sql = f"""
+            WITH {cte},
+            f AS (SELECT * FROM r WHERE {where}),
+            m AS (SELECT ticker, AVG(ret) AS mean, COUNT(ret) AS n FROM f GROUP BY ticker)
+            SELECT f.ticker AS ticker,
+                   MIN(f.date) AS start_date,
+                   MAX(f.date) AS end_date,
+                   m.mean AS mean,
+                   SQRT(SUM((f.ret - m.mean) * (f.ret - m.mean)) / (m.n - 1)) AS standard_deviation,
+                   MIN(f.ret) AS min_return,
+                   MAX(f.ret) AS max_return,
+                   m.n AS num_days,
+                   SUM(f.volume = 0) AS zero_vol_count
+            FROM f JOIN m ON f.ticker = m.ticker
+            GROUP BY f.ticker
+            ORDER BY f.ticker"""
+        return sql, params + date_params
+
+    def summary(self, tickers=None, start=None, end=None, period: int = 1, chunk_size: int = None):
+        """
+        MarketDataProcessor.summary() for every ticker in one query.
+
+        Returns:
+            ticker, mean_daily_return, volatility, min_return, max_return, num_days
+        """
+        stats, params = self._stats_sql(tickers, start, end, period)
+        sql = f"""
+            SELECT ticker, mean AS mean_daily_return, standard_deviation AS volatility,
+                   min_return, max_return, num_days
+            FROM ({stats})"""
+        return self._run(sql, params, chunk_size)
+
+    def diagnostics(self, tickers=None, start=None, end=None, period: int = 1, chunk_size: int = None):
+        """
+        MarketDataProcessor.diagnostics() for every ticker in one query, over
+        the bars that have a return. Ordering and uniqueness of dates are
+        guaranteed by the (ticker, date) primary key.
+
+        Returns:
+            ticker, start_date, end_date, mean, standard_deviation, max_return,
+            min_return, zero_vol_count, percent_zero, is_increasing, is_index_unique
+        """
+        stats, params = self._stats_sql(tickers, start, end, period)
+        sql = f"""
+            SELECT ticker, start_date, end_date, mean, standard_deviation, max_return, min_return,
+                   zero_vol_count, 100.0 * zero_vol_count / num_days AS percent_zero,
+                   1 AS is_increasing, 1 AS is_index_unique
+            FROM ({stats})"""
+        return self._run(sql, params, chunk_size, self._booleans)
+
+    @staticmethod
+    def _booleans(df: pd.DataFrame) -> pd.DataFrame:
+        df['is_increasing'] = df['is_increasing'].astype(bool)
+        df['is_index_unique'] = df['is_index_unique'].astype(bool)
+        return df
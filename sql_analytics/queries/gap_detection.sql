@@ -4,9 +4,17 @@ WITH prev_prices as(
     date,
     close,
     open,
-    LAG(close) OVER (PARTITION BY ticker ORDER BY date) as prev_close,
-    (open - prev_close) / prev_close  as gap
+    LAG(close) OVER (PARTITION BY ticker ORDER BY date) as prev_close
     FROM prices
+),
+gaps as(
+    SELECT
+    ticker,
+    date,
+    prev_close,
+    open,
+    (open - prev_close) / prev_close as gap
+    FROM prev_prices
 )
 
 SELECT
@@ -15,5 +23,4 @@ date,
 prev_close,
 open,
 gap
-FROM prev_prices WHERE ABS(gap) > 0.02 ORDER BY ABS(gap) DESC
-
+FROM gaps WHERE ABS(gap) > 0.02 ORDER BY ABS(gap) DESC
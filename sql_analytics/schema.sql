@@ -0,0 +1,20 @@
+-- Price history written by data_processing.db_handler.PriceStore
+-- One row per (ticker, date); dates are ISO-8601 text ('YYYY-MM-DD HH:MM:SS')
+-- so lexical order is chronological order.
+
+PRAGMA journal_mode = WAL;
+
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    adj_close REAL,
+    volume INTEGER,
+    ret_1d REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_prices_date ON prices (date);
@@ -48,3 +48,564 @@ def test_data_handler_get_data_up_to_last_date_inclusive():
     out = h.get_data_up_to("2023-01-03")
     assert len(out) == 3
     assert out.index[-1] == pd.Timestamp("2023-01-03")
+
+
+def _random_walk_prices(n=300, seed=7):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n, freq="B")
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    return pd.DataFrame({"Adj Close": close, "close": close}, index=idx)
+
+
+def test_moving_average_generate_signals_matches_generate_signal():
+    from backtesting.strategy import MovingAverageCrossover
+    df = _random_walk_prices()
+    strategy = MovingAverageCrossover(short_window=5, long_window=20, quantity=10)
+    signals = strategy.generate_signals(df)
+    expected = [strategy.generate_signal(df.iloc[:i])["action"] for i in range(1, len(df) + 1)]
+    assert signals["action"].tolist() == expected
+    assert (signals["action"] != "HOLD").any()
+
+
+def test_backtester_vectorized_matches_loop():
+    from backtesting.backtester import Backtester
+    from backtesting.strategy import MovingAverageCrossover
+    df = _random_walk_prices()
+    loop = Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000).run()
+    vec = Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000).run(mode="vectorized")
+    assert len(loop) == len(vec)
+    for a, b in zip(loop, vec):
+        assert a["date"] == b["date"]
+        assert a["signal"] == b["signal"]
+        assert a["portfolio"] == b["portfolio"]
+        assert a["current_cash"] == pytest.approx(b["current_cash"])
+        assert a["portfolio_value"] == pytest.approx(b["portfolio_value"])
+
+
+def test_backtester_rejects_unknown_mode():
+    from backtesting.backtester import Backtester
+    from backtesting.strategy import MovingAverageCrossover
+    bt = Backtester(MovingAverageCrossover(5, 20), _random_walk_prices(60), "TEST")
+    with pytest.raises(ValueError, match="Unknown backtest mode"):
+        bt.run(mode="turbo")
+
+
+def test_ring_buffer_evicts_oldest():
+    from backtesting.streaming import RingBuffer
+    buf = RingBuffer(3)
+    assert buf.append(1.0) is None
+    buf.append(2.0)
+    buf.append(3.0)
+    assert buf.append(4.0) == 1.0
+    assert buf.to_array().tolist() == [2.0, 3.0, 4.0]
+
+
+def test_rolling_mean_matches_pandas():
+    import numpy as np
+    from backtesting.streaming import RollingMean
+    values = _random_walk_prices(100)["close"]
+    rm = RollingMean(10)
+    streamed = np.array([rm.update(v) for v in values])
+    expected = values.rolling(10).mean().to_numpy()
+    np.testing.assert_allclose(streamed, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_rolling_mean_recovers_after_a_gap():
+    import numpy as np
+    from backtesting.streaming import RollingMean
+    values = _random_walk_prices(100)["close"].copy()
+    values.iloc[[15, 40, 41]] = np.nan
+    rm = RollingMean(10)
+    streamed = np.array([rm.update(v) for v in values])
+    expected = values.rolling(10).mean().to_numpy()
+    np.testing.assert_allclose(streamed, expected, rtol=1e-12, equal_nan=True)
+    assert not np.isnan(streamed[-1])
+
+
+def test_moving_average_on_bar_matches_generate_signals():
+    from backtesting.strategy import MovingAverageCrossover
+    df = _random_walk_prices()
+    strategy = MovingAverageCrossover(short_window=5, long_window=20, quantity=10)
+    streamed = [strategy.on_bar({"close": c})["action"] for c in df["close"]]
+    assert streamed == strategy.generate_signals(df)["action"].tolist()
+    strategy.reset()
+    assert strategy.on_bar({"close": 1.0}) == {"action": "HOLD", "quantity": 0}
+
+
+def test_data_handler_rejects_unsorted_index():
+    idx = pd.DatetimeIndex(["2023-01-02", "2023-01-01"])
+    with pytest.raises(ValueError, match="sorted ascending"):
+        DataHandler(pd.DataFrame({"Close": [1.0, 2.0]}, index=idx))
+
+
+def test_data_handler_get_data_up_to_between_bars():
+    idx = pd.DatetimeIndex(["2023-01-02", "2023-01-04", "2023-01-06"])
+    h = DataHandler(pd.DataFrame({"Close": [1.0, 2.0, 3.0]}, index=idx))
+    assert len(h.get_data_up_to("2023-01-05")) == 2
+
+
+def test_data_handler_window_is_read_only_view():
+    import numpy as np
+    idx = pd.date_range("2023-01-01", periods=5, freq="D")
+    df = pd.DataFrame({"Close": [100.0, 101, 102, 103, 104]}, index=idx)
+    h = DataHandler(df)
+    window = h.get_window("2023-01-03")
+    assert len(window) == 3
+    assert window["Close"].tolist() == [100.0, 101.0, 102.0]
+    assert np.shares_memory(window["Close"], h.arrays["Close"])
+    assert window.index[-1] == pd.Timestamp("2023-01-03")
+    with pytest.raises(ValueError):
+        window["Close"][0] = 0.0
+    pd.testing.assert_frame_equal(window.to_frame(), df.iloc[:3])
+
+
+def test_backtester_history_loop_matches_vectorized():
+    from backtesting.backtester import Backtester
+    from backtesting.strategy import MovingAverageCrossover
+
+    class HistoryOnly(MovingAverageCrossover):
+        supports_streaming = False
+
+    df = _random_walk_prices(150)
+    loop = Backtester(HistoryOnly(5, 20, 50), df, "TEST").run()
+    vec = Backtester(HistoryOnly(5, 20, 50), df, "TEST").run(mode="vectorized")
+    assert [r["signal"] for r in loop] == [r["signal"] for r in vec]
+    assert [r["portfolio_value"] for r in loop] == pytest.approx([r["portfolio_value"] for r in vec])
+
+
+def test_portfolio_backtester_single_symbol_matches_backtester():
+    from backtesting.backtester import Backtester
+    from backtesting.portfolio_backtester import PortfolioBacktester
+    from backtesting.strategy import MovingAverageCrossover
+    df = _random_walk_prices()
+    single = Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000).run(mode="vectorized")
+    multi = PortfolioBacktester(MovingAverageCrossover(5, 20, 100), {"TEST": df}, 20000).run()
+    assert [r["portfolio"] for r in single] == [r["portfolio"] for r in multi]
+    assert [r["portfolio_value"] for r in single] == pytest.approx([r["portfolio_value"] for r in multi])
+
+
+def test_portfolio_backtester_shares_cash_across_symbols():
+    from backtesting.portfolio_backtester import PortfolioBacktester
+    from backtesting.strategy import MovingAverageCrossover
+    data = {
+        "AAA": _random_walk_prices(200, seed=1),
+        "BBB": _random_walk_prices(200, seed=2).iloc[30:],
+    }
+    bt = PortfolioBacktester({"AAA": MovingAverageCrossover(5, 20, 10),
+                              "BBB": MovingAverageCrossover(3, 15, 10)}, data, 50000)
+    results = bt.run()
+    assert len(results) == 200
+    last = results[-1]
+    closes = {t: df["close"].iloc[-1] for t, df in data.items()}
+    expected = last["current_cash"] + sum(q * closes[t] for t, q in last["portfolio"].items())
+    assert last["portfolio_value"] == pytest.approx(expected)
+    traded = {t.ticker for t in bt.portfolio.trades}
+    assert traded == {"AAA", "BBB"}
+
+
+def test_portfolio_backtester_requires_strategy_per_ticker():
+    from backtesting.portfolio_backtester import PortfolioBacktester
+    from backtesting.strategy import MovingAverageCrossover
+    with pytest.raises(ValueError, match="No strategy"):
+        PortfolioBacktester({"AAA": MovingAverageCrossover()}, {"AAA": _random_walk_prices(60),
+                                                                  "BBB": _random_walk_prices(60)})
+
+
+def test_parameter_grid_expands_all_combinations():
+    from backtesting.optimization import parameter_grid
+    combos = parameter_grid({"short_window": [5, 10], "long_window": [20, 30, 40]})
+    assert len(combos) == 6
+    assert {"short_window": 10, "long_window": 40} in combos
+
+
+def test_run_sweep_parallel_matches_serial():
+    from backtesting.optimization import run_sweep
+    df = _random_walk_prices(250)
+    grid = {"short_window": [5, 10], "long_window": [20, 30], "quantity": [50]}
+    serial = run_sweep(df, grid, "TEST", processes=1)
+    parallel = run_sweep(df, grid, "TEST", processes=2)
+    assert len(serial) == 4
+    assert {"short_window", "long_window", "sharpe_ratio", "max_drawdown", "value_at_risk"} <= set(serial.columns)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_shared_frame_stores_datetime_index_as_ticks():
+    import numpy as np
+    from backtesting import optimization
+    from backtesting.optimization import SharedFrame
+    df = _random_walk_prices(50).tz_localize("America/New_York")
+    with SharedFrame(df) as shared:
+        assert "index_dtype" not in shared.spec and shared.spec["tz"] == "America/New_York"
+        optimization._init_worker(shared.spec)
+        frame = optimization._worker_data
+        pd.testing.assert_index_equal(frame.index, df.index)
+        np.testing.assert_array_equal(frame["close"], df["close"])
+        del frame
+        optimization._release_worker()
+        assert optimization._worker_shm is None and optimization._worker_data is None
+    with pytest.raises(ValueError, match="DatetimeIndex"):
+        SharedFrame(df.reset_index(drop=True))
+
+def test_columnar_results_match_records():
+    from backtesting.backtester import Backtester
+    from backtesting.strategy import MovingAverageCrossover
+    df = _random_walk_prices()
+    records = Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000).run()
+    for mode in ("loop", "vectorized"):
+        bt = Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000, results_format="columnar")
+        frame = bt.run(mode=mode)
+        assert list(frame.columns) == ["portfolio_value", "current_cash", "position_TEST"]
+        assert frame["portfolio_value"].tolist() == pytest.approx([r["portfolio_value"] for r in records])
+        assert frame["position_TEST"].tolist() == [r["portfolio"].get("TEST", 0) for r in records]
+        assert len(bt.recorder.fills()) == len(bt.portfolio.trades)
+
+
+def test_columnar_results_without_positions():
+    from backtesting.portfolio_backtester import PortfolioBacktester
+    from backtesting.strategy import MovingAverageCrossover
+    data = {"AAA": _random_walk_prices(120, seed=1), "BBB": _random_walk_prices(120, seed=2)}
+    bt = PortfolioBacktester(MovingAverageCrossover(5, 20, 10), data, results_format="columnar",
+                             record_positions=False)
+    frame = bt.run()
+    assert list(frame.columns) == ["portfolio_value", "current_cash"]
+    assert bt.recorder.positions is None
+    assert len(bt.recorder.returns()) == len(frame) - 1
+
+
+def _ohlcv_prices(n=300, seed=7):
+    import numpy as np
+    df = _random_walk_prices(n, seed)
+    rng = np.random.default_rng(seed + 1)
+    df["Open"] = df["close"] * (1 + rng.normal(0, 0.002, n))
+    df["Volume"] = rng.integers(500, 5_000, n).astype(float)
+    return df
+
+
+def test_execution_model_costs_and_partial_fills():
+    from backtesting.execution import ExecutionModel
+    model = ExecutionModel(commission_per_share=0.01, commission_bps=10, spread_bps=20,
+                           impact_bps=100, max_participation=0.1)
+    prices, fees = model.quote([1, -1], [100, 100], [50.0, 50.0], [1000.0, 1000.0])
+    # half spread (10 bps) + 10% participation * 100 bps = 20 bps
+    assert prices.tolist() == pytest.approx([50.1, 49.9])
+    assert fees[0] == pytest.approx(100 * (0.01 + 50.1 * 0.001))
+    fill = model.execute("BUY", 500, 50.0, 1000.0, cash=1e6, position=0)
+    assert fill["quantity"] == 100
+    fill = model.execute("BUY", 100, 50.0, 1e9, cash=1000.0, position=0)
+    assert fill["quantity"] == 19
+    assert fill["quantity"] * fill["price"] + fill["fees"] <= 1000.0
+    with pytest.raises(ValueError, match="not fillable"):
+        model.execute("SELL", 10, 50.0, 1000.0, cash=0.0, position=0)
+    strict = ExecutionModel(max_participation=0.1, allow_partial=False)
+    with pytest.raises(ValueError, match="partial"):
+        strict.execute("BUY", 500, 50.0, 1000.0, cash=1e6, position=0)
+
+
+def test_backtester_execution_loop_matches_vectorized():
+    from backtesting.backtester import Backtester
+    from backtesting.execution import ExecutionModel
+    from backtesting.strategy import MovingAverageCrossover
+    df = _ohlcv_prices()
+    for fill_at in ("close", "next_open"):
+        model = ExecutionModel(commission_bps=5, spread_bps=10, impact_bps=50,
+                               max_participation=0.05, fill_at=fill_at)
+        loop_bt = Backtester(MovingAverageCrossover(5, 20, 200), df, "TEST", 20000, execution=model)
+        vec_bt = Backtester(MovingAverageCrossover(5, 20, 200), df, "TEST", 20000, execution=model)
+        loop = loop_bt.run()
+        vec = vec_bt.run(mode="vectorized")
+        assert [r["portfolio"] for r in loop] == [r["portfolio"] for r in vec]
+        assert [r["portfolio_value"] for r in loop] == pytest.approx([r["portfolio_value"] for r in vec])
+        assert loop_bt.portfolio.trades == vec_bt.portfolio.trades
+        assert loop_bt.rejected_orders == vec_bt.rejected_orders
+        assert all(t.fees > 0 for t in loop_bt.portfolio.trades)
+
+
+def test_portfolio_backtester_execution_matches_backtester():
+    from backtesting.backtester import Backtester
+    from backtesting.execution import ExecutionModel
+    from backtesting.portfolio_backtester import PortfolioBacktester
+    from backtesting.strategy import MovingAverageCrossover
+    df = _ohlcv_prices()
+    for fill_at in ("close", "next_open"):
+        model = ExecutionModel(commission_bps=5, spread_bps=10, impact_bps=50,
+                               max_participation=0.05, fill_at=fill_at)
+        single = Backtester(MovingAverageCrossover(5, 20, 200), df, "TEST", 20000, execution=model)
+        multi = PortfolioBacktester(MovingAverageCrossover(5, 20, 200), {"TEST": df}, 20000, execution=model)
+        expected = single.run(mode="vectorized")
+        got = multi.run()
+        assert [r["portfolio"] for r in got] == [r["portfolio"] for r in expected]
+        assert [r["portfolio_value"] for r in got] == pytest.approx([r["portfolio_value"] for r in expected])
+        assert multi.portfolio.trades == single.portfolio.trades
+        assert multi.portfolio.fees_paid > 0
+        key = [(o["date"], o["action"], o["reason"]) for o in single.rejected_orders]
+        assert [(o["date"], o["action"], o["reason"]) for o in multi.rejected_orders] == key
+
+
+def test_rejected_orders_order_and_missing_volume_match_across_engines():
+    import numpy as np
+    from backtesting.backtester import Backtester
+    from backtesting.execution import ExecutionModel
+    from backtesting.portfolio_backtester import PortfolioBacktester
+    from backtesting.strategy import Strategy
+
+    df = _ohlcv_prices(n=30)
+    df.loc[df.index[6], "Volume"] = np.nan
+    schedule = {df.index[3]: ("SELL", 10), df.index[5]: ("BUY", 10), df.index[-1]: ("SELL", 10)}
+
+    class Scheduled(Strategy):
+        def generate_signal(self, data):
+            action, quantity = schedule.get(data.index[-1], ("HOLD", 0))
+            return {"action": action, "quantity": quantity}
+
+    model = ExecutionModel(max_participation=0.01, fill_at="next_open")
+    loop = Backtester(Scheduled(), df, "TEST", 20000, execution=model)
+    loop.run(mode="loop")
+    vectorized = Backtester(Scheduled(), df, "TEST", 20000, execution=model)
+    vectorized.run(mode="vectorized")
+    multi = PortfolioBacktester(Scheduled(), {"TEST": df}, 20000, execution=model)
+    multi.run()
+    # Missing volume leaves the fill uncapped, like Backtester.
+    assert multi.portfolio.positions == loop.portfolio.positions == {"TEST": 10}
+    expected = [(o["date"], o["reason"]) for o in loop.rejected_orders]
+    assert [r for _, r in expected][-1] == "No bar left to fill the order" and len(expected) == 2
+    assert [(o["date"], o["reason"]) for o in vectorized.rejected_orders] == expected
+    assert [(o["date"], o["reason"]) for o in multi.rejected_orders] == expected
+
+
+def test_backtester_next_open_fills_on_following_bar():
+    from backtesting.backtester import Backtester
+    from backtesting.execution import ExecutionModel
+    from backtesting.strategy import MovingAverageCrossover
+    df = _ohlcv_prices()
+    bt = Backtester(MovingAverageCrossover(5, 20, 10), df, "TEST", results_format="columnar",
+                    execution=ExecutionModel(fill_at="next_open"))
+    bt.run()
+    signals = MovingAverageCrossover(5, 20, 10).generate_signals(df)
+    first_buy = signals.index[signals["action"] == "BUY"][0]
+    fills = bt.recorder.fills()
+    first_fill = fills[fills["action"] == "BUY"].iloc[0]
+    assert first_fill["date"] == df.index[df.index.get_loc(first_buy) + 1]
+    assert first_fill["price"] == df.loc[first_fill["date"], "Open"]
+
+
+def test_backtester_records_rejected_orders(caplog):
+    import logging
+    from backtesting.backtester import Backtester
+    from backtesting.strategy import MovingAverageCrossover
+    bt = Backtester(MovingAverageCrossover(5, 20, 10_000), _random_walk_prices(), "TEST", 1000)
+    with caplog.at_level(logging.INFO, logger="backtesting.backtester"):
+        bt.run()
+    assert bt.rejected_orders
+    assert len(bt.portfolio.trades) == 0
+    assert "Order rejected" in caplog.text
+
+
+def test_trade_ledger_grows_and_exports():
+    from backtesting.ledger import TradeLedger
+
+    ledger = TradeLedger(capacity=1)
+    ledger.append(pd.Timestamp("2024-01-02"), "AAA", "BUY", 10, 5.0, 1.0)
+    ledger.append(pd.Timestamp("2024-01-03"), "BBB", "BUY", 3, 7.5)
+    ledger.append(pd.Timestamp("2024-01-04"), "AAA", "SELL", 4, 6.0, 0.5)
+
+    assert len(ledger) == 3
+    assert ledger.registry.symbols == ["AAA", "BBB"]
+    assert ledger[-1].ticker == "AAA" and ledger[-1].action == "SELL" and ledger[-1].quantity == 4
+    assert [t.ticker for t in ledger[:2]] == ["AAA", "BBB"]
+    frame = ledger.to_frame()
+    assert list(frame.columns) == ["timestamp", "ticker", "action", "quantity", "price", "fees"]
+    assert frame["fees"].sum() == pytest.approx(1.5)
+    with pytest.raises(IndexError):
+        ledger[3]
+
+
+def test_portfolio_incremental_pnl_and_closed_positions():
+    from backtesting.portfolio import Portfolio
+
+    portfolio = Portfolio(1000)
+    portfolio.buy("AAA", 10, 10.0, fees=1.0)
+    portfolio.buy("AAA", 10, 12.0, fees=1.0)
+    assert portfolio.average_costs["AAA"] == pytest.approx(11.0)
+    assert portfolio.cost_basis == pytest.approx(220.0)
+    assert portfolio.unrealized_pnl({"AAA": 12.0}) == pytest.approx(20.0)
+
+    portfolio.sell("AAA", 5, 13.0, fees=0.5)
+    assert portfolio.realized_pnl == pytest.approx(5 * 2.0 - 2.5)
+    portfolio.sell("AAA", 15, 9.0)
+    assert "AAA" not in portfolio.positions
+    assert portfolio.cost_basis == pytest.approx(0.0)
+    assert portfolio.realized_pnl == pytest.approx(portfolio.cash - portfolio.initial_cash)
+    assert portfolio.fees_paid == pytest.approx(2.5)
+    assert portfolio.turnover == pytest.approx(100 + 120 + 65 + 135)
+    assert len(portfolio.trades) == 4
+
+    with pytest.raises(ValueError, match="positive"):
+        portfolio.buy("BBB", 0, 10.0)
+    with pytest.raises(ValueError, match="positive"):
+        portfolio.sell("AAA", -1, 10.0)
+    assert "BBB" not in portfolio.positions and len(portfolio.trades) == 4
+
+
+def test_portfolio_mark_to_market_matches_get_value():
+    from backtesting.portfolio import Portfolio
+
+    portfolio = Portfolio(10000)
+    portfolio.buy("AAA", 10, 100.0)
+    portfolio.buy("BBB", 5, 50.0)
+    assert portfolio.mark_to_market({"AAA": 110.0, "BBB": 40.0}) == pytest.approx(10000 + 100 - 50)
+    # Vector form; a NaN keeps the previous mark
+    value = portfolio.mark_to_market([120.0, float("nan")], tickers=["AAA", "BBB"])
+    frame = pd.DataFrame({"ticker": ["AAA", "BBB"], "close": [120.0, 40.0]})
+    assert value == pytest.approx(portfolio.get_value(frame))
+    assert portfolio.gross_exposure == pytest.approx(10 * 120.0 + 5 * 40.0)
+    assert portfolio.net_exposure == portfolio.gross_exposure
+    assert portfolio.unrealized_pnl() == pytest.approx(portfolio.unrealized_pnl({"AAA": 120.0, "BBB": 40.0}))
+    portfolio.sell("AAA", 10, 120.0)
+    assert portfolio.equity == pytest.approx(portfolio.cash + 5 * 40.0)
+    assert portfolio.unrealized_pnl() == pytest.approx(5 * (40.0 - 50.0))
+
+
+def test_backtester_incremental_valuation_matches_audit():
+    from backtesting.backtester import Backtester
+    from backtesting.strategy import MovingAverageCrossover, Strategy
+
+    class HistoryOnly(Strategy):
+        def __init__(self):
+            self.inner = MovingAverageCrossover(5, 20, 50)
+
+        def generate_signal(self, data):
+            return self.inner.generate_signal(data)
+
+    df = _random_walk_prices(150)
+    for strategy_cls in (lambda: MovingAverageCrossover(5, 20, 50), HistoryOnly):
+        fast = Backtester(strategy_cls(), df, "TEST", 20000).run()
+        audit = Backtester(strategy_cls(), df, "TEST", 20000, valuation="audit").run()
+        assert [r["portfolio_value"] for r in fast] == pytest.approx([r["portfolio_value"] for r in audit])
+
+
+def test_walk_forward_folds_rolling_and_anchored():
+    from backtesting.data_handler import DataHandler
+    from backtesting.walk_forward import walk_forward_folds
+
+    handler = DataHandler(_random_walk_prices(100))
+    rolling = walk_forward_folds(handler, train_size=40, test_size=25)
+    assert [(f["train"].start, f["train"].stop, f["test"].start, f["test"].stop) for f in rolling] == [
+        (0, 40, 40, 65), (25, 65, 65, 90), (50, 90, 90, 100)]
+    anchored = walk_forward_folds(handler, train_size=40, test_size=25, anchored=True)
+    assert [f["train"].start for f in anchored] == [0, 0, 0]
+    assert anchored[1]["test_start"] == handler.index[65]
+    with pytest.raises(ValueError, match="Not enough data"):
+        walk_forward_folds(handler, train_size=100, test_size=10)
+
+
+def test_backtester_precomputed_signals_match_strategy():
+    from backtesting.backtester import Backtester
+    from backtesting.strategy import MovingAverageCrossover
+
+    df = _random_walk_prices()
+    strategy = MovingAverageCrossover(5, 20, 50)
+    signals = strategy.generate_signals(df)
+    own = Backtester(strategy, df, "TEST", 20000).run(mode="vectorized")
+    given = Backtester(strategy, df, "TEST", 20000).run(mode="vectorized", signals=signals)
+    assert [r["portfolio_value"] for r in own] == [r["portfolio_value"] for r in given]
+    with pytest.raises(ValueError, match="Expected"):
+        Backtester(strategy, df, "TEST").run(mode="vectorized", signals=signals.iloc[1:])
+
+
+def test_walk_forward_stitches_out_of_sample_equity():
+    from backtesting.walk_forward import WalkForward
+
+    df = _random_walk_prices(400, seed=3)
+    grid = {"short_window": [5, 10], "long_window": [20, 40], "quantity": [50]}
+    wf = WalkForward(df, grid, "TEST", train_size=150, test_size=50, initial_cash=20000)
+    serial = wf.run(processes=1)
+    parallel = wf.run(processes=2)
+
+    folds = serial["folds"]
+    assert len(folds) == len(wf.folds) == 5
+    assert serial["equity"].index[0] == df.index[150]
+    assert len(serial["equity"]) == 250
+    assert serial["equity"].iloc[-1] == pytest.approx(20000 * (1 + folds["test_return"]).prod())
+    assert serial["equity"].tolist() == pytest.approx(parallel["equity"].tolist())
+    assert folds["short_window"].tolist() == parallel["folds"]["short_window"].tolist()
+    assert "sharpe_ratio" in serial["metrics"]
+
+
+def test_instrumentation_records_stages_counters_and_hooks():
+    from backtesting.backtester import Backtester
+    from backtesting.instrumentation import Instrumentation
+    from backtesting.strategy import MovingAverageCrossover
+
+    df = _random_walk_prices(200)
+    plain = Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000).run()
+    instrumentation = Instrumentation()
+    events = []
+    instrumentation.add_hook(lambda kind, name, value: events.append((kind, name)))
+    bt = Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000, instrumentation=instrumentation)
+    assert [r["portfolio_value"] for r in bt.run()] == [r["portfolio_value"] for r in plain]
+
+    summary = instrumentation.summary()
+    assert set(summary["stage"]) == {"data_slicing", "signal_generation", "order_handling", "valuation",
+                                     "recording"}
+    assert instrumentation.stages["signal_generation"].calls == 200
+    assert instrumentation.stages["order_handling"].calls == 200
+    assert (summary["p50_s"] <= summary["max_s"]).all()
+    counters = instrumentation.counters
+    assert counters["bars"] == 200
+    assert counters["orders"] == counters["fills"] + counters.get("rejected_orders", 0)
+    assert counters.get("rejected_orders", 0) == len(bt.rejected_orders)
+    assert ("counter", "bars") in events and ("stage", "valuation") in events
+
+    loop_counters = dict(counters)
+    instrumentation.reset()
+    Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000,
+               instrumentation=instrumentation).run(mode="vectorized")
+    assert instrumentation.stages["order_handling"].calls == 1
+    assert instrumentation.counters == loop_counters
+    assert "bars" in instrumentation.report()
+
+
+def test_event_engine_merges_feeds_in_time_order():
+    from backtesting.events import EventEngine, MARKET, SIGNAL, SignalEvent
+
+    engine = EventEngine()
+    engine.add_feed(iter([(1, "D", {}), (5, "D", {}), (9, "D", {})]))
+    engine.add_feed(iter([(2, "M", {}), (3, "M", {}), (5, "M", {}), (6, "M", {})]))
+    seen = []
+    engine.subscribe(MARKET, lambda e: seen.append((e.timestamp, e.ticker)))
+    engine.subscribe(MARKET, lambda e: engine.emit(SignalEvent(e.timestamp, e.ticker, "BUY", 1))
+                     if e.ticker == "D" else None)
+    engine.subscribe(SIGNAL, lambda e: seen.append((e.timestamp, "signal")))
+    engine.run()
+    assert seen == [(1, "D"), (1, "signal"), (2, "M"), (3, "M"), (5, "D"), (5, "signal"), (5, "M"),
+                    (6, "M"), (9, "D"), (9, "signal")]
+    assert engine.events_processed == 10
+
+
+def test_event_backtester_matches_backtester():
+    from backtesting.backtester import Backtester
+    from backtesting.events import EventBacktester
+    from backtesting.execution import ExecutionModel
+    from backtesting.strategy import MovingAverageCrossover
+
+    df = _ohlcv_prices()
+    for execution in (None, ExecutionModel(commission_bps=5, spread_bps=10, fill_at="next_open")):
+        expected = Backtester(MovingAverageCrossover(5, 20, 100), df, "TEST", 20000, execution=execution).run()
+        bt = EventBacktester(MovingAverageCrossover(5, 20, 100), {"TEST": df}, 20000, execution=execution)
+        out = bt.run()
+        assert out["portfolio_value"].tolist() == pytest.approx([r["portfolio_value"] for r in expected])
+        assert len(bt.portfolio.trades) > 0
+
+
+def test_event_backtester_mixes_frequencies():
+    from backtesting.events import EventBacktester
+    from backtesting.strategy import MovingAverageCrossover
+
+    daily = _random_walk_prices(60, seed=1)
+    intraday = _random_walk_prices(240, seed=2)
+    intraday.index = pd.date_range(daily.index[0], periods=240, freq="6h")
+    bt = EventBacktester(MovingAverageCrossover(5, 20, 10), {"D": daily, "I": intraday}, 50000)
+    out = bt.run()
+    assert out.index.is_monotonic_increasing and out.index.is_unique
+    assert out.index.union(daily.index).union(intraday.index).equals(out.index)
@@ -0,0 +1,40 @@
+"""Tests for the offline benchmark suite."""
+
+import pytest
+
+from benchmarks.suite import compare, run_suite, scaling
+from benchmarks.synthetic import synthetic_ohlcv, synthetic_universe
+
+
+def test_synthetic_ohlcv_is_seeded_and_consistent():
+    a = synthetic_ohlcv(500, seed=1)
+    b = synthetic_ohlcv(500, seed=1)
+    assert a.equals(b)
+    assert not a.equals(synthetic_ohlcv(500, seed=2))
+    assert (a["High"] >= a[["Open", "Close"]].max(axis=1)).all()
+    assert (a["Low"] <= a[["Open", "Close"]].min(axis=1)).all()
+    assert a.index.is_monotonic_increasing
+
+
+def test_synthetic_universe_keeps_symbols_stable():
+    small = synthetic_universe(50, 2, seed=3)
+    large = synthetic_universe(50, 4, seed=3)
+    assert list(large)[:2] == list(small)
+    assert large["SYM0001"].equals(small["SYM0001"])
+
+
+def test_run_suite_and_compare_flag_slowdowns():
+    results = run_suite(cases=["generate_signals", "portfolio_get_value"], bars=[200, 400], symbols=[1, 2],
+                        repeat=1)
+    assert {(r["case"], r["n_symbols"]) for r in results} == {
+        ("generate_signals", 1), ("portfolio_get_value", 1), ("portfolio_get_value", 2)}
+    assert all(r["throughput"] > 0 and r["peak_mb"] >= 0 for r in results)
+    assert len(scaling(results)) == 3
+
+    baseline = [dict(r) for r in results]
+    baseline[0]["throughput"] *= 10
+    report = compare(results, baseline, tolerance=0.25)
+    assert report["slower"].tolist() == [True] + [False] * (len(results) - 1)
+
+    with pytest.raises(ValueError, match="Unknown benchmark cases"):
+        run_suite(cases=["nope"])
@@ -0,0 +1,102 @@
+"""Tests for the memory-mapped columnar price store."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.backtester import Backtester
+from backtesting.data_handler import DataHandler
+from backtesting.strategy import MovingAverageCrossover
+from data_processing.columnar_store import ColumnarStore
+from data_processing.market_data_processor import MarketDataProcessor
+
+
+def _ohlcv(periods=200, seed=0, start="2023-01-02"):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(start, periods=periods)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, periods))
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Adj Close": close, "Volume": rng.integers(1_000, 10_000, periods), "close": close,
+    }, index=idx)
+
+
+def test_store_round_trip_is_memory_mapped(tmp_path):
+    df = _ohlcv()
+    store = ColumnarStore(str(tmp_path))
+    assert store.write("AAA", df) == 200
+    assert store.tickers() == ["AAA"]
+
+    out = store.read("AAA")
+    pd.testing.assert_frame_equal(out, df, check_freq=False, check_index_type=False)
+    values = out["Adj Close"].to_numpy()
+    while not isinstance(values, np.memmap) and values.base is not None:
+        values = values.base
+    assert isinstance(values, np.memmap)
+
+    window = store.read("AAA", start=df.index[10], end=df.index[19], columns=["close"])
+    assert list(window.columns) == ["close"]
+    assert window.index[0] == df.index[10] and len(window) == 10
+
+
+def test_store_append_extends_files_and_rejects_overlap(tmp_path):
+    df = _ohlcv()
+    store = ColumnarStore(str(tmp_path))
+    store.write("AAA", df.iloc[:120])
+    assert store.append("AAA", df.iloc[120:]) == 80
+    pd.testing.assert_frame_equal(store.read("AAA"), df, check_freq=False, check_index_type=False)
+    with pytest.raises(ValueError, match="must start after"):
+        store.append("AAA", df.iloc[-5:])
+    with pytest.raises(ValueError, match="not numeric"):
+        store.write("BBB", df.assign(name="x"))
+    with pytest.raises(KeyError):
+        store.read("ZZZ")
+
+
+def test_store_append_failure_leaves_ticker_intact(tmp_path, monkeypatch):
+    df = _ohlcv()
+    store = ColumnarStore(str(tmp_path))
+    store.write("AAA", df.iloc[:120])
+    calls = []
+
+    def failing_open_memmap(*args, **kwargs):
+        if calls:
+            raise OSError("disk full")
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    original = np.lib.format.open_memmap
+    monkeypatch.setattr(np.lib.format, "open_memmap", failing_open_memmap)
+    with pytest.raises(OSError, match="disk full"):
+        store.append("AAA", df.iloc[120:])
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(store.read("AAA"), df.iloc[:120], check_freq=False, check_index_type=False)
+    assert store.tickers() == ["AAA"]
+    assert store.append("AAA", df.iloc[120:]) == 80
+    assert len(store.read("AAA")) == 200
+
+
+def test_store_encodes_ticker_directories(tmp_path):
+    df = _ohlcv(periods=20)
+    store = ColumnarStore(str(tmp_path / "store"))
+    for ticker in ["BRK/B", "../x", "^GSPC", "BRK.B"]:
+        store.write(ticker, df)
+        pd.testing.assert_frame_equal(store.read(ticker), df, check_freq=False, check_index_type=False)
+    assert not (tmp_path / "x").exists()
+    assert sorted(p.name for p in (tmp_path / "store").iterdir()) == ["..%2Fx", "BRK%2FB", "BRK.B", "^GSPC"]
+    assert store.tickers() == sorted(["BRK/B", "../x", "^GSPC", "BRK.B"])
+    with pytest.raises(ValueError, match="Invalid ticker"):
+        store.write("..", df)
+
+
+def test_backtest_from_store_matches_in_memory(tmp_path):
+    df = _ohlcv(periods=300, seed=5)
+    mdp = MarketDataProcessor("AAA", "2023-01-01", "2024-06-01")
+    mdp.data = df
+    assert mdp.save_to_columnar(str(tmp_path))["rows_saved"] == 300
+
+    handler = DataHandler.from_store(ColumnarStore(str(tmp_path)), "AAA")
+    assert handler.end == df.index[-1]
+    stored = Backtester(MovingAverageCrossover(5, 20, 50), handler.data, "AAA", 20000).run()
+    memory = Backtester(MovingAverageCrossover(5, 20, 50), df, "AAA", 20000).run()
+    assert [r["portfolio_value"] for r in stored] == pytest.approx([r["portfolio_value"] for r in memory])
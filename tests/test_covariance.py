@@ -0,0 +1,112 @@
+"""Tests for the covariance engine and portfolio risk decomposition."""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, "risk-analytics")
+from covariance import (EWMACovariance, PortfolioRisk, betas, correlation, ledoit_wolf,
+                        sample_covariance, shrink)
+
+
+def _returns(n_days=300, n_assets=6, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, (n_days, 1))
+    values = market * rng.uniform(0.5, 1.5, n_assets) + rng.normal(0, 0.01, (n_days, n_assets))
+    return pd.DataFrame(values, columns=[f"A{i}" for i in range(n_assets)])
+
+
+def test_sample_covariance_correlation_and_shrinkage():
+    df = _returns()
+    pd.testing.assert_frame_equal(sample_covariance(df), df.cov())
+    pd.testing.assert_frame_equal(correlation(df.cov()), df.corr())
+    cov = df.cov()
+    assert shrink(cov, 0.0).equals(cov)
+    diagonal = shrink(cov, 1.0, "diagonal").to_numpy()
+    assert np.allclose(diagonal, np.diag(np.diag(cov)))
+    constant = correlation(shrink(cov, 1.0, "constant_correlation")).to_numpy()
+    off = constant[~np.eye(len(cov), dtype=bool)]
+    assert np.allclose(off, off[0])
+    with pytest.raises(ValueError, match="Unknown shrinkage target"):
+        shrink(cov, 0.5, "factor")
+    assert betas(cov, "A0")["A0"] == pytest.approx(1.0)
+
+
+def test_ledoit_wolf_conditions_wide_matrices():
+    wide = _returns(n_days=40, n_assets=100, seed=1)
+    cov, intensity = ledoit_wolf(wide)
+    assert 0 < intensity <= 1
+    sample = wide.cov(ddof=0).to_numpy()
+    mu = np.trace(sample) / 100
+    np.testing.assert_allclose(cov.to_numpy(), (1 - intensity) * sample + intensity * mu * np.eye(100))
+    assert np.linalg.eigvalsh(cov.to_numpy()).min() > 0
+    assert np.linalg.matrix_rank(sample) < 100
+
+
+def test_ewma_incremental_updates_match_batch_fit():
+    df = _returns(n_days=200)
+    df.iloc[150, 2] = np.nan
+    df.iloc[170:175, 4] = np.nan
+    full = EWMACovariance.from_returns(df, decay=0.97)
+    incremental = EWMACovariance.from_returns(df.iloc[:120], decay=0.97)
+    for row in df.iloc[120:].to_numpy():
+        incremental.update(row)
+    assert incremental.n_updates == 200
+    np.testing.assert_allclose(incremental.covariance, full.covariance, rtol=1e-10)
+
+    clean = _returns(n_days=200)
+    weights = 0.94 ** np.arange(199, -1, -1)
+    expected = (clean.to_numpy() * weights[:, None]).T @ clean.to_numpy() / weights.sum()
+    np.testing.assert_allclose(EWMACovariance.from_returns(clean).covariance, expected)
+
+
+def test_portfolio_risk_decomposition_and_fills():
+    df = _returns()
+    cov = df.cov()
+    positions = {"A0": 100, "A3": -50, "A5": 20}
+    prices = {"A0": 10.0, "A3": 20.0, "A5": 50.0}
+    risk = PortfolioRisk.from_positions(cov, positions, prices)
+    x = np.array([1000.0, 0, 0, -1000.0, 0, 1000.0])
+    assert risk.volatility == pytest.approx(np.sqrt(x @ cov.to_numpy() @ x))
+    assert risk.component_risk().sum() == pytest.approx(risk.volatility)
+    assert risk.value_at_risk(0.99) == pytest.approx(-2.3263478740408408 * risk.volatility)
+    report = risk.report()
+    assert list(report.index) == ["A0", "A3", "A5"] and report["pct_contribution"].sum() == pytest.approx(1.0)
+
+    risk.apply_fill("A3", 50, 20.0)
+    risk.apply_fill("A1", 10, 30.0)
+    expected = PortfolioRisk(cov, {"A0": 1000.0, "A1": 300.0, "A5": 1000.0})
+    assert risk.volatility == pytest.approx(expected.volatility)
+    pd.testing.assert_series_equal(risk.marginal_risk(), expected.marginal_risk())
+    with pytest.raises(ValueError, match="No covariance"):
+        risk.apply_fill("ZZZ", 1, 1.0)
+
+
+class _CountingMatrix(np.ndarray):
+    products = 0
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if ufunc is np.matmul:
+            _CountingMatrix.products += 1
+        inputs = [x.view(np.ndarray) if isinstance(x, _CountingMatrix) else x for x in inputs]
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+
+def test_apply_fill_rerisks_without_a_matrix_product():
+    n = 200
+    rng = np.random.default_rng(2)
+    model = EWMACovariance(range(n)).fit(rng.normal(0, 0.01, (50, n)))
+    exposures = {i: 1_000.0 for i in range(0, n, 3)}
+    risk = PortfolioRisk(model.covariance, exposures)
+    risk.cov = risk.cov.view(_CountingMatrix)
+    _CountingMatrix.products = 0
+    for i in range(100):
+        risk.apply_fill(i, 10, 50.0)
+        exposures[i] = exposures.get(i, 0.0) + 500.0
+    # O(N) per fill: one covariance column, never a full covariance product
+    assert _CountingMatrix.products == 0
+    fresh = PortfolioRisk(model.covariance, exposures)
+    assert risk.volatility == pytest.approx(fresh.volatility, rel=1e-10)
+    np.testing.assert_allclose(risk.marginal_risk(), fresh.marginal_risk(), rtol=1e-10)
@@ -0,0 +1,126 @@
+"""Tests for data sources and the on-disk price cache."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.data_sources import CachedSource, CSVSource, DataSource
+from data_processing.market_data_processor import MarketDataProcessor
+
+
+def _ohlcv(start="2023-01-02", periods=120, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(start, periods=periods)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, periods))
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Adj Close": close, "Volume": rng.integers(1_000, 10_000, periods),
+    }, index=idx)
+
+
+class CountingSource(DataSource):
+    def __init__(self, df):
+        self.df = df
+        self.calls = []
+
+    def fetch(self, ticker, start, end):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        start, end = pd.Timestamp(start, tz=self.df.index.tz), pd.Timestamp(end, tz=self.df.index.tz)
+        return self.df[(self.df.index >= start) & (self.df.index < end)]
+
+
+def test_cached_source_fetches_only_missing_ranges(tmp_path):
+    full = _ohlcv(periods=200)
+    upstream = CountingSource(full)
+    cache = CachedSource(upstream, cache_dir=str(tmp_path))
+
+    first = cache.fetch("AAA", "2023-02-01", "2023-04-01")
+    assert len(upstream.calls) == 1
+    again = cache.fetch("AAA", "2023-02-01", "2023-04-01")
+    assert len(upstream.calls) == 1
+    pd.testing.assert_frame_equal(first, again, check_freq=False)
+
+    wider = cache.fetch("AAA", "2023-01-01", "2023-05-01")
+    assert upstream.calls[1:] == [(pd.Timestamp("2023-01-01"), pd.Timestamp("2023-02-01")),
+                                  (pd.Timestamp("2023-04-01"), pd.Timestamp("2023-05-01"))]
+    expected = full[(full.index >= "2023-01-01") & (full.index < "2023-05-01")]
+    pd.testing.assert_frame_equal(wider, expected, check_freq=False)
+
+
+def test_cached_source_offline_raises_for_uncached_range(tmp_path):
+    cache = CachedSource(CountingSource(_ohlcv()), cache_dir=str(tmp_path))
+    cache.fetch("AAA", "2023-01-01", "2023-02-01")
+    offline = CachedSource(CountingSource(_ohlcv()), cache_dir=str(tmp_path), offline=True)
+    assert not offline.fetch("AAA", "2023-01-01", "2023-02-01").empty
+    with pytest.raises(RuntimeError, match="Offline mode"):
+        offline.fetch("AAA", "2023-01-01", "2023-03-01")
+
+
+def test_market_data_processor_builds_offline_from_csv(tmp_path):
+    _ohlcv(periods=120).to_csv(tmp_path / "AAA.csv")
+    source = CachedSource(CSVSource(str(tmp_path)), cache_dir=str(tmp_path / "cache"), offline=True)
+    mdp = MarketDataProcessor("AAA", "2023-01-01", "2024-01-01", source=source)
+    data = mdp.build()
+    assert "ret_1d" in data.columns
+    assert len(data) == 119
+
+
+def test_market_data_processor_build_reports_stages():
+    from backtesting.instrumentation import Instrumentation
+
+    instrumentation = Instrumentation()
+    mdp = MarketDataProcessor("AAA", "2023-01-01", "2024-01-01", source=CountingSource(_ohlcv(periods=120)),
+                              instrumentation=instrumentation)
+    mdp.build()
+    assert set(instrumentation.stages) == {"fetch", "validate", "returns"}
+    assert instrumentation.stages["validate"].calls == 1
+    assert instrumentation.counters["rows_processed"] == 119
+
+
+def test_cached_source_retries_failed_fetches_and_caches_empty_ranges(tmp_path):
+    class FlakySource(CountingSource):
+        fail = True
+
+        def fetch(self, ticker, start, end):
+            if self.fail:
+                self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+                raise ConnectionError("transient")
+            return super().fetch(ticker, start, end)
+
+    upstream = FlakySource(_ohlcv())
+    cache = CachedSource(upstream, cache_dir=str(tmp_path))
+    with pytest.raises(ConnectionError):
+        cache.fetch("AAA", "2023-01-01", "2023-02-01")
+    upstream.fail = False
+    assert not cache.fetch("AAA", "2023-01-01", "2023-02-01").empty
+    assert len(upstream.calls) == 2
+
+    # A weekend and a range before the first bar have no rows, but are covered.
+    assert cache.fetch("AAA", "2023-01-07", "2023-01-09").empty
+    assert cache.fetch("AAA", "2022-06-01", "2022-07-01").empty
+    assert len(upstream.calls) == 3
+    offline = CachedSource(CountingSource(_ohlcv()), cache_dir=str(tmp_path), offline=True)
+    assert offline.fetch("AAA", "2022-06-01", "2022-07-01").empty
+    assert offline.fetch("AAA", "2023-01-07", "2023-01-09").empty
+
+
+def test_cached_source_round_trips_tz_aware_index_and_odd_tickers(tmp_path):
+    bars = _ohlcv().tz_localize("America/New_York")
+    upstream = CountingSource(bars)
+    cache = CachedSource(upstream, cache_dir=str(tmp_path))
+    first = cache.fetch("BRK/B", "2023-01-01", "2023-03-01")
+    assert [p.name for p in tmp_path.iterdir()] == ["BRK%2FB.npz"]
+    offline = CachedSource(CountingSource(bars), cache_dir=str(tmp_path), offline=True)
+    again = offline.fetch("BRK/B", "2023-01-01", "2023-03-01")
+    assert str(again.index.tz) == "America/New_York"
+    pd.testing.assert_frame_equal(first, again, check_freq=False)
+
+
+def test_cached_source_refetches_from_today_for_future_ends(tmp_path):
+    today = pd.Timestamp.now().normalize()
+    upstream = CountingSource(_ohlcv(start=today - pd.Timedelta(days=60), periods=60))
+    cache = CachedSource(upstream, cache_dir=str(tmp_path))
+    end = today + pd.Timedelta(days=10)
+    cache.fetch("AAA", today - pd.Timedelta(days=30), end)
+    cache.fetch("AAA", today - pd.Timedelta(days=30), end)
+    assert upstream.calls[1] == (today, end)
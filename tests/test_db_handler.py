@@ -0,0 +1,116 @@
+"""Unit tests for the SQLite PriceStore."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.db_handler import PriceStore
+
+
+def _prices(start="2023-01-02", periods=5, base=100.0):
+    idx = pd.bdate_range(start, periods=periods)
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+        "Adj Close": close, "Volume": np.arange(periods) * 1000, "ret_1d": 0.01,
+    }, index=idx)
+
+
+def test_upsert_keeps_other_tickers(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.db"))
+    store.upsert(_prices(), "AAA")
+    store.upsert(_prices(base=50.0), "BBB")
+    assert store.tickers() == ["AAA", "BBB"]
+    assert len(store.read()) == 10
+    store.close()
+
+
+def test_upsert_overwrites_existing_dates(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.db"))
+    store.upsert(_prices(periods=5), "AAA")
+    store.upsert(_prices(start="2023-01-06", periods=3, base=200.0), "AAA")
+    out = store.read("AAA")
+    assert len(out) == 7
+    assert out.loc["2023-01-06", "Close"] == 200.0
+    assert out.loc["2023-01-05", "Close"] == 103.0
+    store.close()
+
+
+def test_read_range_round_trips_columns(tmp_path):
+    df = _prices(periods=10)
+    store = PriceStore(str(tmp_path / "prices.db"))
+    store.upsert(df, "AAA")
+    out = store.read(["AAA"], start="2023-01-04", end="2023-01-10")
+    expected = df.loc["2023-01-04":"2023-01-10"]
+    assert list(out.index) == list(expected.index)
+    assert (out["ticker"] == "AAA").all()
+    np.testing.assert_allclose(out["Adj Close"], expected["Adj Close"])
+    assert out["Volume"].tolist() == expected["Volume"].tolist()
+    store.close()
+
+
+def test_upsert_long_format_and_rejects_bad_table(tmp_path):
+    panel = pd.concat([_prices().assign(ticker="AAA"), _prices().assign(ticker="BBB")])
+    store = PriceStore(str(tmp_path / "prices.db"))
+    assert store.upsert(panel) == 10
+    store.close()
+    with pytest.raises(ValueError, match="Invalid table name"):
+        PriceStore(str(tmp_path / "prices.db"), table_name="prices; DROP TABLE prices")
+
+
+def test_market_data_processor_save_to_sqlite_appends(tmp_path):
+    from data_processing.market_data_processor import MarketDataProcessor
+    db_path = str(tmp_path / "market.db")
+    for ticker, base in [("AAA", 100.0), ("BBB", 50.0)]:
+        mdp = MarketDataProcessor(ticker, "2023-01-01", "2023-02-01")
+        mdp.data = _prices(base=base)
+        result = mdp.save_to_sqlite(db_path)
+        assert result["rows_saved"] == 5
+    store = PriceStore(db_path)
+    assert store.tickers() == ["AAA", "BBB"]
+    store.close()
+
+
+def test_legacy_to_sql_table_is_migrated(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "prices.db")
+    legacy = _prices().rename_axis("Date").assign(ticker="AAA")
+    with sqlite3.connect(path) as conn:
+        legacy.to_sql("prices", conn, if_exists="replace", index=True)
+    store = PriceStore(path)
+    store.upsert(_prices(base=50.0), "BBB")
+    out = store.read()
+    assert store.tickers() == ["AAA", "BBB"]
+    np.testing.assert_allclose(out[out["ticker"] == "AAA"]["Adj Close"], legacy["Adj Close"])
+    assert list(out[out["ticker"] == "AAA"].index) == list(legacy.index)
+    store.close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE other (x REAL)")
+    with pytest.raises(ValueError, match="unrecognized layout"):
+        PriceStore(path, table_name="other")
+
+
+def test_failed_legacy_migration_leaves_the_table_untouched(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "prices.db")
+    legacy = _prices().rename_axis("Date").assign(ticker="AAA", note="x")
+    with sqlite3.connect(path) as conn:
+        legacy.to_sql("prices", conn, if_exists="replace", index=True)
+    with pytest.raises(ValueError, match="not numeric"):
+        PriceStore(path)
+    with sqlite3.connect(path) as conn:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(prices)")]
+        rows = conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+    assert tables == ["prices"]
+    assert "Adj Close" in columns and rows == len(legacy)
+
+
+def test_extra_columns_are_persisted_or_rejected(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.db"))
+    df = _prices().assign(ret_5d=0.05)
+    store.upsert(df, "AAA")
+    assert store.read("AAA")["ret_5d"].tolist() == [0.05] * 5
+    with pytest.raises(ValueError, match="not numeric"):
+        store.upsert(_prices().assign(note="x"), "AAA")
+    store.close()
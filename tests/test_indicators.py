@@ -0,0 +1,135 @@
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.indicators import IndicatorCache, Indicator, atr, ema, rolling_std, rsi, sma
+from backtesting.data_handler import DataHandler
+from backtesting.strategy import MovingAverageCrossover
+
+
+def _bars(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    high = close * (1 + rng.uniform(0, 0.01, n))
+    low = close * (1 - rng.uniform(0, 0.01, n))
+    idx = pd.date_range("2020-01-01", periods=n, freq="B")
+    return pd.DataFrame({"High": high, "Low": low, "Close": close, "close": close, "Adj Close": close}, index=idx)
+
+
+def test_kernels_match_pandas():
+    s = _bars()["close"]
+    s.iloc[50] = np.nan
+    np.testing.assert_allclose(sma(s, 20), s.rolling(20).mean(), rtol=1e-10)
+    np.testing.assert_allclose(rolling_std(s, 20), s.rolling(20).std(), rtol=1e-10)
+    clean = _bars()["close"]
+    np.testing.assert_allclose(ema(clean, span=12), clean.ewm(span=12, adjust=False).mean(), rtol=1e-12)
+
+    delta = clean.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    np.testing.assert_allclose(rsi(clean, 14), 100 - 100 / (1 + gain / loss), rtol=1e-10)
+    assert np.isnan(rsi(clean, 14)[:14]).all() and not np.isnan(rsi(clean, 14)[14])
+
+
+def test_atr_matches_true_range_definition():
+    df = _bars()
+    previous = df["Close"].shift()
+    tr = pd.concat([df["High"] - df["Low"], (df["High"] - previous).abs(), (df["Low"] - previous).abs()],
+                   axis=1).max(axis=1)
+    expected = tr.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    np.testing.assert_allclose(atr(df["High"], df["Low"], df["Close"], 14), expected, rtol=1e-12)
+
+
+def _frozen(values):
+    values = np.array(values, dtype=float)
+    values.flags.writeable = False
+    return values
+
+
+def test_cache_shares_results_by_array_identity():
+    cache = IndicatorCache(maxsize=8)
+    df = DataHandler(_bars()).data
+    first = cache.get("sma", df["close"], window=20)
+    again = cache.get("sma", df["close"].to_numpy(), window=20)
+    assert again is first and not first.flags.writeable
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    prefix = cache.get("sma", df["close"].iloc[:100], window=20)
+    other = cache.get("sma", DataHandler(df.copy()).data["close"], window=20)
+    assert prefix is not first and other is not first and cache.misses == 3
+    np.testing.assert_allclose(prefix, first[:100])
+
+    cache.get("sma", df["close"], window=50)
+    assert cache.misses == 4
+
+
+def test_cache_never_keeps_results_for_writable_inputs():
+    cache = IndicatorCache()
+    df = _bars()
+    before = cache.get("sma", df["close"], window=20)
+    df.loc[df.index[50:], "close"] *= 2
+    after = cache.get("sma", df["close"], window=20)
+    assert cache.uncached == 2 and len(cache) == 0
+    np.testing.assert_allclose(after[70:], 2 * before[70:])
+
+    strategy = MovingAverageCrossover(5, 20)
+    first = strategy.generate_signals(df)
+    df.loc[df.index[100:], "close"] *= 0.5
+    assert not strategy.generate_signals(df).equals(first)
+
+
+def test_cache_evicts_least_recently_used_and_dead_arrays():
+    cache = IndicatorCache(maxsize=2)
+    x = _frozen(np.arange(100.0))
+    a = cache.get("sma", x, window=5)
+    cache.get("sma", x, window=10)
+    cache.get("sma", x, window=5)
+    cache.get("sma", x, window=20)
+    assert len(cache) == 2
+    assert cache.get("sma", x, window=5) is a
+    cache.get("sma", x, window=10)
+    assert cache.misses == 4
+
+    del x
+    gc.collect()
+    y = _frozen(np.arange(100.0) * 2)
+    assert cache.get("sma", y, window=5)[-1] == pytest.approx(2 * a[-1])
+
+
+def test_strategies_share_declared_indicators():
+    cache = IndicatorCache()
+    df = DataHandler(_bars()).data
+    strategies = [MovingAverageCrossover(s, l) for s, l in [(10, 50), (20, 50), (10, 100)]]
+    assert cache.precompute(strategies, df) == 4
+    assert cache.misses == 4
+    for strategy in strategies:
+        values = strategy.compute_indicators(df, cache)
+        np.testing.assert_allclose(values["ma_long"], df["close"].rolling(strategy.long_window).mean())
+    assert cache.misses == 4 and cache.hits == 6
+    assert Indicator("sma", window=20) == Indicator("sma", "close", window=20)
+
+
+def test_handlers_copy_only_declared_indicator_inputs():
+    from backtesting.backtester import Backtester
+    df = _bars()
+    strategy = MovingAverageCrossover(10, 50)
+    assert IndicatorCache.input_columns([strategy]) == {"close"}
+    arrays = Backtester(strategy, df, "TEST").data_handler.arrays
+    assert not np.shares_memory(arrays["close"], df["close"].to_numpy())
+    assert np.shares_memory(arrays["Adj Close"], df["Adj Close"].to_numpy())
+    assert not any(a.flags.writeable for a in arrays.values())
+    copied = DataHandler(df).arrays
+    assert not any(np.shares_memory(copied[c], df[c].to_numpy()) for c in df.columns)
+
+
+def test_serial_sweep_precomputes_indicators_once(monkeypatch):
+    from backtesting import optimization
+    cache = IndicatorCache()
+    monkeypatch.setattr(optimization, "indicator_cache", cache)
+    monkeypatch.setattr("backtesting.strategy.indicator_cache", cache)
+    grid = {"short_window": [5, 10], "long_window": [50, 100], "quantity": [10]}
+    optimization.run_sweep(_bars(), grid, "TEST", processes=1)
+    assert cache.misses == 4 and cache.uncached == 0
+    assert cache.hits == 2 * 4
@@ -0,0 +1,87 @@
+"""Tests for the lazy, chunked transform pipeline."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.columnar_store import ColumnarStore
+from data_processing.market_data_processor import MarketDataProcessor
+from data_processing.pipeline import Pipeline, iter_frames
+
+
+def _ohlcv(periods=500, freq="B", seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2023-01-02", periods=periods, freq=freq)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, periods))
+    return pd.DataFrame({
+        "Open": close * 0.999, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Adj Close": close, "Volume": rng.integers(1_000, 10_000, periods).astype(float),
+    }, index=idx)
+
+
+def test_returns_fused_and_chunked_match_pandas():
+    df = _ohlcv()
+    pipeline = Pipeline(df).returns([1, 5]).log_returns(1).returns(5)
+    assert pipeline.plan() == [("returns", ({"Adj Close": [(1, False), (1, True), (5, False)]}, True))]
+
+    expected = df.assign(ret_1d=df["Adj Close"].pct_change(), ret_5d=df["Adj Close"].pct_change(5),
+                         logret_1d=np.log(df["Adj Close"]).diff()).iloc[5:]
+    whole = pipeline.collect()
+    chunked = Pipeline(df, chunk_size=3).returns([1, 5]).log_returns(1).collect()
+    for out in (whole, chunked):
+        pd.testing.assert_frame_equal(out[expected.columns], expected, check_freq=False)
+    assert not df.columns.str.startswith("ret").any()
+
+
+def test_resample_across_chunks_matches_pandas():
+    df = _ohlcv(periods=3_000, freq="h")
+    expected = df.resample("D").agg({"Open": "first", "High": "max", "Low": "min", "Close": "last",
+                                     "Adj Close": "last", "Volume": "sum"})
+    expected["ret_1d"] = expected["Adj Close"].pct_change()
+    expected = expected.iloc[1:]
+    chunks = list(Pipeline(df, chunk_size=100).returns(1).resample("D").iter_chunks())
+    assert len(chunks) > 1
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected, check_freq=False)
+
+
+def test_adjust_back_adjusts_before_ex_dates():
+    df = _ohlcv(periods=10)
+    splits = pd.Series({df.index[4]: 2.0})
+    dividends = pd.Series({df.index[7]: 0.01})
+    out = Pipeline(df, chunk_size=4).adjust(splits=splits, dividends=dividends).collect()
+    factor = np.r_[[0.5 * 0.99] * 4, [0.99] * 3, [1.0] * 3]
+    np.testing.assert_allclose(out["Close"], df["Close"] * factor)
+    np.testing.assert_allclose(out["Volume"], df["Volume"] * np.r_[[2.0] * 4, [1.0] * 6])
+    pd.testing.assert_series_equal(out["Adj Close"], df["Adj Close"])
+    with pytest.raises(ValueError, match="one resample"):
+        Pipeline(df).resample("W").resample("ME").plan()
+
+
+def test_pipeline_streams_columnar_store_and_add_returns(tmp_path):
+    df = _ohlcv(periods=1_000)
+    store = ColumnarStore(str(tmp_path))
+    store.write("AAA", df)
+    weekly = Pipeline(store.iter_read("AAA", chunk_size=64)).resample("W").returns([1, 4]).collect()
+    assert weekly.equals(Pipeline(df).resample("W").returns([1, 4]).collect())
+
+    mdp = MarketDataProcessor("AAA", "2023-01-01", "2027-01-01")
+    mdp.data = df.copy()
+    mdp.add_returns([1, 20])
+    assert mdp.data.index[0] == df.index[20]
+    assert mdp.data["ret_20d"].iloc[0] == pytest.approx(df["Adj Close"].iloc[20] / df["Adj Close"].iloc[0] - 1)
+
+
+def test_empty_results_keep_planned_columns():
+    df = _ohlcv(periods=4)
+    out = Pipeline(df, chunk_size=2).returns([1, 5]).collect()
+    assert out.empty and isinstance(out.index, pd.DatetimeIndex)
+    assert list(out.columns) == list(df.columns) + ["ret_1d", "ret_5d"]
+    assert out["ret_5d"].dtype == float
+
+    streamed = Pipeline(iter_frames(df, 2)).resample("W").log_returns(3).collect()
+    assert list(streamed.columns) == list(df.columns) + ["logret_3d"]
+    assert Pipeline(iter(())).returns(1).collect().empty
+
+    mdp = MarketDataProcessor("AAA", "2023-01-01", "2023-02-01")
+    mdp.data = df.iloc[:1]
+    assert "ret_1d" in mdp.add_returns().columns
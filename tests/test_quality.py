@@ -0,0 +1,79 @@
+"""Tests for the fused data-quality report."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.market_data_processor import MarketDataProcessor
+from data_processing.quality import quality_report
+
+
+def _ohlcv(periods=100, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2023-01-02", periods=periods)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, periods))
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Adj Close": close, "Volume": rng.integers(1_000, 10_000, periods).astype(float),
+    }, index=idx)
+
+
+def test_quality_report_lists_every_offending_row():
+    df = _ohlcv()
+    df.iloc[5, df.columns.get_loc("High")] = 1.0
+    df.iloc[7, df.columns.get_loc("Volume")] = -1
+    df.iloc[9, df.columns.get_loc("Volume")] = 0
+    df.iloc[20, df.columns.get_loc("Adj Close")] = df["Adj Close"].iloc[19] * 10
+    report = quality_report(df)
+
+    assert not report.ok
+    assert report.violations["high_price"].tolist() == [5]
+    assert report.violations["negative_volume"].tolist() == [7]
+    assert report.violations["return_out_of_bounds"].tolist() == [20]
+    frame = report.to_frame()
+    assert set(frame["check"]) == {"high_price", "low_price", "negative_volume", "return_out_of_bounds"}
+    stats = report.tickers.iloc[0]
+    assert stats["zero_vol_count"] == 1
+    assert stats["return_rows"] == 99
+    with pytest.raises(ValueError, match="High price constraint violated"):
+        report.raise_for_errors()
+
+
+def test_quality_report_stats_match_pandas():
+    df = _ohlcv(seed=4)
+    stats = quality_report(df).tickers.iloc[0]
+    returns = df["Adj Close"].pct_change().dropna()
+    assert stats["mean"] == pytest.approx(returns.mean())
+    assert stats["standard_deviation"] == pytest.approx(returns.std())
+    assert stats["max_return"] == pytest.approx(returns.max())
+    assert stats["start_date"] == df.index[0] and stats["end_date"] == df.index[-1]
+
+
+def test_quality_report_panel_flags_per_ticker():
+    good = _ohlcv(seed=1).assign(ticker="AAA")
+    short = _ohlcv(periods=30, seed=2).assign(ticker="BBB")
+    dup = _ohlcv(seed=3).assign(ticker="CCC")
+    dup = pd.concat([dup.iloc[:50], dup.iloc[49:]])
+    panel = pd.concat([good, short, dup]).sort_index(kind="stable")
+    report = quality_report(panel, ticker_column="ticker")
+
+    failures = report.failures()
+    assert set(failures) == {"BBB", "CCC"}
+    assert failures["BBB"]["stage"] == "validate_min_history"
+    assert failures["CCC"]["check"] == "duplicate_timestamp"
+    positions = report.violations["duplicate_timestamp"]
+    assert (panel["ticker"].to_numpy()[positions] == "CCC").all()
+    assert report.tickers.loc["AAA", "rows"] == 100
+    assert not report.tickers.loc["CCC", "is_index_unique"]
+
+
+def test_quality_report_structural_errors_and_summary_does_not_mutate():
+    report = quality_report(_ohlcv().drop(columns=["Volume"]))
+    assert report.errors and not report.ok
+
+    mdp = MarketDataProcessor("AAA", "2023-01-01", "2024-01-01")
+    mdp.data = _ohlcv()
+    columns = list(mdp.data.columns)
+    summary = mdp.summary()
+    assert list(mdp.data.columns) == columns and len(mdp.data) == 100
+    assert summary["num_days"] == 99
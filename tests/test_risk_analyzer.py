@@ -37,3 +37,102 @@ def test_max_drawdown_declining_series():
     # (0.99^10 - 0.99) / 0.99 ≈ -0.0865
     assert md == pytest.approx(-0.0865, abs=0.01)
     assert -0.15 < md < -0.05
+
+
+def test_rolling_metrics_match_get_metrics_on_slices():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    returns = pd.Series(rng.normal(0.0005, 0.01, 300), index=pd.bdate_range("2020-01-01", periods=300))
+    rolling = RiskAnalyzer(returns).rolling_metrics(window=63)
+    assert list(rolling.columns) == list(RiskAnalyzer(returns).get_metrics())
+    assert rolling.iloc[:62].isna().all().all()
+    for end in (63, 150, 300):
+        expected = RiskAnalyzer(returns.iloc[end - 63:end]).get_metrics()
+        row = rolling.iloc[end - 1]
+        for name, value in expected.items():
+            assert row[name] == pytest.approx(value, rel=1e-9), name
+
+
+def test_rolling_metrics_rejects_tiny_window():
+    with pytest.raises(ValueError, match="Window"):
+        RiskAnalyzer(pd.Series([0.01, 0.02])).rolling_metrics(window=1)
+
+
+def test_batch_risk_analyzer_matches_per_series_with_ragged_starts():
+    import numpy as np
+    from batch_risk_analyzer import BatchRiskAnalyzer
+    rng = np.random.default_rng(1)
+    returns = pd.DataFrame(rng.normal(0.0005, 0.01, (200, 4)), columns=list("ABCD"))
+    returns.iloc[:50, 1] = np.nan   # late start
+    returns.iloc[150:, 2] = np.nan  # early end
+    batch = BatchRiskAnalyzer(returns).get_metrics()
+    assert batch["n_obs"].tolist() == [200, 150, 150, 200]
+    for column in returns.columns:
+        expected = RiskAnalyzer(returns[column].dropna()).get_metrics()
+        for name, value in expected.items():
+            assert batch.loc[column, name] == pytest.approx(value, rel=1e-9), (column, name)
+
+
+def test_batch_risk_analyzer_all_nan_column_is_nan():
+    import numpy as np
+    from batch_risk_analyzer import BatchRiskAnalyzer
+    returns = pd.DataFrame({"A": [0.01, -0.02, 0.03], "B": [np.nan] * 3})
+    metrics = BatchRiskAnalyzer(returns).get_metrics()
+    assert metrics.loc["B"].drop("n_obs").isna().all()
+    assert metrics.loc["A", "max_drawdown"] == pytest.approx(RiskAnalyzer(returns["A"]).max_drawdown())
+
+
+def test_historical_and_parametric_var():
+    import numpy as np
+    from var_engine import historical_cvar, historical_var, parametric_cvar, parametric_var
+    rng = np.random.default_rng(2)
+    returns = pd.Series(rng.normal(0.0, 0.01, 100_000))
+    risk = RiskAnalyzer(returns)
+    assert historical_var(returns) == pytest.approx(risk.value_at_risk())
+    assert historical_cvar(returns) == pytest.approx(risk.expected_shortfall())
+    # For normal data the parametric estimates converge to the empirical ones
+    assert parametric_var(returns) == pytest.approx(-0.01645, rel=0.02)
+    assert parametric_var(returns, method="cornish-fisher") == pytest.approx(parametric_var(returns), rel=0.02)
+    assert parametric_cvar(returns) == pytest.approx(historical_cvar(returns), rel=0.02)
+    assert parametric_cvar(returns, method="cornish-fisher") == pytest.approx(parametric_cvar(returns), rel=0.02)
+    with pytest.raises(ValueError, match="Unknown parametric method"):
+        parametric_var(returns, method="student")
+
+
+def test_monte_carlo_var_is_reproducible_across_processes():
+    import numpy as np
+    from var_engine import MonteCarloVaR
+    rng = np.random.default_rng(3)
+    returns = pd.DataFrame(rng.normal(0.0, 0.01, (500, 3)))
+    for method in ("bootstrap", "normal"):
+        mc = MonteCarloVaR(returns, weights=[0.5, 0.3, 0.2], method=method, seed=42, chunk_size=10_000)
+        serial = mc.simulate(25_000)
+        parallel = mc.simulate(25_000, processes=2)
+        assert len(serial) == 25_000
+        np.testing.assert_array_equal(serial, parallel)
+        result = mc.run(25_000)
+        assert result["conditional_value_at_risk"] < result["value_at_risk"] < 0
+
+
+def test_monte_carlo_run_reduces_chunks_to_the_exact_tail():
+    import numpy as np
+    from var_engine import MonteCarloVaR
+    rng = np.random.default_rng(5)
+    returns = pd.DataFrame(rng.normal(0.0, 0.01, (300, 4)).round(3))
+    mc = MonteCarloVaR(returns, method="bootstrap", horizon=5, seed=1, chunk_bytes=8 * 2 ** 20)
+    assert mc.chunk_size == 8 * 2 ** 20 // (2 * 8 * 5 * 4)
+    mc.chunk_size = 3_000
+    paths = mc.simulate(20_000)
+    var = np.quantile(paths, 0.01)
+    result = mc.run(20_000, confidence=0.99)
+    assert result["value_at_risk"] == pytest.approx(var, rel=1e-12)
+    assert result["conditional_value_at_risk"] == pytest.approx(paths[paths <= var].mean(), rel=1e-12)
+
+
+def test_monte_carlo_normal_matches_gaussian_var():
+    import numpy as np
+    from var_engine import MonteCarloVaR, parametric_var
+    rng = np.random.default_rng(4)
+    returns = pd.Series(rng.normal(0.0005, 0.01, 2000))
+    mc = MonteCarloVaR(returns, method="normal", seed=0)
+    assert mc.run(200_000)["value_at_risk"] == pytest.approx(parametric_var(returns), rel=0.02)
@@ -0,0 +1,127 @@
+"""Tests for the in-database analytics layer."""
+
+import gc
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.db_handler import PriceStore
+from sql_analytics.analytics import QueryChunks, SQLAnalytics
+
+
+def _ohlcv(periods=80, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2023-01-02", periods=periods)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, periods))
+    volume = rng.integers(1_000, 10_000, periods)
+    volume[5] = 0
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Adj Close": close, "Volume": volume,
+    }, index=idx)
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    db = str(tmp_path / "prices.db")
+    store = PriceStore(db)
+    frames = {"AAA": _ohlcv(seed=1), "BBB": _ohlcv(seed=2), "CCC": _ohlcv(seed=3)}
+    for ticker, df in frames.items():
+        store.upsert(df, ticker)
+    store.close()
+    sql = SQLAnalytics(db)
+    yield sql, frames
+    sql.close()
+
+
+def test_returns_match_pandas_and_stream_in_chunks(analytics):
+    sql, frames = analytics
+    out = sql.returns(["AAA", "BBB"], start="2023-02-01")
+    expected = frames["AAA"]["Adj Close"].pct_change().loc["2023-02-01":]
+    got = out[out["ticker"] == "AAA"].set_index("date")["ret"]
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy())
+
+    chunks = list(sql.returns(chunk_size=50))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 3 * 79
+
+
+def test_rolling_matches_pandas(analytics):
+    sql, frames = analytics
+    out = sql.rolling(window=10, tickers="CCC").set_index("date")
+    prices = frames["CCC"]["Adj Close"]
+    np.testing.assert_allclose(out["rolling_mean"], prices.rolling(10).mean(), equal_nan=True)
+    np.testing.assert_allclose(out["rolling_std"], prices.rolling(10).std(), rtol=1e-6, equal_nan=True)
+    np.testing.assert_allclose(out["rolling_max"], prices.rolling(10).max(), equal_nan=True)
+
+
+def test_rolling_std_is_accurate_at_high_prices(tmp_path):
+    db = str(tmp_path / "prices.db")
+    df = _ohlcv(periods=300, seed=4)
+    df[["Open", "High", "Low", "Close", "Adj Close"]] *= 500
+    store = PriceStore(db)
+    store.upsert(df, "BTC")
+    store.close()
+    sql = SQLAnalytics(db)
+    try:
+        out = sql.rolling(window=20, tickers="BTC", start="2023-03-01").set_index("date")
+    finally:
+        sql.close()
+    expected = df["Adj Close"].rolling(20).std().loc["2023-03-01":]
+    np.testing.assert_allclose(out["rolling_std"], expected, rtol=1e-9)
+
+def test_cross_sectional_ranks(analytics):
+    sql, frames = analytics
+    out = sql.cross_sectional_ranks()
+    day = out[out["date"] == out["date"].iloc[0]]
+    assert day["rank"].tolist() == [1, 2, 3]
+    assert day["n_tickers"].tolist() == [3, 3, 3]
+    assert day["ret"].is_monotonic_decreasing
+    assert day["pct_rank"].tolist() == [1.0, 0.5, 0.0]
+
+
+def test_summary_and_diagnostics_match_processor_figures(analytics):
+    sql, frames = analytics
+    summary = sql.summary().set_index("ticker")
+    diagnostics = sql.diagnostics().set_index("ticker")
+    for ticker, df in frames.items():
+        data = df.assign(ret_1d=df["Adj Close"].pct_change()).dropna(subset=["ret_1d"])
+        returns = data["ret_1d"]
+        assert summary.loc[ticker, "mean_daily_return"] == pytest.approx(returns.mean())
+        assert summary.loc[ticker, "volatility"] == pytest.approx(returns.std())
+        assert summary.loc[ticker, "num_days"] == len(data)
+        assert diagnostics.loc[ticker, "max_return"] == pytest.approx(returns.max())
+        assert diagnostics.loc[ticker, "start_date"] == data.index[0]
+        assert diagnostics.loc[ticker, "zero_vol_count"] == (data["Volume"] == 0).sum()
+        assert diagnostics.loc[ticker, "is_index_unique"]
+    with pytest.raises(ValueError, match="Unknown price column"):
+        sql.returns(price="ret_1d; DROP TABLE prices")
+
+
+def test_open_chunk_iterators_do_not_exhaust_the_pool(analytics):
+    sql, frames = analytics
+    iterators = [sql.returns(chunk_size=10) for _ in range(sql.pool.size + 2)]
+    assert all(len(next(it)) == 10 for it in iterators)
+    assert len(sql.summary()) == 3
+    with sql.diagnostics(chunk_size=2) as chunks:
+        first = next(chunks)
+        assert first["is_increasing"].dtype == bool
+    assert list(chunks) == []
+    for it in iterators:
+        it.close()
+    assert list(iterators[0]) == []
+
+
+def test_query_chunks_failed_construction_cleans_up(analytics, monkeypatch):
+    sql, _ = analytics
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+    with pytest.raises(ValueError, match="chunk_size must be at least 1"):
+        sql.returns(chunk_size=0)
+    with pytest.raises(sqlite3.OperationalError):
+        QueryChunks(sql.db_path, "SELECT * FROM missing_table", (), chunk_size=10)
+    gc.collect()
+    assert unraisable == []
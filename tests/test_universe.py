@@ -0,0 +1,104 @@
+"""Tests for concurrent multi-ticker ingestion."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.data_sources import DataSource
+from data_processing.universe import RateLimiter, UniverseProcessor
+
+
+def _ohlcv(periods=100, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2023-01-02", periods=periods)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, periods))
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Adj Close": close, "Volume": rng.integers(1_000, 10_000, periods),
+    }, index=idx)
+
+
+class FakeSource(DataSource):
+    def __init__(self, frames, flaky=()):
+        self.frames = frames
+        self.flaky = set(flaky)
+        self.calls = {}
+
+    def fetch(self, ticker, start, end):
+        self.calls[ticker] = self.calls.get(ticker, 0) + 1
+        if ticker in self.flaky and self.calls[ticker] == 1:
+            raise ConnectionError("transient")
+        if ticker not in self.frames:
+            raise KeyError(f"unknown ticker {ticker}")
+        return self.frames[ticker].copy()
+
+
+def test_universe_build_reports_failures_per_ticker():
+    bad_ohlc = _ohlcv(seed=2)
+    bad_ohlc.iloc[10, bad_ohlc.columns.get_loc("High")] = 1.0
+    source = FakeSource({
+        "AAA": _ohlcv(seed=1),
+        "BBB": bad_ohlc,
+        "CCC": _ohlcv(periods=30, seed=3),
+        "DDD": _ohlcv(seed=4),
+    }, flaky={"DDD"})
+    up = UniverseProcessor(["AAA", "BBB", "CCC", "DDD", "ZZZ"], "2023-01-01", "2024-01-01",
+                           source=source, max_workers=4, max_retries=2, backoff=0)
+    data = up.build()
+    assert sorted(data["ticker"].unique()) == ["AAA", "DDD"]
+    assert (data.groupby("ticker").size() == 99).all()
+    report = up.error_report().set_index("ticker")
+    assert report.loc["BBB", "stage"] == "validate_OHLC"
+    assert report.loc["BBB", "error"] == "High price constraint violated"
+    assert report.loc["CCC", "stage"] == "validate_min_history"
+    assert report.loc["ZZZ", "stage"] == "fetch"
+    assert source.calls["DDD"] == 2
+
+
+def test_universe_stage_validators_wrap_quality_report():
+    bad_ohlc = _ohlcv(seed=2)
+    bad_ohlc.iloc[10, bad_ohlc.columns.get_loc("High")] = 1.0
+    frames = {"AAA": _ohlcv(seed=1), "BBB": bad_ohlc, "CCC": _ohlcv(periods=30, seed=3)}
+    up = UniverseProcessor(list(frames), "2023-01-01", "2024-01-01", source=FakeSource(frames))
+    up.fetch_prices()
+    up.validate_min_history()
+    assert list(up.errors) == ["CCC"]
+    up.validate_OHLC()
+    assert up.errors["BBB"] == {"stage": "validate_OHLC", "error": "High price constraint violated"}
+    with pytest.raises(ValueError, match="missing returns"):
+        up.validate_returns_sanity()
+    assert sorted(up.data["ticker"].unique()) == ["AAA"]
+
+
+def test_universe_validators_check_rows_left_by_add_returns():
+    jump = _ohlcv(periods=61, seed=2)
+    jump.iloc[1:, jump.columns.get_loc("Adj Close")] *= 10
+    frames = {"AAA": _ohlcv(periods=61, seed=1), "BBB": jump, "CCC": _ohlcv(periods=60, seed=3)}
+    up = UniverseProcessor(list(frames), "2023-01-01", "2024-01-01", source=FakeSource(frames))
+    up.fetch_prices()
+    up.add_returns()
+    up.validate_min_history(60)
+    assert list(up.errors) == ["CCC"]
+    assert "59 rows" in up.errors["CCC"]["error"]
+    up.validate_returns_sanity()
+    assert up.errors["BBB"] == {"stage": "validate_returns_sanity", "error": "Unexpected return values"}
+    assert sorted(up.data["ticker"].unique()) == ["AAA"]
+
+
+def test_universe_returns_match_single_ticker_pct_change():
+    frames = {"AAA": _ohlcv(seed=1), "BBB": _ohlcv(seed=2)}
+    up = UniverseProcessor(list(frames), "2023-01-01", "2024-01-01", source=FakeSource(frames))
+    data = up.build()
+    for ticker, df in frames.items():
+        expected = df["Adj Close"].pct_change().dropna()
+        got = data.loc[data["ticker"] == ticker, "ret_1d"]
+        np.testing.assert_allclose(got.to_numpy(), expected.to_numpy())
+
+
+def test_rate_limiter_spaces_calls():
+    import time
+    limiter = RateLimiter(rate=100)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.035